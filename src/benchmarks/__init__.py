@@ -0,0 +1,5 @@
+"""Offline benchmarks for retrieval quality and pipeline throughput."""
+
+from benchmarks.fakes import HashingEmbeddings, FakeToolChatModel
+
+__all__ = ["HashingEmbeddings", "FakeToolChatModel"]
@@ -0,0 +1,205 @@
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import PrivateAttr
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+class HashingEmbeddings(Embeddings):
+    """Deterministic, offline stand-in for OpenAI embeddings.
+    
+    Each lower-cased word and word bigram is hashed into one of ``size``
+    buckets with a signed weight, and the result is L2-normalised. Texts
+    sharing vocabulary therefore land close together, which is enough to
+    compare chunking and ``top_k`` settings without calling the API.
+    
+    Example:
+        >>> embeddings = HashingEmbeddings(size=256)
+        >>> vector = embeddings.embed_query("Inhalative Kortikosteroide")
+    """
+    
+    def __init__(self, size: int = 256, latency: float = 0.0):
+        self.size = size
+        self.latency = latency
+    
+    def _embed(self, text: str) -> List[float]:
+        tokens = _TOKEN_PATTERN.findall(text.lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        
+        vector = [0.0] * self.size
+        for feature in features:
+            digest = zlib.crc32(feature.encode("utf-8"))
+            sign = 1.0 if digest & 1 else -1.0
+            vector[(digest >> 1) % self.size] += sign
+        
+        norm = math.sqrt(sum(v * v for v in vector))
+        if norm == 0:
+            return vector
+        return [v / norm for v in vector]
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed a batch of documents."""
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+    
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query."""
+        if self.latency:
+            time.sleep(self.latency)
+        return self._embed(text)
+    
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed a batch of documents without blocking the event loop."""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+    
+    async def aembed_query(self, text: str) -> List[float]:
+        """Embed a single query without blocking the event loop."""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._embed(text)
+
+def example_from_schema(schema: Dict[str, Any], rng: random.Random) -> Any:
+    """Build a value that satisfies a (simple) JSON schema."""
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    
+    kind = schema.get("type")
+    if kind == "object":
+        return {
+            name: example_from_schema(prop, rng)
+            for name, prop in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        return [example_from_schema(schema.get("items", {}), rng)]
+    if kind == "boolean":
+        return rng.random() < 0.5
+    if kind in ("number", "integer"):
+        low = schema.get("minimum", 0)
+        high = schema.get("maximum", 1)
+        value = rng.uniform(low, high)
+        return int(value) if kind == "integer" else round(value, 3)
+    return "Synthetischer Text"
+
+class FakeToolChatModel(BaseChatModel):
+    """Offline chat model that answers every call with a tool call.
+    
+    Bind it like ``ChatOpenAI`` (``.bind(tools=...)``); arguments for the first
+    bound tool are generated from its JSON schema, so responses are valid for
+    ``QUERY_FORMATION_PROMPT_CONFIG`` and ``RESULT_SYNTHESIS_PROMPT_CONFIG``.
+    For ``format_analysis`` the query is ``"verify: <sentence>"`` and roughly
+    ``verification_rate`` of the sentences are marked for verification.
+    ``format_group_verification`` gets one verdict per numbered claim.
+    
+    With ``prompt_cache`` the model mimics provider-side prompt caching:
+    prompt prefixes of at least 1024 tokens (tools first, then messages)
+    that were sent before are reported as cached, in 128-token steps.
+    
+    Example:
+        >>> llm = FakeToolChatModel(latency=0.2).bind(tools=QUERY_FORMATION_PROMPT_CONFIG)
+    """
+    
+    latency: float = 0.0
+    verification_rate: float = 0.6
+    seed: int = 0
+    prompt_cache: bool = True
+    
+    _prefixes: set = PrivateAttr(default_factory=set)
+    _prefix_lock: Any = PrivateAttr(default_factory=threading.Lock)
+    
+    @property
+    def _llm_type(self) -> str:
+        return "fake-tool-chat-model"
+    
+    def _cached_tokens(self, text: str) -> int:
+        if not self.prompt_cache:
+            return 0
+        # Same 4 characters per token estimate as the usage numbers
+        ends = range(1024 * 4, len(text) + 1, 128 * 4)
+        cached = 0
+        with self._prefix_lock:
+            for end in ends:
+                if hash(text[:end]) not in self._prefixes:
+                    break
+                cached = end // 4
+            self._prefixes.update(hash(text[:end]) for end in ends)
+        return cached
+    
+    def _respond(self, messages: List[BaseMessage], tools: Optional[List[Dict[str, Any]]]) -> ChatResult:
+        prompt = "\n".join(str(message.content) for message in messages)
+        rng = random.Random(zlib.crc32(prompt.encode("utf-8")) ^ self.seed)
+        
+        if not tools:
+            message = AIMessage(content="OK")
+        else:
+            function = tools[0]["function"]
+            arguments = example_from_schema(function["parameters"], rng)
+            
+            if function["name"] == "format_analysis":
+                sentence = prompt.strip().splitlines()[-1].split(": ", 1)[-1].strip()
+                arguments["needs_verification"] = rng.random() < self.verification_rate
+                arguments["query"] = f"verify: {sentence}" if arguments["needs_verification"] else None
+            elif function["name"] == "format_group_verification":
+                # One verdict per numbered claim ("[n] Aussage: ...")
+                items = function["parameters"]["properties"]["results"]["items"]
+                numbers = re.findall(r"^\[(\d+)\] Aussage:", prompt, re.MULTILINE)
+                arguments["results"] = [
+                    {**example_from_schema(items, rng), "claim_number": int(number)}
+                    for number in numbers
+                ]
+            
+            message = AIMessage(
+                content="",
+                additional_kwargs={"tool_calls": [{
+                    "id": f"call_{rng.getrandbits(32):08x}",
+                    "type": "function",
+                    "function": {
+                        "name": function["name"],
+                        "arguments": json.dumps(arguments, ensure_ascii=False)
+                    }
+                }]}
+            )
+        
+        # Rough token estimate so accounting code sees realistic numbers
+        input_tokens = len(prompt) // 4
+        output_tokens = len(json.dumps(message.additional_kwargs)) // 4
+        cached_tokens = self._cached_tokens(json.dumps(tools or []) + prompt)
+        message.usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+            "input_token_details": {"cache_read": cached_tokens}
+        }
+        message.response_metadata = {
+            "model_name": self._llm_type,
+            "token_usage": {
+                "prompt_tokens": input_tokens,
+                "completion_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+                "prompt_tokens_details": {"cached_tokens": cached_tokens}
+            }
+        }
+        return ChatResult(generations=[ChatGeneration(message=message)])
+    
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._respond(messages, kwargs.get("tools"))
+    
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._respond(messages, kwargs.get("tools"))
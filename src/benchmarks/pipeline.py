@@ -0,0 +1,275 @@
+"""End-to-end pipeline benchmark with fake LLM and embedding backends.
+
+Runs ``main.process_and_verify_claims`` over synthetic articles of increasing
+size. Every model call goes to ``FakeToolChatModel``/``HashingEmbeddings`` with
+a configurable artificial latency, so throughput changes (concurrency,
+caching, batching) can be measured locally without API costs.
+
+Example:
+    python -m benchmarks.pipeline --paragraphs 5 20 80 --llm-latency 0.05
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from langchain_core.documents import Document
+from rich.console import Console
+from rich.table import Table
+from rich.box import ROUNDED
+
+from benchmarks.fakes import FakeToolChatModel, HashingEmbeddings
+from benchmarks.retrieval import build_vectorstore
+from query_formation.agent import QueryFormationAgent
+from query_formation.configuration import QueryFormationConfig
+from query_formation.processor import QueryFormationProcessor
+from retrieval_graph.configuration import RetrievalConfiguration
+from retrieval_graph.builder import create_batch_retrieval_graph, create_retrieval_graph
+from shared import tracing
+
+_TOPICS = [
+    "inhalative Corticosteroide", "Salbutamol", "Montelukast", "Peak-Flow-Messung",
+    "Allergene", "Belastungsasthma", "Lungenfunktion", "Biologika",
+    "Exazerbation", "Schwangerschaft", "Kinder", "Rauchen",
+]
+
+_TEMPLATES = [
+    "Bei {topic} empfehlen Ärzte eine regelmäßige Kontrolle der Beschwerden",
+    "{topic} kann die Symptome innerhalb weniger Tage deutlich lindern",
+    "Patienten mit {topic} sollten ihren Therapieplan mit dem Arzt besprechen",
+    "Studien zeigen, dass {topic} das Risiko schwerer Anfälle senkt",
+    "Die Leitlinie nennt {topic} als Bestandteil der Stufentherapie",
+]
+
+@dataclass
+class PipelineBenchmarkConfig:
+    """Settings for one benchmark session."""
+
+    paragraphs: List[int] = field(default_factory=lambda: [5, 20, 80])
+    sentences_per_paragraph: int = 4
+    guideline_chunks: int = 300
+    llm_latency: float = 0.0
+    escalation_llm_latency: Optional[float] = None
+    embedding_latency: float = 0.0
+    verification_rate: float = 0.6
+    top_k: int = 5
+    group_size: int = 1
+    measure_memory: bool = True
+    seed: int = 0
+
+@dataclass
+class PipelineReport:
+    """Throughput, per-stage time and memory for one article size."""
+
+    paragraphs: int
+    sentences: int
+    claims: int
+    total_seconds: float
+    claims_per_second: float
+    stage_seconds: Dict[str, float]
+    prompt_tokens: int
+    completion_tokens: int
+    cached_tokens: int
+    peak_memory_mb: float
+
+def synthetic_article(paragraphs: int, sentences_per_paragraph: int, seed: int = 0) -> str:
+    """Generate a markdown article with headings and German medical sentences."""
+    rng = random.Random(seed)
+    lines = []
+    for i in range(paragraphs):
+        if i % 4 == 0:
+            lines.append(f"# Abschnitt {i // 4 + 1}")
+            lines.append("")
+        lines.append(f"## Thema {i + 1}")
+        sentences = [
+            rng.choice(_TEMPLATES).format(topic=rng.choice(_TOPICS))
+            for _ in range(sentences_per_paragraph)
+        ]
+        lines.append(". ".join(sentences) + ".")
+        lines.append("")
+    return "\n".join(lines)
+
+def synthetic_guideline_chunks(count: int, seed: int = 0) -> List[Document]:
+    """Generate guideline-like chunks covering the article vocabulary."""
+    rng = random.Random(seed + 1)
+    return [
+        Document(
+            page_content=" ".join(
+                rng.choice(_TEMPLATES).format(topic=rng.choice(_TOPICS)) + "."
+                for _ in range(6)
+            ),
+            metadata={"source": "synthetic_guideline.pdf", "page": i // 3}
+        )
+        for i in range(count)
+    ]
+
+def run_pipeline_benchmark(config: PipelineBenchmarkConfig) -> List[PipelineReport]:
+    """Run the full pipeline once per article size.
+
+    Args:
+        config: Benchmark settings
+
+    Returns:
+        One report per entry in ``config.paragraphs``
+    """
+    # Imported here so that main's module level setup runs only when needed
+    from main import process_and_verify_claims
+
+    llm = FakeToolChatModel(
+        latency=config.llm_latency,
+        verification_rate=config.verification_rate,
+        seed=config.seed
+    )
+    escalation_llm = None
+    if config.escalation_llm_latency is not None:
+        escalation_llm = FakeToolChatModel(latency=config.escalation_llm_latency, seed=config.seed + 1)
+    vectorstore = build_vectorstore(
+        synthetic_guideline_chunks(config.guideline_chunks, config.seed),
+        HashingEmbeddings(latency=config.embedding_latency),
+        collection_name="pipeline_benchmark"
+    )
+
+    reports = []
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        for paragraphs in config.paragraphs:
+            article = work_dir / f"article_{paragraphs}.md"
+            article.write_text(
+                synthetic_article(paragraphs, config.sentences_per_paragraph, config.seed),
+                encoding='utf-8'
+            )
+
+            query_config = QueryFormationConfig(log_directory=str(work_dir / "logs"))
+            processor = QueryFormationProcessor(
+                query_config,
+                agent=QueryFormationAgent(query_config, llm=llm)
+            )
+
+            retrieval_config = RetrievalConfiguration(top_k=config.top_k, synthesis_group_size=config.group_size)
+            retrieval = create_retrieval_graph(
+                retrieval_config,
+                vectorstore=vectorstore,
+                llm=llm,
+                escalation_llm=escalation_llm
+            )
+            batch_retrieval = None
+            if config.group_size > 1:
+                batch_retrieval = create_batch_retrieval_graph(
+                    retrieval_config,
+                    vectorstore=vectorstore,
+                    llm=llm,
+                    escalation_llm=escalation_llm
+                )
+
+            if config.measure_memory:
+                tracemalloc.start()
+            start = time.perf_counter()
+            results_dir = process_and_verify_claims(
+                article,
+                processor=processor,
+                retrieval=retrieval,
+                results_root=work_dir / f"results_{paragraphs}",
+                show_results=False,
+                batch_retrieval=batch_retrieval,
+                reuse_previous=False
+            )
+            total = time.perf_counter() - start
+            peak = 0
+            if config.measure_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+            claims = len(list(results_dir.glob("claim_*.json")))
+            trace = tracing.get_tracer().report()
+            stages = {
+                name: stats["total_seconds"]
+                for name, stats in trace["stages"].items()
+            }
+            stages["other"] = max(total - sum(stages.values()), 0.0)
+
+            reports.append(PipelineReport(
+                paragraphs=paragraphs,
+                sentences=paragraphs * config.sentences_per_paragraph,
+                claims=claims,
+                total_seconds=total,
+                claims_per_second=claims / total if total > 0 else 0.0,
+                stage_seconds=stages,
+                prompt_tokens=trace["totals"]["prompt_tokens"],
+                completion_tokens=trace["totals"]["completion_tokens"],
+                cached_tokens=trace["totals"]["cached_tokens"],
+                peak_memory_mb=peak / (1024 * 1024)
+            ))
+
+    return reports
+
+def print_reports(reports: List[PipelineReport]) -> None:
+    """Print the reports as a table."""
+    stages = sorted({name for report in reports for name in report.stage_seconds})
+
+    table = Table(
+        title="Pipeline Benchmark",
+        box=ROUNDED,
+        show_header=True,
+        header_style="bold magenta"
+    )
+    for column in ("Paragraphs", "Sentences", "Claims", "Total s", "Claims/s"):
+        table.add_column(column, justify="right")
+    for name in stages:
+        table.add_column(f"{name} s", justify="right", style="dim")
+    table.add_column("Tokens", justify="right")
+    table.add_column("Cached", justify="right")
+    table.add_column("Peak MB", justify="right")
+
+    for report in reports:
+        table.add_row(
+            str(report.paragraphs),
+            str(report.sentences),
+            str(report.claims),
+            f"{report.total_seconds:.2f}",
+            f"{report.claims_per_second:.2f}",
+            *[f"{report.stage_seconds.get(name, 0.0):.2f}" for name in stages],
+            str(report.prompt_tokens + report.completion_tokens),
+            f"{report.cached_tokens / report.prompt_tokens:.0%}" if report.prompt_tokens else "-",
+            f"{report.peak_memory_mb:.1f}"
+        )
+
+    Console().print(table)
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description='Benchmark the verification pipeline offline.')
+    parser.add_argument('--paragraphs', type=int, nargs='+', default=[5, 20, 80], help='Article sizes to run')
+    parser.add_argument('--sentences-per-paragraph', type=int, default=4)
+    parser.add_argument('--llm-latency', type=float, default=0.0, help='Seconds per fake LLM call')
+    parser.add_argument('--escalation-latency', type=float, help='Enable the synthesis cascade with a fake escalation model this slow')
+    parser.add_argument('--embedding-latency', type=float, default=0.0, help='Seconds per fake embedding call')
+    parser.add_argument('--verification-rate', type=float, default=0.6, help='Share of sentences classified as claims')
+    parser.add_argument('--group-size', type=int, default=1, help='Claims per grouped synthesis call (1 = one call per claim)')
+    parser.add_argument('--no-memory', action='store_true', help='Skip tracemalloc (faster, no memory column)')
+    parser.add_argument('--output', type=Path, help='Write reports as JSON to this file')
+    args = parser.parse_args()
+
+    reports = run_pipeline_benchmark(PipelineBenchmarkConfig(
+        paragraphs=args.paragraphs,
+        sentences_per_paragraph=args.sentences_per_paragraph,
+        llm_latency=args.llm_latency,
+        escalation_llm_latency=args.escalation_latency,
+        embedding_latency=args.embedding_latency,
+        verification_rate=args.verification_rate,
+        group_size=args.group_size,
+        measure_memory=not args.no_memory
+    ))
+    print_reports(reports)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump([asdict(report) for report in reports], f, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+"""Retrieval-only evaluation harness.
+
+Runs a labelled set of claims through the retrieval graph's search stage and
+reports recall@k, MRR and latency percentiles for one or more configurations.
+
+Dataset format (JSON lines)::
+
+    {"claim": "ICS sind die Basis der Dauertherapie", "evidence": ["inhalative Corticosteroide"]}
+
+A retrieved chunk counts as relevant when it contains one of the ``evidence``
+snippets (case- and whitespace-insensitive), so labels stay valid when
+``chunk_size`` or ``chunk_overlap`` change. Keep snippets short, ideally a
+phrase or a single sentence copied from the guideline.
+
+Example:
+    python -m benchmarks.retrieval --dataset eval.jsonl \\
+        --guidelines input/asthma/guideline --chunk-sizes 500 1000 --offline
+"""
+
+import argparse
+import itertools
+import json
+import re
+import tempfile
+import time
+from dataclasses import dataclass, field, asdict, astuple, replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from rich.console import Console
+from rich.table import Table
+from rich.box import ROUNDED
+
+from benchmarks.fakes import HashingEmbeddings
+from retrieval_graph.configuration import RetrievalConfiguration
+from retrieval_graph.search import create_searcher, make_search_node
+from retrieval_graph.state import RetrievalState
+from shared.document_loader import load_and_split_pdf
+from shared.page_cache import PageCache
+from shared.tracing import percentile
+from shared.utils import setup_embeddings
+
+@dataclass
+class RetrievalExample:
+    """A claim together with the guideline passages that support it."""
+
+    claim: str
+    evidence: List[str]
+
+@dataclass
+class RetrievalBenchmarkConfig:
+    """One retrieval setup to evaluate."""
+
+    chunk_size: int = 1000
+    chunk_overlap: int = 100
+    top_k: int = 5
+    embedding_model: str = "text-embedding-3-small"
+    embedding_dimensions: Optional[int] = None
+    search_backend: str = "chroma"
+    precision: str = "float32"
+    coarse_dimensions: Optional[int] = None
+    # Evaluated with HashingEmbeddings in place of ``embedding_model``
+    offline: bool = False
+
+    @property
+    def name(self) -> str:
+        model = f"{self.embedding_model} (offline)" if self.offline else self.embedding_model
+        name = (
+            f"{model} size={self.chunk_size} "
+            f"overlap={self.chunk_overlap} k={self.top_k} {self.search_backend}"
+        )
+        if self.embedding_dimensions:
+            name += f" dims={self.embedding_dimensions}"
+        if self.search_backend != "chroma" and (self.precision != "float32" or self.coarse_dimensions):
+            name += f" {self.precision}x{self.coarse_dimensions or 'all'}"
+        return name
+
+@dataclass
+class RetrievalReport:
+    """Quality and latency metrics for one configuration."""
+
+    config: RetrievalBenchmarkConfig
+    num_examples: int
+    num_chunks: int
+    recall_at_k: Dict[int, float] = field(default_factory=dict)
+    mrr: float = 0.0
+    latency_ms: Dict[str, float] = field(default_factory=dict)
+    index_memory_mb: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["config"]["name"] = self.config.name
+        return data
+
+def load_examples(dataset_path: Path) -> List[RetrievalExample]:
+    """Load labelled claims from a JSON lines file."""
+    examples = []
+    with open(dataset_path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            evidence = record.get("evidence", [])
+            if isinstance(evidence, str):
+                evidence = [evidence]
+            if not record.get("claim") or not evidence:
+                raise ValueError(
+                    f"{dataset_path}:{line_number}: 'claim' and 'evidence' are required"
+                )
+            examples.append(RetrievalExample(claim=record["claim"], evidence=evidence))
+    return examples
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+def first_relevant_rank(docs: Sequence[Document], example: RetrievalExample) -> Optional[int]:
+    """Return the 1-based rank of the first relevant chunk, or None."""
+    snippets = [_normalize(snippet) for snippet in example.evidence]
+    for rank, doc in enumerate(docs, 1):
+        content = _normalize(doc.page_content)
+        if any(snippet in content for snippet in snippets):
+            return rank
+    return None
+
+def latency_summary(latencies_ms: Sequence[float]) -> Dict[str, float]:
+    """Summarise latencies as mean and p50/p95/p99."""
+    return {
+        "mean": sum(latencies_ms) / len(latencies_ms) if latencies_ms else 0.0,
+        "p50": percentile(latencies_ms, 50),
+        "p95": percentile(latencies_ms, 95),
+        "p99": percentile(latencies_ms, 99),
+    }
+
+def build_vectorstore(
+    chunks: List[Document],
+    embeddings: Embeddings,
+    collection_name: str
+) -> Chroma:
+    """Index chunks into an in-memory Chroma collection."""
+    vectorstore = Chroma(
+        collection_name=collection_name,
+        embedding_function=embeddings
+    )
+    vectorstore.add_documents(
+        chunks,
+        ids=[f"chunk_{i}" for i in range(len(chunks))]
+    )
+    return vectorstore
+
+def evaluate_search(
+    vectorstore: Chroma,
+    examples: List[RetrievalExample],
+    config: RetrievalBenchmarkConfig,
+    ks: Sequence[int] = (1, 3, 5)
+) -> RetrievalReport:
+    """Run every example through the search node and score the hits."""
+    retrieval_config = RetrievalConfiguration(
+        embedding_model=config.embedding_model,
+        top_k=config.top_k,
+        search_backend=config.search_backend,
+        exact_search_precision=config.precision,
+        exact_search_dimensions=config.coarse_dimensions
+    )
+    ks = sorted({k for k in ks if k <= config.top_k} | {config.top_k})
+    ranks = []
+    latencies_ms = []
+
+    # Memory-map the exact-search matrix as in production so that only the
+    # candidate matrix counts towards its memory footprint
+    with tempfile.TemporaryDirectory() as cache_dir:
+        searcher = create_searcher(vectorstore, retrieval_config, cache_dir=Path(cache_dir))
+        search_node = make_search_node(searcher, retrieval_config)
+
+        for example in examples:
+            state = RetrievalState(query=example.claim, verification_reasoning="")
+            start = time.perf_counter()
+            docs = search_node(state)["results"]
+            latencies_ms.append((time.perf_counter() - start) * 1000)
+            ranks.append(first_relevant_rank(docs, example))
+
+    total = len(examples) or 1
+    return RetrievalReport(
+        config=config,
+        num_examples=len(examples),
+        num_chunks=vectorstore._collection.count(),
+        recall_at_k={
+            k: sum(1 for r in ranks if r is not None and r <= k) / total
+            for k in ks
+        },
+        mrr=sum(1 / r for r in ranks if r is not None) / total,
+        latency_ms=latency_summary(latencies_ms),
+        index_memory_mb=(
+            searcher.memory_bytes / (1024 * 1024) if hasattr(searcher, "memory_bytes") else None
+        )
+    )
+
+def run_benchmark(
+    examples: List[RetrievalExample],
+    guideline_files: List[Path],
+    configs: List[RetrievalBenchmarkConfig],
+    offline: bool = False,
+    page_cache: Optional[PageCache] = None
+) -> List[RetrievalReport]:
+    """Evaluate each configuration, re-using indexes where chunking matches.
+
+    Args:
+        examples: Labelled claims
+        guideline_files: Guideline PDFs to index
+        configs: Configurations to compare
+        offline: Use ``HashingEmbeddings`` instead of the OpenAI API
+        page_cache: Parsed-page cache; each PDF is then parsed once for all
+            chunkings (and across runs)
+
+    Returns:
+        One report per configuration, in input order. Offline, configurations
+        that only differ by embedding model would give identical results;
+        only the first of them is evaluated.
+    """
+    indexes: Dict[tuple, Chroma] = {}
+    reports = []
+    evaluated = set()
+
+    for config in configs:
+        if offline:
+            config = replace(config, offline=True)
+            setup = astuple(replace(config, embedding_model=""))
+            if setup in evaluated:
+                continue
+            evaluated.add(setup)
+        index_key = (
+            config.chunk_size,
+            config.chunk_overlap,
+            None if offline else config.embedding_model,
+            config.embedding_dimensions
+        )
+        if index_key not in indexes:
+            chunks = []
+            for file_path in guideline_files:
+                chunks.extend(load_and_split_pdf(
+                    file_path,
+                    chunk_size=config.chunk_size,
+                    chunk_overlap=config.chunk_overlap,
+                    cache=page_cache
+                ))
+            if offline:
+                embeddings = HashingEmbeddings(size=config.embedding_dimensions or 256)
+            else:
+                embeddings = setup_embeddings(config.embedding_model, config.embedding_dimensions)
+            indexes[index_key] = build_vectorstore(
+                chunks,
+                embeddings,
+                collection_name=f"benchmark_{len(indexes)}"
+            )
+
+        reports.append(evaluate_search(indexes[index_key], examples, config))
+
+    return reports
+
+def print_comparison(reports: List[RetrievalReport]) -> None:
+    """Print the reports side by side."""
+    ks = sorted({k for report in reports for k in report.recall_at_k})
+
+    table = Table(
+        title="Retrieval Benchmark",
+        box=ROUNDED,
+        show_header=True,
+        header_style="bold magenta"
+    )
+    table.add_column("Configuration", style="cyan")
+    table.add_column("Chunks", justify="right")
+    for k in ks:
+        table.add_column(f"R@{k}", justify="right")
+    table.add_column("MRR", justify="right")
+    for name in ("p50", "p95", "p99"):
+        table.add_column(f"{name} ms", justify="right", style="dim")
+    table.add_column("Index MB", justify="right", style="dim")
+
+    for report in reports:
+        table.add_row(
+            report.config.name,
+            str(report.num_chunks),
+            *[
+                f"{report.recall_at_k[k]:.3f}" if k in report.recall_at_k else "-"
+                for k in ks
+            ],
+            f"{report.mrr:.3f}",
+            *[f"{report.latency_ms[name]:.2f}" for name in ("p50", "p95", "p99")],
+            f"{report.index_memory_mb:.2f}" if report.index_memory_mb is not None else "-"
+        )
+
+    Console().print(table)
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description='Evaluate retrieval quality and latency.')
+    parser.add_argument('--dataset', type=Path, required=True, help='JSON lines file with claim/evidence pairs')
+    parser.add_argument('--guidelines', type=Path, required=True, help='Guideline PDF or directory of PDFs')
+    parser.add_argument('--chunk-sizes', type=int, nargs='+', default=[1000])
+    parser.add_argument('--chunk-overlaps', type=int, nargs='+', default=[100])
+    parser.add_argument('--top-k', type=int, nargs='+', default=[5])
+    parser.add_argument('--embedding-models', nargs='+', default=["text-embedding-3-small"])
+    parser.add_argument('--embedding-dimensions', type=int, nargs='+', default=[None], help='Shortened embedding sizes (re-embeds)')
+    parser.add_argument('--search-backends', nargs='+', default=["chroma"], choices=["chroma", "numpy", "auto"])
+    parser.add_argument('--precisions', nargs='+', default=["float32"], choices=["float32", "float16", "int8"], help='Candidate matrix type for numpy search')
+    parser.add_argument('--coarse-dimensions', type=int, nargs='+', default=[None], help='Leading dimensions for the numpy candidate pass')
+    parser.add_argument('--offline', action='store_true', help='Use deterministic local embeddings')
+    parser.add_argument('--page-cache-dir', type=Path, default=Path(".cache/pages"), help='Parsed-page cache directory')
+    parser.add_argument('--no-page-cache', action='store_true', help='Parse every PDF for every chunking')
+    parser.add_argument('--output', type=Path, help='Write reports as JSON to this file')
+    args = parser.parse_args()
+
+    if args.guidelines.is_dir():
+        guideline_files = sorted(args.guidelines.glob("**/*.pdf"))
+    else:
+        guideline_files = [args.guidelines]
+
+    configs = [
+        RetrievalBenchmarkConfig(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            top_k=top_k,
+            embedding_model=model,
+            embedding_dimensions=dimensions,
+            search_backend=backend,
+            precision=precision,
+            coarse_dimensions=coarse_dimensions
+        )
+        for model, dimensions, chunk_size, chunk_overlap, top_k, backend, precision, coarse_dimensions in itertools.product(
+            args.embedding_models,
+            args.embedding_dimensions,
+            args.chunk_sizes,
+            args.chunk_overlaps,
+            args.top_k,
+            args.search_backends,
+            args.precisions,
+            args.coarse_dimensions
+        )
+        # Precision and candidate dimensions only apply to numpy search
+        if backend != "chroma" or (precision == "float32" and coarse_dimensions is None)
+    ]
+
+    reports = run_benchmark(
+        load_examples(args.dataset),
+        guideline_files,
+        configs,
+        offline=args.offline,
+        page_cache=None if args.no_page_cache else PageCache(args.page_cache_dir)
+    )
+    print_comparison(reports)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump([report.to_dict() for report in reports], f, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
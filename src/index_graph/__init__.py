@@ -1,6 +1,14 @@
 """Index Graph Module for processing and storing medical guidelines."""
 
-from index_graph.graph import graph
 from index_graph.configuration import IndexConfiguration
 
-__all__ = ["graph", "IndexConfiguration"] 
\ No newline at end of file
+__all__ = ["graph", "IndexConfiguration"]
+
+
+def __getattr__(name: str):
+    """Build the default graph on first access rather than at import time."""
+    if name == "graph":
+        from index_graph.graph import graph
+        globals()["graph"] = graph
+        return graph
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
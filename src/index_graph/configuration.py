@@ -1,6 +1,7 @@
 from dataclasses import dataclass, field
 from pathlib import Path
-from shared.configuration import BaseConfiguration
+from typing import Optional
+from shared.configuration import BaseConfiguration, HnswConfiguration
 
 @dataclass
 class IndexConfiguration(BaseConfiguration):
@@ -17,6 +18,58 @@ class IndexConfiguration(BaseConfiguration):
     collection_name: str = "guidelines"  # Use same name
     persist_directory: Path = Path("vector_store")
     
+    shard_by: Optional[str] = field(
+        default=None,
+        metadata={"description": "Split the store into one collection per 'guideline' or 'topic' (single collection if None)"}
+    )
+    
+    hnsw: HnswConfiguration = field(
+        default_factory=HnswConfiguration,
+        metadata={"description": "HNSW parameters used when the collection is created"}
+    )
+    
+    # Cleaning settings
+    strip_page_furniture: bool = field(
+        default=True,
+        metadata={"description": "Remove running headers, footers, page numbers and repeated boilerplate"}
+    )
+    furniture_min_page_share: float = field(
+        default=0.6,
+        metadata={"description": "Share of a document's pages a line must appear on to count as furniture"}
+    )
+    dedup_threshold: Optional[float] = field(
+        default=0.85,
+        metadata={"description": "Drop chunks with at least this estimated similarity to an earlier chunk (no dedup if None)"}
+    )
+    minhash_permutations: int = field(
+        default=64,
+        metadata={"description": "MinHash signature length used for near-duplicate detection"}
+    )
+    
+    # Parsed-page cache settings
+    page_cache_dir: Optional[Path] = field(
+        default=Path(".cache/pages"),
+        metadata={"description": "Cache of extracted PDF pages keyed by content hash (no cache if None)"}
+    )
+    page_cache_max_age_days: Optional[float] = field(
+        default=30,
+        metadata={"description": "Evict cached pages not used for this many days"}
+    )
+    page_cache_max_mb: Optional[float] = field(
+        default=500,
+        metadata={"description": "Evict least recently used cached pages above this size"}
+    )
+    
+    # Watch mode settings
+    watch_step_ms: int = field(
+        default=1000,
+        metadata={"description": "Quiet period after the last file event before a batch of changes is indexed"}
+    )
+    watch_debounce_ms: int = field(
+        default=10000,
+        metadata={"description": "Longest time file events are collected into one batch"}
+    )
+    
     # Processing settings
     recursive_dir_search: bool = field(
         default=True,
@@ -1,108 +1,321 @@
-from typing import Dict, Any, List
+import hashlib
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
 from pathlib import Path
 from langchain_chroma import Chroma
+from langchain_core.documents import Document
 from langgraph.graph import StateGraph, START, END
 
 from .configuration import IndexConfiguration
 from .state import IndexState
-from shared.document_loader import load_and_split_pdf
-from shared.utils import setup_embeddings
+from shared.cleaning import CleaningReport, drop_near_duplicates, strip_page_furniture
+from shared.document_loader import load_pdf_pages, split_pages
+from shared.page_cache import PageCache, file_sha256
+from shared.shards import ShardRegistry, shard_collection_name, shard_key, topic_of
+from shared.utils import check_hnsw_configuration, setup_embeddings
+from shared.versions import CollectionVersions
+from shared import tracing
+from shared.logging_utils import get_logger
 import chromadb
 from chromadb.utils import embedding_functions
 import os
 
+logger = get_logger(__name__)
+
 def find_pdf_files(directory: Path, recursive: bool = True) -> List[Path]:
     """Find all PDF files in the given directory."""
     pattern = "**/*.pdf" if recursive else "*.pdf"
     return list(directory.glob(pattern))
 
+def chunk_ids(documents: List[Document]) -> List[str]:
+    """Chunk ids that are unique per source, e.g. ``guideline-1a2b3c4d_0``.
+
+    The digest of the source path keeps guidelines with the same file name
+    in different directories apart, so re-indexing one source never
+    collides with the chunks of another.
+    """
+    chunk_numbers: Dict[str, int] = {}
+    ids = []
+    for doc in documents:
+        source = doc.metadata["source"]
+        chunk_numbers[source] = chunk_numbers.get(source, -1) + 1
+        digest = hashlib.sha1(source.encode("utf-8")).hexdigest()[:8]
+        ids.append(f"{Path(source).stem}-{digest}_{chunk_numbers[source]}")
+    return ids
+
 def create_index_graph(config: IndexConfiguration) -> StateGraph:
     """Create the indexing workflow graph."""
     
     # Initialize components
-    embeddings = setup_embeddings(config.embedding_model)
+    embeddings = setup_embeddings(config.embedding_model, config.embedding_dimensions)
     
     # Use direct ChromaDB client
     client = chromadb.PersistentClient(path=str(config.persist_directory))
-    collection = client.get_or_create_collection(
-        name=config.collection_name,
-        embedding_function=embedding_functions.OpenAIEmbeddingFunction(
-            api_key=os.getenv("OPENAI_API_KEY"),
-            model_name=config.embedding_model
+    embedding_function = embedding_functions.OpenAIEmbeddingFunction(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        model_name=config.embedding_model,
+        dimensions=config.embedding_dimensions
+    )
+    
+    def open_collection(name: str):
+        collection = client.get_or_create_collection(
+            name=name,
+            embedding_function=embedding_function,
+            metadata=config.hnsw.to_metadata()
         )
+        check_hnsw_configuration(collection, config.hnsw)
+        return collection
+    
+    # Sharded stores keep one collection per guideline/topic plus a registry
+    registry = ShardRegistry.for_directory(config.persist_directory) if config.shard_by else None
+    collection = None if registry else open_collection(config.collection_name)
+    
+    page_cache = (
+        PageCache(config.page_cache_dir, config.page_cache_max_age_days, config.page_cache_max_mb)
+        if config.page_cache_dir is not None else None
     )
+    versions = CollectionVersions.for_directory(config.persist_directory)
     
     def load_documents(state: IndexState) -> Dict[str, Any]:
         """Load and process PDF documents."""
         all_chunks = []
+        report = CleaningReport()
         processed = []
         failed = []
         skipped = []
+        hashes = {}
         
         # Get existing document sources
-        existing_sources = {
-            meta["source"] for meta in collection.get()["metadatas"]
-        } if collection.count() > 0 else set()
+        if registry is not None:
+            existing_sources = set(registry.sources())
+        else:
+            existing_sources = {
+                meta["source"] for meta in collection.get()["metadatas"]
+            } if collection.count() > 0 else set()
         
-        print(f"\nFound {len(existing_sources)} existing documents in vector store")
+        logger.info("Found %d existing documents in vector store", len(existing_sources))
         
+        adopted = {}
         for file_path in state.input_files:
             try:
-                # Skip if already indexed
-                if str(file_path) in existing_sources:
-                    print(f"Skipping {file_path.name} - already indexed")
+                # Skip if already indexed (and, when replacing, unchanged).
+                # Sources indexed before hashes were recorded are taken as
+                # unchanged and keep their current hash from now on
+                file_hash = file_sha256(file_path)
+                known_hash = versions.source_hash(file_path)
+                if str(file_path) in existing_sources and (
+                    not state.replace_changed or known_hash in (None, file_hash)
+                ):
+                    logger.info("Skipping %s - already indexed", file_path.name)
                     skipped.append(file_path)
+                    if known_hash is None:
+                        adopted[str(file_path)] = file_hash
                     continue
                     
-                chunks = load_and_split_pdf(
-                    file_path,
-                    chunk_size=config.chunk_size,
-                    chunk_overlap=config.chunk_overlap
-                )
+                with tracing.span("pdf_parsing", file=file_path.name):
+                    pages = load_pdf_pages(file_path, page_cache, digest=file_hash)
+                if config.strip_page_furniture:
+                    with tracing.span("cleaning", file=file_path.name):
+                        pages, page_report = strip_page_furniture(pages, config.furniture_min_page_share)
+                    report.merge(page_report)
+                chunks = split_pages(pages, config.chunk_size, config.chunk_overlap)
                 all_chunks.extend(chunks)
                 processed.append(file_path)
-                print(f"Processed {file_path.name} - created {len(chunks)} chunks")
+                hashes[str(file_path)] = file_hash
+                logger.info("Processed %s - created %d chunks", file_path.name, len(chunks))
             except Exception as e:
                 failed.append(file_path)
-                print(f"Failed to process {file_path}: {str(e)}")
+                logger.error("Failed to process %s: %s", file_path, e)
+        
+        if adopted:
+            versions.adopt(adopted)
+            versions.save()
+            logger.info("Recorded hashes of %d sources indexed without one", len(adopted))
+        
+        if page_cache is not None:
+            logger.info("Page cache: %d hits, %d misses", page_cache.hits, page_cache.misses)
+            page_cache.evict()
         
         return {
             "documents": all_chunks,
             "processed_files": processed,
             "failed_files": failed,
             "skipped_files": skipped,
+            "source_hashes": hashes,
+            "cleaning_report": report.to_dict(),
             "status": "documents_loaded"
         }
     
+    def deduplicate(state: IndexState) -> Dict[str, Any]:
+        """Drop near-duplicate chunks before they are embedded."""
+        report = CleaningReport(**(state.cleaning_report or {}))
+        documents = state.documents
+        if config.dedup_threshold is not None and documents:
+            with tracing.span("deduplication", chunks=len(documents)):
+                documents, dedup_report = drop_near_duplicates(
+                    documents,
+                    threshold=config.dedup_threshold,
+                    num_perm=config.minhash_permutations
+                )
+            report.merge(dedup_report)
+        
+        logger.info(
+            "Cleaning removed %d furniture lines (%d chars) from %d pages and %d of %d chunks as near-duplicates (%d chars)",
+            report.furniture_lines,
+            report.furniture_chars,
+            report.pages,
+            report.duplicate_chunks,
+            report.chunks,
+            report.duplicate_chars
+        )
+        return {"documents": documents, "cleaning_report": report.to_dict()}
+    
+    def stored_chunks(sources: Iterable[Path]) -> Dict[str, Tuple[Optional[str], Any, List[str]]]:
+        """Shard, collection and chunk ids currently stored for each source."""
+        stored = {}
+        for source in map(str, sources):
+            if registry is not None:
+                shard = registry.shard_of(source)
+                if shard is None:
+                    continue
+                target = open_collection(registry.shards[shard]["collection"])
+            else:
+                shard, target = None, collection
+            
+            ids = target.get(where={"source": source}, include=[])["ids"]
+            if ids:
+                stored[source] = (shard, target, ids)
+        return stored
+    
+    def remove_stale(
+        stored: Dict[str, Tuple[Optional[str], Any, List[str]]],
+        written: Dict[str, List[str]],
+        keep: Set[str]
+    ) -> Dict[str, List[str]]:
+        """Delete previously stored chunks that the new write did not replace.
+        
+        Args:
+            stored: ``stored_chunks`` taken before writing
+            written: Sources written per collection in this run
+            keep: Chunk ids written in this run
+        
+        Returns:
+            Sources no longer in a collection, per collection
+        """
+        removed: Dict[str, List[str]] = {}
+        for source, (shard, target, ids) in stored.items():
+            rewritten = source in written.get(target.name, [])
+            stale = [chunk_id for chunk_id in ids if not rewritten or chunk_id not in keep]
+            if stale:
+                with tracing.span("index_delete", chunks=len(stale)):
+                    target.delete(ids=stale)
+            if shard is not None:
+                # The new chunks were registered on top of the old count
+                registry.unregister(shard, [] if rewritten else [source], len(ids))
+            if not rewritten:
+                removed.setdefault(target.name, []).append(source)
+            if stale:
+                logger.info("Removed %d stale chunks of %s from %s", len(stale), Path(source).name, target.name)
+        return removed
+    
+    def index_shards(documents: List[Document]) -> Dict[str, List[str]]:
+        """Add chunks to their shard collections and update the registry.
+        
+        Returns:
+            Indexed sources per collection
+        """
+        shards: Dict[str, List[Document]] = {}
+        for doc in documents:
+            key = shard_key(Path(doc.metadata["source"]), config.shard_by, config.input_dir)
+            shards.setdefault(key, []).append(doc)
+        
+        written: Dict[str, List[str]] = {}
+        for shard, docs in shards.items():
+            shard_collection = open_collection(shard_collection_name(config.collection_name, shard))
+            ids = chunk_ids(docs)
+            sources = sorted({doc.metadata["source"] for doc in docs})
+            
+            with tracing.span("index_write", chunks=len(ids), shard=shard):
+                shard_collection.upsert(
+                    documents=[doc.page_content for doc in docs],
+                    metadatas=[doc.metadata for doc in docs],
+                    ids=ids
+                )
+            registry.register(
+                shard,
+                collection=shard_collection.name,
+                topic=topic_of(Path(docs[0].metadata["source"]), config.input_dir),
+                sources=sources,
+                chunks=len(ids)
+            )
+            written[shard_collection.name] = sources
+            logger.info(
+                "Indexed %d chunks into shard %s (collection size: %d)",
+                len(ids),
+                shard,
+                shard_collection.count()
+            )
+        
+        return written
+    
+    def publish_versions(
+        written: Dict[str, List[str]],
+        removed: Dict[str, List[str]],
+        hashes: Dict[str, str]
+    ) -> Dict[str, int]:
+        """Bump the version of every collection this run changed."""
+        published = {}
+        for name in sorted(set(written) | set(removed)):
+            published[name] = versions.bump(
+                name,
+                changed=written.get(name, []),
+                removed=removed.get(name, []),
+                hashes={source: hashes[source] for source in written.get(name, []) if source in hashes}
+            )
+            logger.info("Published %s version %d", name, published[name])
+        versions.save()
+        return published
+    
     def index_documents(state: IndexState) -> Dict[str, Any]:
-        """Index the processed documents."""
+        """Index the processed documents and remove deleted sources."""
         try:
-            if not state.documents:
-                print("No new documents to index")
+            if not state.documents and not state.removed_files:
+                logger.info("No new documents to index")
                 return {"status": "no_new_documents"}
-                
-            # Convert documents to ChromaDB format
-            documents = []
-            embeddings = []
-            metadatas = []
-            ids = []
             
-            for i, doc in enumerate(state.documents):
-                documents.append(doc.page_content)
-                metadatas.append(doc.metadata)
-                ids.append(f"doc_{i}")
+            # Old chunks stay until the new ones are stored, so a failed
+            # write leaves the previous version of a guideline searchable
+            stored = stored_chunks([*state.removed_files, *state.processed_files])
             
-            # Add documents using ChromaDB native interface
-            collection.add(
-                documents=documents,
-                metadatas=metadatas,
-                ids=ids
-            )
+            if registry is not None:
+                written = index_shards(state.documents) if state.documents else {}
+            elif state.documents:
+                ids = chunk_ids(state.documents)
+                
+                # Add documents using ChromaDB native interface (embeds and stores)
+                with tracing.span("index_write", chunks=len(ids)):
+                    collection.upsert(
+                        documents=[doc.page_content for doc in state.documents],
+                        metadatas=[doc.metadata for doc in state.documents],
+                        ids=ids
+                    )
+                written = {collection.name: sorted({doc.metadata["source"] for doc in state.documents})}
+                
+                logger.info(
+                    "Successfully indexed %d new chunks (collection size: %d)",
+                    len(state.documents),
+                    collection.count()
+                )
+            else:
+                written = {}
             
-            print(f"Successfully indexed {len(state.documents)} new chunks")
-            print(f"Total collection size: {collection.count()}")
+            removed = remove_stale(stored, written, set(chunk_ids(state.documents)))
+            if registry is not None:
+                registry.save()
             
-            return {"status": "indexing_completed"}
+            return {
+                "collection_versions": publish_versions(written, removed, state.source_hashes),
+                "status": "indexing_completed"
+            }
         except Exception as e:
             return {
                 "status": "indexing_failed",
@@ -114,11 +327,13 @@ def create_index_graph(config: IndexConfiguration) -> StateGraph:
     
     # Add nodes
     workflow.add_node("load_documents", load_documents)
+    workflow.add_node("deduplicate", deduplicate)
     workflow.add_node("index_documents", index_documents)
     
     # Add edges
     workflow.add_edge(START, "load_documents")
-    workflow.add_edge("load_documents", "index_documents")
+    workflow.add_edge("load_documents", "deduplicate")
+    workflow.add_edge("deduplicate", "index_documents")
     workflow.add_edge("index_documents", END)
     
     return workflow.compile()
@@ -0,0 +1,118 @@
+"""Rebuild a guideline collection with new HNSW parameters.
+
+Chroma fixes the HNSW settings of a collection when it is created. This
+command copies the stored embeddings, documents and metadata into a fresh
+collection with the new settings, then swaps it in under the original name.
+No embedding API calls are made. The rebuilt index also drops the slack that
+deletions and updates leave behind, which compacts ``vector_store/``.
+
+Parameters that are not given keep the current collection's value.
+
+Example:
+    python -m index_graph.rebuild --collection guidelines --search-ef 64 --M 32
+"""
+
+import argparse
+from dataclasses import replace
+from pathlib import Path
+from typing import Any
+
+import chromadb
+
+from shared.configuration import HnswConfiguration
+from shared.logging_utils import configure_logging, get_logger
+
+logger = get_logger(__name__)
+
+def rebuild_collection(
+    client: Any,
+    collection_name: str,
+    hnsw: HnswConfiguration,
+    batch_size: int = 1000
+) -> Any:
+    """Re-create a collection with new HNSW settings from its stored embeddings.
+
+    Args:
+        client: Chroma client
+        collection_name: Collection to rebuild
+        hnsw: HNSW settings of the rebuilt collection
+        batch_size: Records copied per request
+
+    Returns:
+        The rebuilt collection
+    """
+    source = client.get_collection(collection_name, embedding_function=None)
+    total = source.count()
+
+    staging_name = f"{collection_name}_rebuild"
+    if staging_name in {c.name for c in client.list_collections()}:
+        logger.warning("Removing leftover staging collection %s", staging_name)
+        client.delete_collection(staging_name)
+    target = client.create_collection(
+        staging_name,
+        metadata=hnsw.to_metadata(),
+        embedding_function=None
+    )
+
+    for offset in range(0, total, batch_size):
+        batch = source.get(
+            limit=batch_size,
+            offset=offset,
+            include=["embeddings", "documents", "metadatas"]
+        )
+        target.add(
+            ids=batch["ids"],
+            embeddings=batch["embeddings"],
+            documents=batch["documents"],
+            metadatas=batch["metadatas"]
+        )
+        logger.info("Copied %d/%d records", min(offset + batch_size, total), total)
+
+    if target.count() != total:
+        client.delete_collection(staging_name)
+        raise RuntimeError(
+            f"Rebuild of {collection_name} copied {target.count()} of {total} records; "
+            "the original collection was left unchanged"
+        )
+
+    client.delete_collection(collection_name)
+    target.modify(name=collection_name)
+    logger.info("Rebuilt %s (%d records) with %s", collection_name, total, hnsw.to_metadata())
+    return client.get_collection(collection_name, embedding_function=None)
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description='Rebuild a Chroma collection with new HNSW parameters.')
+    parser.add_argument('--persist-directory', type=Path, default=Path("vector_store"))
+    parser.add_argument('--collection', default="guidelines")
+    parser.add_argument('--space', choices=['l2', 'cosine', 'ip'])
+    parser.add_argument('--construction-ef', type=int)
+    parser.add_argument('--search-ef', type=int)
+    parser.add_argument('--M', type=int)
+    parser.add_argument('--hnsw-batch-size', type=int, help='Vectors buffered before they are added to the index')
+    parser.add_argument('--sync-threshold', type=int)
+    parser.add_argument('--num-threads', type=int)
+    parser.add_argument('--batch-size', type=int, default=1000, help='Records copied per request')
+    args = parser.parse_args()
+
+    configure_logging()
+
+    client = chromadb.PersistentClient(path=str(args.persist_directory))
+    current = HnswConfiguration.from_metadata(
+        client.get_collection(args.collection, embedding_function=None).metadata
+    )
+    overrides = {
+        "space": args.space,
+        "construction_ef": args.construction_ef,
+        "search_ef": args.search_ef,
+        "M": args.M,
+        "batch_size": args.hnsw_batch_size,
+        "sync_threshold": args.sync_threshold,
+        "num_threads": args.num_threads,
+    }
+    hnsw = replace(current, **{name: value for name, value in overrides.items() if value is not None})
+
+    rebuild_collection(client, args.collection, hnsw, batch_size=args.batch_size)
+
+if __name__ == "__main__":
+    main()
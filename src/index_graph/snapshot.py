@@ -0,0 +1,282 @@
+"""Export and import vector store snapshots.
+
+A snapshot is a compressed zip archive holding, per collection, the chunk
+ids, documents and metadata (``records.jsonl``) and the embeddings
+(``embeddings.npy``), plus a ``manifest.json`` with the format version,
+HNSW parameters, embedding model, SHA-256 checksums and the hashes of the
+source PDFs. The shard registry is included when present.
+
+Importing restores the collections without parsing PDFs or calling the
+embedding API. Records are exported in id order, so every node restored
+from the same snapshot holds identical data.
+
+Example:
+    python -m index_graph.snapshot export snapshots/guidelines.zip
+    python -m index_graph.snapshot import snapshots/guidelines.zip --persist-directory vector_store
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import chromadb
+import numpy as np
+
+from shared.logging_utils import configure_logging, get_logger
+from shared.shards import REGISTRY_FILE
+
+logger = get_logger(__name__)
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def _file_sha256(path: Path) -> Optional[str]:
+    if not path.is_file():
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _read_collection(collection: Any, page_size: int, dimensions: int = 0) -> Dict[str, Any]:
+    """Records of a collection in id order.
+
+    An empty collection has no vector to take the size from, so its
+    embeddings get ``dimensions`` columns.
+    """
+    ids, documents, metadatas, embeddings = [], [], [], []
+    for offset in range(0, collection.count(), page_size):
+        batch = collection.get(
+            limit=page_size,
+            offset=offset,
+            include=["embeddings", "documents", "metadatas"]
+        )
+        ids.extend(batch["ids"])
+        documents.extend(batch["documents"])
+        metadatas.extend(batch["metadatas"])
+        embeddings.extend(batch["embeddings"])
+
+    if not ids:
+        return {
+            "ids": [],
+            "documents": [],
+            "metadatas": [],
+            "embeddings": np.zeros((0, dimensions), dtype=np.float32)
+        }
+    order = sorted(range(len(ids)), key=ids.__getitem__)
+    return {
+        "ids": [ids[i] for i in order],
+        "documents": [documents[i] for i in order],
+        "metadatas": [metadatas[i] or {} for i in order],
+        "embeddings": np.asarray([embeddings[i] for i in order], dtype=np.float32).reshape(len(ids), -1)
+    }
+
+def export_snapshot(
+    persist_directory: Path,
+    output: Path,
+    collections: Optional[Sequence[str]] = None,
+    embedding_model: Optional[str] = None,
+    embedding_dimensions: Optional[int] = None,
+    page_size: int = 5000
+) -> Dict[str, Any]:
+    """Write a snapshot of a Chroma store.
+
+    Args:
+        persist_directory: Chroma persistence directory
+        output: Snapshot file to create
+        collections: Collections to export (all if omitted)
+        embedding_model: Embedding model recorded in the manifest
+        embedding_dimensions: Shortened embedding size recorded in the manifest
+        page_size: Records read per request
+
+    Returns:
+        The snapshot manifest
+    """
+    persist_directory = Path(persist_directory)
+    client = chromadb.PersistentClient(path=str(persist_directory))
+    names = list(collections) if collections else sorted(c.name for c in client.list_collections())
+
+    manifest: Dict[str, Any] = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "embedding_model": embedding_model,
+        "embedding_dimensions": embedding_dimensions,
+        "collections": {},
+        "sources": {}
+    }
+
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_output = output.with_name(output.name + ".tmp")
+    with zipfile.ZipFile(tmp_output, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name in names:
+            collection = client.get_collection(name, embedding_function=None)
+            data = _read_collection(collection, page_size, embedding_dimensions or 0)
+            if (collection.metadata or {}).get("hnsw:space") == "cosine" and len(data["ids"]):
+                # Chroma returns normalized vectors once they reach the HNSW
+                # index but raw ones from its write buffer; normalize all so
+                # snapshots do not depend on the buffer state
+                norms = np.linalg.norm(data["embeddings"], axis=1, keepdims=True)
+                data["embeddings"] /= np.where(norms == 0, 1.0, norms)
+
+            buffer = io.BytesIO()
+            np.save(buffer, data["embeddings"])
+            embeddings_bytes = buffer.getvalue()
+            records_bytes = "".join(
+                json.dumps({"id": i, "document": d, "metadata": m}, ensure_ascii=False, sort_keys=True) + "\n"
+                for i, d, m in zip(data["ids"], data["documents"], data["metadatas"])
+            ).encode("utf-8")
+
+            archive.writestr(f"{name}/embeddings.npy", embeddings_bytes)
+            archive.writestr(f"{name}/records.jsonl", records_bytes)
+            manifest["collections"][name] = {
+                "metadata": collection.metadata or {},
+                "count": len(data["ids"]),
+                "dimensions": int(data["embeddings"].shape[1]),
+                "embeddings_sha256": _sha256(embeddings_bytes),
+                "records_sha256": _sha256(records_bytes)
+            }
+            for metadata in data["metadatas"]:
+                source = metadata.get("source")
+                if source and source not in manifest["sources"]:
+                    manifest["sources"][source] = _file_sha256(Path(source))
+            logger.info("Exported %s (%d records)", name, len(data["ids"]))
+
+        registry_path = persist_directory / REGISTRY_FILE
+        if registry_path.exists():
+            archive.write(registry_path, REGISTRY_FILE)
+
+        archive.writestr("manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True))
+
+    tmp_output.replace(output)
+    logger.info("Wrote snapshot %s (%d collections)", output, len(names))
+    return manifest
+
+def read_manifest(snapshot: Path) -> Dict[str, Any]:
+    """Return the manifest of a snapshot."""
+    with zipfile.ZipFile(snapshot) as archive:
+        return json.loads(archive.read("manifest.json"))
+
+def import_snapshot(
+    snapshot: Path,
+    persist_directory: Path,
+    force: bool = False,
+    batch_size: int = 5000
+) -> List[str]:
+    """Restore the collections of a snapshot into a Chroma store.
+
+    Args:
+        snapshot: Snapshot file written by ``export_snapshot``
+        persist_directory: Chroma persistence directory to restore into
+        force: Replace collections that already exist
+        batch_size: Records added per request
+
+    Returns:
+        Names of the restored collections
+
+    Raises:
+        ValueError: On an unsupported format version, a checksum mismatch or
+            an existing collection without ``force``
+    """
+    persist_directory = Path(persist_directory)
+    client = chromadb.PersistentClient(path=str(persist_directory))
+    existing = {c.name for c in client.list_collections()}
+
+    with zipfile.ZipFile(snapshot) as archive:
+        manifest = json.loads(archive.read("manifest.json"))
+        if manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported snapshot format {manifest.get('format_version')} "
+                f"(expected {SNAPSHOT_FORMAT_VERSION})"
+            )
+
+        conflicts = sorted(existing & set(manifest["collections"]))
+        if conflicts and not force:
+            raise ValueError(f"Collections already exist: {', '.join(conflicts)} (use force to replace)")
+
+        for name, info in manifest["collections"].items():
+            embeddings_bytes = archive.read(f"{name}/embeddings.npy")
+            records_bytes = archive.read(f"{name}/records.jsonl")
+            if (_sha256(embeddings_bytes) != info["embeddings_sha256"]
+                    or _sha256(records_bytes) != info["records_sha256"]):
+                raise ValueError(f"Checksum mismatch for collection {name} in {snapshot}")
+
+            embeddings = np.load(io.BytesIO(embeddings_bytes))
+            records = [json.loads(line) for line in records_bytes.decode("utf-8").splitlines()]
+
+            if name in existing:
+                client.delete_collection(name)
+            collection = client.create_collection(
+                name,
+                metadata=info["metadata"] or None,
+                embedding_function=None
+            )
+            for start in range(0, len(records), batch_size):
+                batch = records[start:start + batch_size]
+                collection.add(
+                    ids=[record["id"] for record in batch],
+                    documents=[record["document"] for record in batch],
+                    metadatas=[record["metadata"] or None for record in batch],
+                    embeddings=embeddings[start:start + batch_size]
+                )
+            if collection.count() != info["count"]:
+                raise ValueError(f"Restored {collection.count()} of {info['count']} records into {name}")
+            logger.info("Restored %s (%d records)", name, info["count"])
+
+        if REGISTRY_FILE in archive.namelist():
+            (persist_directory / REGISTRY_FILE).write_bytes(archive.read(REGISTRY_FILE))
+
+    return list(manifest["collections"])
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description='Export or import vector store snapshots.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    export = commands.add_parser('export', help='Write a snapshot')
+    export.add_argument('output', type=Path)
+    export.add_argument('--persist-directory', type=Path, default=Path("vector_store"))
+    export.add_argument('--collection', nargs='+', help='Collections to export (default: all)')
+    export.add_argument('--embedding-model', default="text-embedding-3-small")
+    export.add_argument('--embedding-dimensions', type=int)
+
+    restore = commands.add_parser('import', help='Restore a snapshot')
+    restore.add_argument('snapshot', type=Path)
+    restore.add_argument('--persist-directory', type=Path, default=Path("vector_store"))
+    restore.add_argument('--force', action='store_true', help='Replace existing collections')
+
+    info = commands.add_parser('info', help='Print the manifest of a snapshot')
+    info.add_argument('snapshot', type=Path)
+
+    args = parser.parse_args()
+    configure_logging()
+
+    try:
+        run_command(args)
+    except (ValueError, OSError, zipfile.BadZipFile) as e:
+        parser.error(str(e))
+
+def run_command(args: argparse.Namespace) -> None:
+    if args.command == 'export':
+        export_snapshot(
+            args.persist_directory,
+            args.output,
+            collections=args.collection,
+            embedding_model=args.embedding_model,
+            embedding_dimensions=args.embedding_dimensions
+        )
+    elif args.command == 'import':
+        import_snapshot(args.snapshot, args.persist_directory, force=args.force)
+    else:
+        print(json.dumps(read_manifest(args.snapshot), ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from pathlib import Path
 from langchain_core.documents import Document
 
@@ -8,8 +8,20 @@ class IndexState:
     """State for the indexing process."""
     
     input_files: List[Path]
+    # Sources whose chunks are deleted from the store
+    removed_files: List[Path] = field(default_factory=list)
+    # Re-index input files that are already indexed but whose content changed
+    # (they are skipped otherwise)
+    replace_changed: bool = False
     processed_files: List[Path] = field(default_factory=list)
     failed_files: List[Path] = field(default_factory=list)
+    skipped_files: List[Path] = field(default_factory=list)
+    # SHA-256 of the processed files
+    source_hashes: Dict[str, str] = field(default_factory=dict)
     documents: List[Document] = field(default_factory=list)
+    # What cleaning and deduplication removed (see shared.cleaning.CleaningReport)
+    cleaning_report: Optional[Dict[str, Any]] = None
+    # Collection versions published by this run (see shared.versions)
+    collection_versions: Dict[str, int] = field(default_factory=dict)
     status: Optional[str] = None
     error_message: Optional[str] = None 
\ No newline at end of file
@@ -0,0 +1,178 @@
+"""Watch the guideline tree and index changes incrementally.
+
+Guidelines are updated by dropping PDFs into ``input/``. The watcher first
+reconciles the store with the tree, then waits for file events. Events are
+debounced: a batch is indexed once no event arrived for ``watch_step_ms``
+(at most ``watch_debounce_ms`` after the first one), so a PDF that is still
+being copied is picked up once. Added or changed PDFs are re-chunked and
+replace their old chunks; unchanged ones (same SHA-256) are skipped; the
+chunks of deleted PDFs are removed. Every write bumps the collection
+version in ``versions.json`` (see ``shared.versions``).
+
+Example:
+    python -m index_graph.watch --input-dir input --persist-directory vector_store
+"""
+
+import argparse
+import fnmatch
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import chromadb
+from watchfiles import Change, watch
+
+from index_graph.configuration import IndexConfiguration
+from index_graph.state import IndexState
+from shared.logging_utils import configure_logging, get_logger
+from shared.shards import ShardRegistry
+from shared.versions import CollectionVersions
+
+logger = get_logger(__name__)
+
+class GuidelineWatcher:
+    """Incremental indexer for a guideline directory.
+
+    Args:
+        config: Index configuration (``input_dir``, store and watch settings)
+        graph: Compiled index graph (built from ``config`` if omitted)
+    """
+
+    def __init__(self, config: IndexConfiguration, graph: Optional[Any] = None):
+        self.config = config
+        self.input_dir = Path(config.input_dir).resolve()
+        # Resolved path -> source name as the store records it
+        self._sources: Dict[Path, str] = {}
+        if graph is None:
+            # Imported here: importing index_graph.graph builds the default graph
+            from index_graph.graph import create_index_graph
+            graph = create_index_graph(config)
+        self.graph = graph
+
+    def is_guideline(self, path: Path) -> bool:
+        """Whether a path is a guideline PDF the watcher is responsible for."""
+        if not fnmatch.fnmatch(path.name.lower(), self.config.file_pattern.lower()):
+            return False
+        try:
+            relative = Path(path).resolve().relative_to(self.input_dir)
+        except ValueError:
+            return False
+        return self.config.recursive_dir_search or len(relative.parts) == 1
+
+    def source_of(self, path: Path) -> Path:
+        """A guideline path in the form its chunks are stored under.
+
+        Sources keep the form they were indexed with (relative such as
+        ``input/a.pdf`` or absolute); new ones are named relative to
+        ``config.input_dir`` as given, like a store indexed from it.
+        """
+        resolved = Path(path).resolve()
+        known = self._sources.get(resolved)
+        if known is not None:
+            return Path(known)
+        return Path(self.config.input_dir) / resolved.relative_to(self.input_dir)
+
+    def update(self, changed: Iterable[Path] = (), removed: Iterable[Path] = ()) -> Dict[str, Any]:
+        """Index changed PDFs and remove deleted ones.
+
+        Returns:
+            Final index graph state
+        """
+        state = IndexState(
+            input_files=sorted(changed),
+            removed_files=sorted(removed),
+            replace_changed=True
+        )
+        result = self.graph.invoke(state)
+        if result.get("status") == "indexing_failed":
+            logger.error("Incremental indexing failed: %s", result.get("error_message"))
+        logger.info(
+            "Indexed %d, skipped %d unchanged, removed %d, failed %d guidelines; versions %s",
+            len(result.get("processed_files", [])),
+            len(result.get("skipped_files", [])),
+            len(state.removed_files),
+            len(result.get("failed_files", [])),
+            result.get("collection_versions") or "unchanged"
+        )
+        return result
+
+    def reconcile(self) -> Dict[str, Any]:
+        """Bring the store up to date with the tree, e.g. after downtime."""
+        pattern = f"**/{self.config.file_pattern}" if self.config.recursive_dir_search else self.config.file_pattern
+        versions = CollectionVersions.for_directory(self.config.persist_directory)
+        sources = set(versions.sources) | self.indexed_sources()
+        self._sources = {Path(source).resolve(): source for source in sources}
+        present = [self.source_of(path) for path in self.input_dir.glob(pattern) if path.is_file()]
+        missing = [
+            Path(source)
+            for source in sorted(sources)
+            if self.is_guideline(Path(source)) and not Path(source).exists()
+        ]
+        return self.update(present, missing)
+
+    def indexed_sources(self) -> Set[str]:
+        """Sources in the store, including ones indexed before ``versions.json``."""
+        if self.config.shard_by:
+            return set(ShardRegistry.for_directory(self.config.persist_directory).sources())
+        client = chromadb.PersistentClient(path=str(self.config.persist_directory))
+        if self.config.collection_name not in {c.name for c in client.list_collections()}:
+            return set()
+        collection = client.get_collection(self.config.collection_name, embedding_function=None)
+        return {meta["source"] for meta in collection.get(include=["metadatas"])["metadatas"]}
+
+    def split_changes(self, changes: Set[Tuple[Change, str]]) -> Tuple[List[Path], List[Path]]:
+        """Changed and removed guidelines in a batch of file events.
+
+        A file can see several events per batch (created, written, renamed
+        over); whether it still exists decides what happens to it.
+        """
+        paths = {Path(path) for _, path in changes}
+        guidelines = [self.source_of(path) for path in paths if self.is_guideline(path)]
+        changed = [path for path in guidelines if path.is_file()]
+        removed = [path for path in guidelines if not path.exists()]
+        return changed, removed
+
+    def run(self, stop_event: Optional[threading.Event] = None) -> None:
+        """Reconcile, then index changes until ``stop_event`` is set or Ctrl+C."""
+        self.reconcile()
+        logger.info("Watching %s for guideline changes", self.input_dir)
+        for changes in watch(
+            self.input_dir,
+            watch_filter=lambda change, path: self.is_guideline(Path(path)),
+            debounce=self.config.watch_debounce_ms,
+            step=self.config.watch_step_ms,
+            stop_event=stop_event,
+            recursive=self.config.recursive_dir_search,
+            raise_interrupt=False
+        ):
+            changed, removed = self.split_changes(changes)
+            if changed or removed:
+                self.update(changed, removed)
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description='Watch the guideline directory and index changes incrementally.')
+    parser.add_argument('--input-dir', type=Path, default=Path("input"))
+    parser.add_argument('--persist-directory', type=Path, default=Path("vector_store"))
+    parser.add_argument('--collection', default="guidelines")
+    parser.add_argument('--shard-by', choices=['guideline', 'topic'])
+    parser.add_argument('--once', action='store_true', help='Reconcile the store with the directory and exit')
+    parser.add_argument('--log-level', default='INFO')
+    args = parser.parse_args()
+
+    configure_logging(args.log_level.upper())
+
+    config = IndexConfiguration(
+        input_dir=args.input_dir,
+        persist_directory=args.persist_directory,
+        collection_name=args.collection,
+        shard_by=args.shard_by
+    )
+    watcher = GuidelineWatcher(config)
+    if args.once:
+        watcher.reconcile()
+    else:
+        watcher.run()
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,41 @@
+import asyncio
 import os
 from pathlib import Path
 from dotenv import load_dotenv
-from typing import List, Dict, Any
+from langchain_core.documents import Document
+from typing import List, Dict, Any, Optional, Sequence
 import json
 from datetime import datetime
 
 from index_graph.configuration import IndexConfiguration
 from index_graph.state import IndexState
-from index_graph.graph import graph as index_graph
 
 from retrieval_graph.configuration import RetrievalConfiguration
-from retrieval_graph.state import RetrievalState
-from retrieval_graph.graph import graph as retrieval_graph
+from retrieval_graph.prefetch import RetrievalPrefetcher
+from retrieval_graph.state import BatchRetrievalState, RetrievalState
 
 from query_formation.processor import QueryFormationProcessor
 from query_formation.configuration import QueryFormationConfig
 
+from shared.baseline import ArticleBaseline
 from shared.output_formatter import format_verification_results
+from shared.records import Claim, RecordTables, VerifiedClaim, sentence_fingerprint
+from shared import scheduling, tracing
+from shared.run_index import update_index
+from shared.shards import topic_of
+from shared.logging_utils import configure_logging, get_logger
 
 
 # Load environment variables
 load_dotenv()
 
+logger = get_logger("main")
+
 def index_guidelines():
     """Index the medical guidelines."""
-    print("Starting indexing process...")
+    from index_graph.graph import graph as index_graph
+    
+    logger.info("Starting indexing process...")
     
     # Get the absolute path to the project root
     project_root = Path(__file__).parent.parent
@@ -44,122 +55,327 @@ def index_guidelines():
     if not guideline_path.exists():
         raise FileNotFoundError(f"Guideline file not found at: {guideline_path}")
         
-    print(f"Processing guideline file: {guideline_path}")
+    logger.info("Processing guideline file: %s", guideline_path)
     initial_state = IndexState(input_files=[guideline_path])
     
     # Run indexing
     try:
         result = index_graph.invoke(initial_state)
-        print(f"\nIndexing completed!")
-        print(f"Processed files: {len(result['processed_files'])}")
+        logger.info("Indexing completed! Processed files: %d", len(result['processed_files']))
         if result['failed_files']:
-            print(f"Failed files: {len(result['failed_files'])}")
+            logger.warning("Failed files: %d", len(result['failed_files']))
     except Exception as e:
-        print(f"Indexing failed: {str(e)}")
+        logger.error("Indexing failed: %s", e)
 
-def process_and_verify_claims(input_file: Path, max_sentences: int = None) -> None:
-    """Process medical text and verify claims against guidelines."""
+def process_and_verify_claims(
+    input_file: Path,
+    max_sentences: int = None,
+    processor: Optional[QueryFormationProcessor] = None,
+    retrieval: Optional[Any] = None,
+    results_root: Path = Path("results"),
+    show_results: bool = True,
+    shards: Optional[List[str]] = None,
+    batch_retrieval: Optional[Any] = None,
+    reuse_previous: bool = True,
+    prefetcher: Optional[RetrievalPrefetcher] = None
+) -> Path:
+    """Process medical text and verify claims against guidelines.
+    
+    Args:
+        input_file: Markdown article to check
+        max_sentences: Maximum number of sentences to process
+        processor: Claim extraction processor (defaults to one built from
+            ``QueryFormationConfig``)
+        retrieval: Compiled retrieval graph (defaults to the shared graph)
+        results_root: Directory in which the timestamped run directory is created
+        show_results: Whether to render the results to the console afterwards
+        shards: Guideline shards or topics to search (only used with a
+            sharded vector store; all shards if omitted)
+        batch_retrieval: Compiled batch retrieval graph
+            (``create_batch_retrieval_graph``); when given, all claims are
+            searched together and claims with overlapping evidence are
+            verified in one synthesis call instead of using ``retrieval``
+        reuse_previous: Compare the article with its latest run under
+            ``results_root`` and keep the classifications and verdicts of
+            unchanged sentences, so only new or edited text reaches the LLMs
+        prefetcher: Speculative search of every sentence while it is
+            classified (over the same searcher as ``retrieval``); claims
+            whose query is the sentence skip their own search. Not used
+            with ``batch_retrieval``, which embeds all claims in one call
+        
+    Returns:
+        Directory containing the per-claim results and ``summary.json``
+    """
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    results_dir = Path("results") / timestamp
+    results_dir = Path(results_root) / timestamp
     results_dir.mkdir(parents=True, exist_ok=True)
+    tracer = tracing.start_run(timestamp)
     
-    print("\nStarting medical text analysis and verification...")
+    logger.info("Starting medical text analysis and verification...")
     
-    # Initialize configurations
-    query_config = QueryFormationConfig(max_sentences=max_sentences)
-    retrieval_config = RetrievalConfiguration()
+    # Process text to extract claims; paragraphs and chunks are kept once
+    # per run and claims refer to them by id
+    if processor is None:
+        processor = QueryFormationProcessor(QueryFormationConfig(max_sentences=max_sentences))
+    tables = RecordTables()
+    baseline = ArticleBaseline.for_article(input_file, results_root) if reuse_previous else None
+    if batch_retrieval is not None:
+        prefetcher = None
+    claims = processor.process_markdown_sections(input_file, tables, baseline, prefetcher)
     
-    # Process text to extract claims
-    processor = QueryFormationProcessor(query_config)
-    claims = processor.process_markdown_sections(input_file)
+    # Unchanged claims keep their previous verdict
+    reused: Dict[int, Dict[str, Any]] = {}
+    if baseline is not None:
+        for idx, claim in enumerate(claims):
+            paragraph = tables.paragraphs[claim.paragraph_id]
+            fingerprint = sentence_fingerprint(paragraph.heading, paragraph.subheading, claim.sentence)
+            previous = baseline.verdict(fingerprint, claim.query)
+            if previous is not None:
+                reused[idx] = previous
+            tracing.record_outcome("verification", "new" if previous is None else "reused")
+        if reused:
+            logger.info("Reusing %d of %d verdicts from %s", len(reused), len(claims), baseline.results_dir.name)
+    pending = [claim for idx, claim in enumerate(claims) if idx not in reused]
     
-    # Verify each claim and store results
-    verified_claims = []
-    for idx, claim in enumerate(claims, 1):
-        print(f"\nVerifying claim {idx}/{len(claims)}: {claim['query']}")
-        
-        # Get relevant guidelines through RAG
-        retrieval_result = search_guidelines(
-            query=claim['query'],
-            verification_reasoning=claim['reasoning']
+    # Verify each claim (or all claims at once) and store results
+    if batch_retrieval is not None:
+        logger.info("Verifying %d claims in groups", len(pending))
+        new_results = iter(search_guidelines_batch(pending, batch_retrieval, shards))
+    else:
+        new_results = (
+            _verify_claim(idx, len(pending), claim, retrieval, shards, prefetcher)
+            for idx, claim in enumerate(pending, 1)
+        )
+    retrieval_results = (
+        reused[idx] if idx in reused else next(new_results)
+        for idx in range(len(claims))
+    )
+    
+    for idx, (claim, retrieval_result) in enumerate(zip(claims, retrieval_results), 1):
+        result = VerifiedClaim(
+            claim,
+            tables.add_chunks(retrieval_result.get('chunks', [])),
+            retrieval_result.get('verification', {})
         )
-        
-        result = {
-            "original_sentence": claim['sentence'],
-            "context_paragraph": claim['context']['paragraph'],
-            "verification_query": claim['query'],
-            "retrieved_chunks": retrieval_result.get('chunks', []),
-            "verification_result": retrieval_result.get('verification', {})
-        }
-        
-        verified_claims.append(result)
         
         # Save individual result
-        with open(results_dir / f"claim_{idx}.json", 'w', encoding='utf-8') as f:
-            json.dump(result, f, ensure_ascii=False, indent=2)
+        with tracing.span("result_writing"):
+            with open(results_dir / f"claim_{idx}.json", 'w', encoding='utf-8') as f:
+                json.dump(result.to_dict(), f, ensure_ascii=False, indent=2)
+    if prefetcher is not None:
+        prefetcher.clear()
+    
+    # Chunk and paragraph text, written once for all claims
+    with tracing.span("result_writing"):
+        tables.write(results_dir)
     
     # Save summary
     summary = {
-        "total_claims": len(verified_claims),
+        "total_claims": len(claims),
         "timestamp": timestamp,
         "input_file": str(input_file),
         "max_sentences": max_sentences
     }
+    if baseline is not None:
+        summary["reused_from"] = baseline.results_dir.name
+        summary["reused_claims"] = len(reused)
+    
+    with tracing.span("result_writing"):
+        with open(results_dir / "summary.json", 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+    
+    # Save per-stage timings and token usage next to the summary
+    tracer.write_report(results_dir / "trace.json")
+    
+    # Make the run queryable across the archive (results/index.sqlite)
+    update_index(results_dir)
     
-    with open(results_dir / "summary.json", 'w', encoding='utf-8') as f:
-        json.dump(summary, f, ensure_ascii=False, indent=2)
+    logger.info("Analysis complete! Results saved to: %s", results_dir)
     
-    print(f"\nAnalysis complete! Results saved to: {results_dir}")
+    # Format and display the first page of results
+    if show_results:
+        format_verification_results(results_dir)
     
-    # Format and display results
-    format_verification_results(results_dir)
+    return results_dir
 
-def search_guidelines(query: str, verification_reasoning: str) -> Dict[str, Any]:
-    """Search medical guidelines for verification."""
+def _verify_claim(
+    idx: int,
+    total: int,
+    claim: Claim,
+    graph: Optional[Any],
+    shards: Optional[List[str]],
+    prefetcher: Optional[RetrievalPrefetcher] = None
+) -> Dict[str, Any]:
+    logger.info("Verifying claim %d/%d: %s", idx, total, claim.query)
+    
+    # Get relevant guidelines through RAG
+    return search_guidelines(
+        query=claim.query,
+        verification_reasoning=claim.reasoning,
+        graph=graph,
+        shards=shards,
+        prefetched=prefetcher.take(claim.sentence, claim.query) if prefetcher is not None else None
+    )
+
+def _format_retrieval(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn retrieval graph output into the chunks/verification shape."""
+    # Extract results and include detailed chunk information
+    chunks_info = []
+    if "results" in result:
+        logger.debug("Processing %d retrieved chunks", len(result['results']))
+        for doc in result["results"]:
+            chunk_info = {
+                "content": doc.page_content,
+                "metadata": doc.metadata,
+                "score": doc.metadata.get("score", None),
+                "id": doc.id
+            }
+            chunks_info.append(chunk_info)
+    else:
+        logger.warning("No 'results' key in graph output")
+        
+    if result.get("verification_result"):
+        verification = result["verification_result"]
+    else:
+        verification = {
+            "status": "SUCCESS",
+            "messages": [str(msg.content) for msg in result["messages"]] if "messages" in result else []
+        }
+        
+    return {
+        "chunks": chunks_info,
+        "verification": verification
+    }
+
+def _search_failed(error: Exception) -> Dict[str, Any]:
+    logger.error("Search failed with error: %s", error)
+    return {
+        "chunks": [],
+        "verification": {
+            "status": "ERROR",
+            "reason": str(error)
+        }
+    }
+
+def search_guidelines(
+    query: str,
+    verification_reasoning: str,
+    graph: Optional[Any] = None,
+    shards: Optional[List[str]] = None,
+    prefetched: Optional[List[Document]] = None
+) -> Dict[str, Any]:
+    """Search medical guidelines for verification.
+    
+    ``prefetched`` hits (``RetrievalPrefetcher``) replace the graph's search.
+    """
+    if graph is None:
+        from retrieval_graph.graph import graph
+    
     try:
-        print(f"\nSearching guidelines for: {query}")
-        print(f"Verification reasoning: {verification_reasoning}")
+        logger.debug(
+            "Searching guidelines for: %s",
+            query,
+            extra={"verification_reasoning": verification_reasoning}
+        )
         
         # Initialize state with the query and reasoning
         state = RetrievalState(
             query=query,
-            verification_reasoning=verification_reasoning
+            verification_reasoning=verification_reasoning,
+            shards=shards,
+            results=prefetched or []
         )
         
         # Execute the pre-compiled graph
-        result = retrieval_graph.invoke(state)
+        return _format_retrieval(graph.invoke(state))
         
-        # Extract results and include detailed chunk information
-        chunks_info = []
-        if "results" in result:
-            print(f"Processing {len(result['results'])} retrieved chunks")
-            for doc in result["results"]:
-                chunk_info = {
-                    "content": doc.page_content,
-                    "metadata": doc.metadata,
-                    "score": doc.metadata.get("score", None)
-                }
-                chunks_info.append(chunk_info)
-        else:
-            print("WARNING: No 'results' key in graph output")
-            
-        return {
-            "chunks": chunks_info,
-            "verification": {
-                "status": "SUCCESS",
-                "messages": [str(msg.content) for msg in result["messages"]] if "messages" in result else []
-            }
-        }
+    except Exception as e:
+        return _search_failed(e)
+
+def search_guidelines_batch(
+    claims: Sequence[Claim],
+    graph: Any,
+    shards: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """Search and verify many claims with the batch retrieval graph.
+    
+    Returns:
+        One ``search_guidelines`` result per claim, in order
+    """
+    if not claims:
+        return []
+    
+    try:
+        result = graph.invoke(BatchRetrievalState(
+            queries=[claim.query for claim in claims],
+            verification_reasonings=[claim.reasoning for claim in claims],
+            shards=shards
+        ))
+        return [
+            _format_retrieval({"results": docs, "verification_result": verdict})
+            for docs, verdict in zip(result["results"], result["verification_results"])
+        ]
         
     except Exception as e:
-        print(f"Search failed with error: {str(e)}")
-        return {
-            "chunks": [],
-            "verification": {
-                "status": "ERROR",
-                "reason": str(e)
-            }
-        }
+        return [_search_failed(e)] * len(claims)
+
+async def asearch_guidelines(
+    query: str,
+    verification_reasoning: str,
+    graph: Optional[Any] = None,
+    shards: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """Async ``search_guidelines`` running the graph's native async nodes."""
+    if graph is None:
+        from retrieval_graph.graph import graph
+    
+    try:
+        state = RetrievalState(
+            query=query,
+            verification_reasoning=verification_reasoning,
+            shards=shards
+        )
+        return _format_retrieval(await graph.ainvoke(state))
+        
+    except Exception as e:
+        return _search_failed(e)
+
+async def averify_claims(
+    claims: List[Claim],
+    tables: RecordTables,
+    graph: Optional[Any] = None,
+    shards: Optional[List[str]] = None,
+    max_concurrency: int = 100
+) -> List[VerifiedClaim]:
+    """Verify many claims concurrently on one event loop.
+    
+    Args:
+        claims: Claims as returned by ``QueryFormationProcessor``
+        tables: Run tables that receive the retrieved chunks
+        graph: Compiled retrieval graph (defaults to the shared graph)
+        shards: Guideline shards or topics to search
+        max_concurrency: Maximum claims in flight at once
+        
+    Returns:
+        One result per claim, in input order
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def verify(claim: Claim) -> VerifiedClaim:
+        async with semaphore:
+            retrieval_result = await asearch_guidelines(
+                query=claim.query,
+                verification_reasoning=claim.reasoning,
+                graph=graph,
+                shards=shards
+            )
+        return VerifiedClaim(
+            claim,
+            tables.add_chunks(retrieval_result.get('chunks', [])),
+            retrieval_result.get('verification', {})
+        )
+    
+    return list(await asyncio.gather(*(verify(claim) for claim in claims)))
 
 def main():
     """Main execution function."""
@@ -167,8 +383,20 @@ def main():
     import argparse
     parser = argparse.ArgumentParser(description='Process and verify medical claims.')
     parser.add_argument('--max-sentences', type=int, help='Maximum number of sentences to process')
+    parser.add_argument('--log-level', default='INFO', help='Console log level (DEBUG shows per-query details)')
+    parser.add_argument('--group-size', type=int, default=1, help='Verify up to this many claims with overlapping evidence per LLM call')
+    parser.add_argument('--log-json', type=Path, help='Also write all log records as JSON lines to this file')
+    parser.add_argument('--full', action='store_true', help='Re-check every sentence instead of reusing results of the previous run')
+    parser.add_argument('--speculative', action='store_true', help='Search each sentence while it is classified and reuse the hits for its claim')
+    parser.add_argument('--tokens-per-minute', type=int, help='OpenAI token budget; this run gets the batch share of it')
     args = parser.parse_args()
     
+    configure_logging(args.log_level.upper(), json_file=args.log_json)
+    if args.tokens_per_minute:
+        scheduling.set_scheduler(scheduling.RequestScheduler(
+            scheduling.SchedulerConfiguration(tokens_per_minute=args.tokens_per_minute)
+        ))
+    
     # First, index the guidelines if needed
     index_guidelines()
     
@@ -176,10 +404,36 @@ def main():
     project_root = Path(__file__).parent.parent
     article_path = project_root / "input" / "asthma" / "article" / "article.md"
     
-    process_and_verify_claims(
-        input_file=article_path,
-        max_sentences=args.max_sentences
-    )
+    shards = [topic_of(article_path, project_root / "input")]
+    
+    batch_retrieval = retrieval = prefetcher = None
+    if args.group_size > 1:
+        from retrieval_graph.builder import create_batch_retrieval_graph
+        batch_retrieval = create_batch_retrieval_graph(
+            RetrievalConfiguration(synthesis_group_size=args.group_size)
+        )
+    elif args.speculative:
+        # The prefetcher and the graph share one searcher
+        from retrieval_graph.builder import create_retrieval_graph
+        from retrieval_graph.search import open_searcher
+        config = RetrievalConfiguration(speculative_prefetch=True)
+        searcher = open_searcher(config)
+        retrieval = create_retrieval_graph(config, searcher=searcher)
+        prefetcher = RetrievalPrefetcher(searcher, config, shards=shards)
+    
+    try:
+        process_and_verify_claims(
+            input_file=article_path,
+            max_sentences=args.max_sentences,
+            retrieval=retrieval,
+            shards=shards,
+            batch_retrieval=batch_retrieval,
+            reuse_previous=not args.full,
+            prefetcher=prefetcher
+        )
+    finally:
+        if prefetcher is not None:
+            prefetcher.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
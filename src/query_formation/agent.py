@@ -1,20 +1,21 @@
 import json
-import logging
-from typing import Dict, Any
-from pathlib import Path
+from typing import Dict, Any, List, Optional
+from langchain_core.messages import BaseMessage
 from langchain_openai import ChatOpenAI
-from datetime import datetime
 
 from .configuration import QueryFormationConfig
 from .state import QueryContext
 from .prompts import QUERY_FORMATION_PROMPT, QUERY_FORMATION_PROMPT_CONFIG
+from shared import scheduling, tracing
+from shared.logging_utils import get_logger
+from shared.records import ANALYSIS_ERROR_PREFIX
 
 class QueryFormationAgent:
     """Agent for analyzing and forming verification queries from medical text."""
     
-    def __init__(self, config: QueryFormationConfig):
+    def __init__(self, config: QueryFormationConfig, llm: Optional[Any] = None):
         self.config = config
-        base_model = ChatOpenAI(
+        base_model = llm or ChatOpenAI(
             model=config.llm_model,
             temperature=config.temperature
         )
@@ -24,59 +25,80 @@ class QueryFormationAgent:
             tools=QUERY_FORMATION_PROMPT_CONFIG
         )
         
-        # Setup logging
-        log_dir = Path(config.log_directory)
-        log_dir.mkdir(parents=True, exist_ok=True)
-        
-        self.logger = logging.getLogger("query_formation")
-        if not self.logger.handlers:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            file_handler = logging.FileHandler(
-                log_dir / f"query_formation_{timestamp}.log",
-                encoding='utf-8'
-            )
-            self.logger.addHandler(file_handler)
-            self.logger.setLevel(logging.INFO)
+        # Result persistence is owned by QueryFormationLogger; this is only
+        # the shared diagnostics logger
+        self.logger = get_logger("query_formation")
         
         self.prompt = QUERY_FORMATION_PROMPT
 
-    def analyze_sentence(self, sentence: str, context: QueryContext) -> Dict[str, Any]:
-        """Analyze a sentence to determine if it needs verification."""
+    def _too_short(self, sentence: str) -> bool:
+        return len(sentence.strip()) < self.config.min_claim_length
+    
+    def _messages(self, sentence: str, context: QueryContext) -> List[BaseMessage]:
+        return self.prompt.format_messages(
+            heading=context.heading,
+            subheading=context.subheading,
+            paragraph=context.paragraph,
+            sentence=sentence
+        )
+    
+    @staticmethod
+    def _parse_response(response: Any) -> Dict[str, Any]:
+        tracing.record_usage("classification", response)
         
-        if len(sentence.strip()) < self.config.min_claim_length:
-            return {
-                "needs_verification": False,
-                "query": None,
-                "reasoning": "Satz ist zu kurz für eine überprüfbare Aussage"
-            }
+        if response.additional_kwargs.get('tool_calls'):
+            tool_call = response.additional_kwargs['tool_calls'][0]
+            return json.loads(tool_call['function']['arguments'])
         
-        prompt_vars = {
-            "heading": context.heading,
-            "subheading": context.subheading,
-            "paragraph": context.paragraph,
-            "sentence": sentence
+        return {
+            "needs_verification": False,
+            "query": None,
+            "reasoning": f"{ANALYSIS_ERROR_PREFIX}: Keine Tool-Antwort erhalten"
+        }
+    
+    @staticmethod
+    def _short_result() -> Dict[str, Any]:
+        return {
+            "needs_verification": False,
+            "query": None,
+            "reasoning": "Satz ist zu kurz für eine überprüfbare Aussage"
+        }
+    
+    @staticmethod
+    def _error_result(error: Exception) -> Dict[str, Any]:
+        return {
+            "needs_verification": False,
+            "query": None,
+            "reasoning": f"{ANALYSIS_ERROR_PREFIX}: {str(error)}"
         }
+    
+    @tracing.traced("classification")
+    def analyze_sentence(self, sentence: str, context: QueryContext) -> Dict[str, Any]:
+        """Analyze a sentence to determine if it needs verification."""
+        
+        if self._too_short(sentence):
+            return self._short_result()
         
         try:
-            messages = self.prompt.format_messages(**prompt_vars)
-            response = self.llm.invoke(messages)
-            
-            if response.additional_kwargs.get('tool_calls'):
-                tool_call = response.additional_kwargs['tool_calls'][0]
-                return json.loads(tool_call['function']['arguments'])
+            response = scheduling.invoke(self.llm, self._messages(sentence, context))
+            return self._parse_response(response)
             
-            return {
-                "needs_verification": False,
-                "query": None,
-                "reasoning": "Fehler bei der Analyse: Keine Tool-Antwort erhalten"
-            }
+        except Exception as e:
+            return self._error_result(e)
+    
+    @tracing.traced("classification")
+    async def aanalyze_sentence(self, sentence: str, context: QueryContext) -> Dict[str, Any]:
+        """Async ``analyze_sentence`` using the model's native ``ainvoke``."""
+        
+        if self._too_short(sentence):
+            return self._short_result()
+        
+        try:
+            response = await scheduling.ainvoke(self.llm, self._messages(sentence, context))
+            return self._parse_response(response)
             
         except Exception as e:
-            return {
-                "needs_verification": False,
-                "query": None,
-                "reasoning": f"Fehler bei der Analyse: {str(e)}"
-            }
+            return self._error_result(e)
 
     def process_text(self, text: str, context: QueryContext) -> Dict[str, Any]:
         """Process a complete text, analyzing each sentence."""
@@ -1,49 +1,85 @@
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Any, List, Dict, Optional
 from datetime import datetime
 from .agent import QueryFormationAgent
 from .configuration import QueryFormationConfig
 from .state import QueryContext
+from shared.baseline import ArticleBaseline
 from shared.logging_utils import QueryFormationLogger
+from shared.records import Claim, RecordTables, analysis_failed, sentence_fingerprint
+from shared import tracing
 
 class QueryFormationProcessor:
     """Processes text documents to extract verifiable medical claims."""
     
-    def __init__(self, config: QueryFormationConfig):
+    def __init__(self, config: QueryFormationConfig, agent: Optional[QueryFormationAgent] = None):
         self.config = config
-        self.agent = QueryFormationAgent(config)
-        self.logger = QueryFormationLogger()
+        self.agent = agent or QueryFormationAgent(config)
+        self.logger = QueryFormationLogger(config.log_directory)
+        self.tables = RecordTables()
         
-    def process_markdown_sections(self, file_path: Path) -> List[Dict[str, Any]]:
-        """Process a markdown file and extract verifiable claims."""
+    def process_markdown_sections(
+        self,
+        file_path: Path,
+        tables: Optional[RecordTables] = None,
+        baseline: Optional[ArticleBaseline] = None,
+        prefetcher: Optional[Any] = None
+    ) -> List[Claim]:
+        """Process a markdown file and extract verifiable claims.
+        
+        Args:
+            file_path: Markdown article
+            tables: Run tables that receive the paragraphs the claims refer
+                to and the sentence classifications (defaults to ``self.tables``)
+            baseline: Previous run of the article; sentences it contains
+                keep their classification without an LLM call
+            prefetcher: ``RetrievalPrefetcher`` that searches each sentence
+                while it is classified; claims take the hits from it later
+        """
+        tables = tables if tables is not None else self.tables
         if not file_path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
             
         sections = self._read_markdown_sections(file_path)
         verified_claims = []
         
-        for section in sections:
-            if not section["paragraph"]:
-                continue
+        try:
+            for section in sections:
+                if not section["paragraph"]:
+                    continue
                 
-            context = QueryContext(
-                heading=section["heading"],
-                subheading=section["subheading"],
-                paragraph=section["paragraph"]
-            )
-            
-            # Process sentences in the paragraph
-            claims = self._process_section(section["paragraph"], context)
-            verified_claims.extend(claims)
-            
-            # Check if we've reached the maximum sentences (if configured)
-            if self.config.max_sentences and len(verified_claims) >= self.config.max_sentences:
-                break
+                context = QueryContext(
+                    heading=section["heading"],
+                    subheading=section["subheading"],
+                    paragraph=section["paragraph"]
+                )
                 
+                # Process sentences in the paragraph
+                paragraph_id = tables.add_paragraph(
+                    section["heading"], section["subheading"], section["paragraph"]
+                )
+                claims = self._process_section(section["paragraph"], context, paragraph_id, tables, baseline, prefetcher)
+                verified_claims.extend(claims)
+                
+                # Check if we've reached the maximum sentences (if configured)
+                if self.config.max_sentences and len(verified_claims) >= self.config.max_sentences:
+                    break
+
+        finally:
+            # Persist the summary and flush streamed results, even on failure
+            self.logger.save_results()
+            
         return verified_claims
     
+    @tracing.traced("article_parsing")
     def _read_markdown_sections(self, file_path: Path) -> List[Dict[str, str]]:
         """Read markdown file and split into sections with headings."""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return self.parse_markdown_sections(f.read())
+    
+    @staticmethod
+    def parse_markdown_sections(text: str) -> List[Dict[str, str]]:
+        """Split markdown text into sections with headings."""
         sections = []
         current_section = {
             "heading": "",
@@ -51,11 +87,8 @@ class QueryFormationProcessor:
             "content": [],
             "paragraph": ""
         }
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
             
-        for line in lines:
+        for line in text.splitlines():
             line = line.strip()
             if not line:
                 if current_section["content"]:
@@ -86,27 +119,49 @@ class QueryFormationProcessor:
             
         return sections
     
-    def _process_section(self, text: str, context: QueryContext) -> List[Dict[str, Any]]:
+    @staticmethod
+    def split_sentences(text: str) -> List[str]:
+        """Split a paragraph into non-empty sentences."""
+        return [
+            sentence.strip()
+            for sentence in text.split(". ")
+            if sentence.strip()
+        ]
+    
+    def _process_section(
+        self,
+        text: str,
+        context: QueryContext,
+        paragraph_id: str,
+        tables: Optional[RecordTables] = None,
+        baseline: Optional[ArticleBaseline] = None,
+        prefetcher: Optional[Any] = None
+    ) -> List[Claim]:
         """Process a section of text and extract verifiable claims."""
-        sentences = text.split(". ")
         claims = []
         
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if not sentence:
-                continue
-                
-            result = self.agent.analyze_sentence(sentence, context)
+        for sentence in self.split_sentences(text):
+            fingerprint = sentence_fingerprint(context.heading, context.subheading, sentence)
+            result = baseline.classification(fingerprint) if baseline is not None else None
+            if result is None:
+                # Short sentences are rejected without an LLM call
+                if prefetcher is not None and len(sentence.strip()) >= self.config.min_claim_length:
+                    prefetcher.start(sentence)
+                result = self.agent.analyze_sentence(sentence, context)
+                if baseline is not None:
+                    tracing.record_outcome("classification", "new")
+            else:
+                tracing.record_outcome("classification", "reused")
+            # Failed classifications are not kept for reuse
+            if tables is not None and not analysis_failed(result):
+                tables.add_sentence(paragraph_id, sentence, result)
             
             # Log the analysis using the logger
             self.logger.log_analysis(sentence, vars(context), result)
             
             if result["needs_verification"]:
-                claims.append({
-                    "sentence": sentence,
-                    "query": result["query"],
-                    "reasoning": result["reasoning"],
-                    "context": vars(context)
-                })
+                claims.append(Claim(sentence, result["query"], result["reasoning"], paragraph_id))
+            elif prefetcher is not None:
+                prefetcher.discard(sentence)
                 
         return claims 
\ No newline at end of file
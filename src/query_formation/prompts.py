@@ -23,16 +23,18 @@ WICHTIG: Bei der Formatierung der Anfragen:
 
 WICHTIG: Gib alle Antworten auf Deutsch zurück, einschließlich der Begründung."""),
     
-    ("user", """Analysiere den folgenden Satz in seinem Kontext:
-
-Kontext:
+    
+    # Stable prefix first, variable suffix last: the instructions and the
+    # paragraph context are identical for every sentence of a paragraph, so
+    # consecutive calls share a long prefix that the provider can cache
+    ("user", """Kontext:
 Überschrift: {heading}
 Unterüberschrift: {subheading}
-Absatz: {paragraph}
-
-Zu analysierender Satz: {sentence}
+Absatz: {paragraph}"""),
+    
+    ("user", """Analysiere den folgenden Satz im obigen Kontext.
 
-""")
+Zu analysierender Satz: {sentence}""")
 ]) 
 
 QUERY_FORMATION_PROMPT_CONFIG = [{
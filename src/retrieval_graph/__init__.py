@@ -1,6 +1,14 @@
 """Retrieval Graph Module for semantic search functionality."""
 
-from retrieval_graph.graph import graph
 from retrieval_graph.configuration import RetrievalConfiguration
 
-__all__ = ["graph", "RetrievalConfiguration"] 
\ No newline at end of file
+__all__ = ["graph", "RetrievalConfiguration"]
+
+
+def __getattr__(name: str):
+    """Build the default graph on first access rather than at import time."""
+    if name == "graph":
+        from retrieval_graph.graph import graph
+        globals()["graph"] = graph
+        return graph
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
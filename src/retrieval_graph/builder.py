@@ -0,0 +1,196 @@
+from typing import Dict, Any, List, Optional, Tuple
+from langgraph.graph import StateGraph, START, END
+from langchain_openai import ChatOpenAI
+from langchain_chroma import Chroma
+from langchain_core.runnables import RunnableLambda
+import asyncio
+
+from retrieval_graph.state import BatchRetrievalState, RetrievalState
+from retrieval_graph.configuration import RetrievalConfiguration
+from retrieval_graph.search import (
+    create_searcher,
+    create_sharded_searcher,
+    make_async_batch_search_node,
+    make_async_search_node,
+    make_batch_search_node,
+    make_search_node
+)
+from retrieval_graph.synthesis import Synthesizer, group_claims
+from shared.utils import check_hnsw_configuration, setup_embeddings
+from shared.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+def _components(
+    config: RetrievalConfiguration,
+    vectorstore: Optional[Chroma],
+    llm: Optional[Any],
+    searcher: Optional[Any],
+    escalation_llm: Optional[Any]
+) -> Tuple[Any, Synthesizer]:
+    """Searcher and synthesizer shared by the single and batch graphs."""
+    cache_dir = None
+    if searcher is None and vectorstore is None and config.sharded:
+        searcher = create_sharded_searcher(
+            config,
+            setup_embeddings(config.embedding_model, config.embedding_dimensions)
+        )
+    elif vectorstore is None and searcher is None:
+        cache_dir = config.vector_store_dir / "exact"
+        embeddings = setup_embeddings(config.embedding_model, config.embedding_dimensions)
+        vectorstore = Chroma(
+            collection_name=config.collection_name,
+            embedding_function=embeddings,
+            persist_directory=str(config.vector_store_dir),
+            collection_metadata=config.hnsw.to_metadata()
+        )
+    
+    if vectorstore is not None:
+        logger.info(
+            "Initialized vector store from %s (collection %s, %d chunks)",
+            config.vector_store_dir,
+            config.collection_name,
+            vectorstore._collection.count()
+        )
+        check_hnsw_configuration(vectorstore._collection, config.hnsw)
+    
+    if llm is None:
+        llm = ChatOpenAI(model=config.llm_model)
+    if escalation_llm is None and config.escalation_model:
+        escalation_llm = ChatOpenAI(model=config.escalation_model)
+    
+    searcher = searcher or create_searcher(vectorstore, config, cache_dir=cache_dir)
+    return searcher, Synthesizer(config, llm, escalation_llm)
+
+def create_retrieval_graph(
+    config: RetrievalConfiguration,
+    vectorstore: Optional[Chroma] = None,
+    llm: Optional[Any] = None,
+    searcher: Optional[Any] = None,
+    escalation_llm: Optional[Any] = None
+) -> StateGraph:
+    """Create the retrieval workflow graph.
+    
+    Args:
+        config: Retrieval configuration
+        vectorstore: Pre-built vector store (defaults to the persistent
+            Chroma collection from ``config``, or all registered shards
+            when ``config.sharded`` is set)
+        llm: Chat model for synthesis (defaults to ``ChatOpenAI``); the
+            synthesis tools are bound to it here
+        searcher: Search backend used by the search node (defaults to
+            ``create_searcher``: exact NumPy search for small collections,
+            Chroma otherwise)
+        escalation_llm: Stronger chat model that re-checks uncertain
+            verdicts (defaults to ``ChatOpenAI(config.escalation_model)``
+            when an escalation model is configured, otherwise no cascade)
+    """
+    
+    searcher, synthesizer = _components(config, vectorstore, llm, searcher, escalation_llm)
+    
+    # Define graph nodes
+    search_node = make_search_node(searcher, config)
+    asearch_node = make_async_search_node(searcher, config)
+    
+    def synthesize_node(state: RetrievalState) -> Dict[str, Any]:
+        """Synthesize results into a coherent response."""
+        return {"verification_result": synthesizer.synthesize(
+            state.query, state.verification_reasoning, state.results
+        )}
+    
+    async def asynthesize_node(state: RetrievalState) -> Dict[str, Any]:
+        """Async ``synthesize_node`` using the model's native ``ainvoke``."""
+        return {"verification_result": await synthesizer.asynthesize(
+            state.query, state.verification_reasoning, state.results
+        )}
+    
+    # Create and compile graph
+    workflow = StateGraph(RetrievalState)
+    
+    # Add nodes
+    # Each node has a sync and a native async implementation: graph.invoke
+    # runs the former, graph.ainvoke/astream the latter
+    workflow.add_node("search", RunnableLambda(search_node, afunc=asearch_node, name="search"))
+    workflow.add_node("synthesize", RunnableLambda(synthesize_node, afunc=asynthesize_node, name="synthesize"))
+    
+    # Add edges
+    workflow.add_edge(START, "search")
+    workflow.add_edge("search", "synthesize")
+    workflow.add_edge("synthesize", END)
+    
+    return workflow.compile()
+
+def create_batch_retrieval_graph(
+    config: RetrievalConfiguration,
+    vectorstore: Optional[Chroma] = None,
+    llm: Optional[Any] = None,
+    searcher: Optional[Any] = None,
+    escalation_llm: Optional[Any] = None
+) -> StateGraph:
+    """Create the workflow that verifies many claims at once.
+    
+    All queries are searched in one batch. Claims whose retrieved chunks
+    overlap are then grouped (``synthesis_group_size``,
+    ``group_min_overlap``), and each group is verified in one synthesis
+    call over the shared context.
+    
+    Args:
+        config: Retrieval configuration
+        vectorstore: As for ``create_retrieval_graph``
+        llm: As for ``create_retrieval_graph``
+        searcher: As for ``create_retrieval_graph``
+        escalation_llm: As for ``create_retrieval_graph``
+    """
+    searcher, synthesizer = _components(config, vectorstore, llm, searcher, escalation_llm)
+    
+    search_node = make_batch_search_node(searcher, config)
+    asearch_node = make_async_batch_search_node(searcher, config)
+    
+    def group_node(state: BatchRetrievalState) -> Dict[str, Any]:
+        """Cluster claims by overlapping retrieved chunks."""
+        groups = group_claims(
+            [[doc.id or doc.page_content for doc in docs] for docs in state.results],
+            config.synthesis_group_size,
+            config.group_min_overlap
+        )
+        logger.debug("Grouped %d claims into %d synthesis calls", len(state.queries), len(groups))
+        return {"groups": groups}
+    
+    def group_items(state: BatchRetrievalState, group: List[int]):
+        return [
+            (state.queries[i], state.verification_reasonings[i], state.results[i])
+            for i in group
+        ]
+    
+    def collect(state: BatchRetrievalState, verdicts: List[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        verification_results: List[Optional[Dict[str, Any]]] = [None] * len(state.queries)
+        for group, group_verdicts in zip(state.groups, verdicts):
+            for i, verdict in zip(group, group_verdicts):
+                verification_results[i] = verdict
+        return {"verification_results": verification_results}
+    
+    def synthesize_node(state: BatchRetrievalState) -> Dict[str, Any]:
+        """Verify every group of claims."""
+        return collect(state, [
+            synthesizer.synthesize_group(group_items(state, group))
+            for group in state.groups
+        ])
+    
+    async def asynthesize_node(state: BatchRetrievalState) -> Dict[str, Any]:
+        """Verify every group of claims concurrently."""
+        return collect(state, await asyncio.gather(*(
+            synthesizer.asynthesize_group(group_items(state, group))
+            for group in state.groups
+        )))
+    
+    workflow = StateGraph(BatchRetrievalState)
+    workflow.add_node("search", RunnableLambda(search_node, afunc=asearch_node, name="search"))
+    workflow.add_node("group", group_node)
+    workflow.add_node("synthesize", RunnableLambda(synthesize_node, afunc=asynthesize_node, name="synthesize"))
+    
+    workflow.add_edge(START, "search")
+    workflow.add_edge("search", "group")
+    workflow.add_edge("group", "synthesize")
+    workflow.add_edge("synthesize", END)
+    
+    return workflow.compile()
@@ -1,6 +1,6 @@
 from dataclasses import dataclass, field
-from typing import Annotated
-from shared.configuration import BaseConfiguration
+from typing import Annotated, List, Optional
+from shared.configuration import BaseConfiguration, HnswConfiguration
 from pathlib import Path
 
 @dataclass
@@ -9,15 +9,93 @@ class RetrievalConfiguration:
     
     # Model settings
     embedding_model: str = "text-embedding-3-small"
+    embedding_dimensions: Optional[int] = field(
+        default=None,
+        metadata={"description": "Shortened embedding size; must match the indexed collection"}
+    )
     llm_model: str = "gpt-4o-mini"
     
+    # Model cascade: llm_model settles most claims, uncertain ones go to a
+    # stronger model
+    escalation_model: Optional[str] = field(
+        default=None,
+        metadata={"description": "Stronger model for verdicts llm_model is unsure about (no cascade if None)"}
+    )
+    escalation_confidence: float = field(
+        default=0.7,
+        metadata={"description": "Escalate verdicts with a lower confidence_score"}
+    )
+    escalation_statuses: List[str] = field(
+        default_factory=lambda: ["UNCLEAR", "ERROR"],
+        metadata={"description": "Escalate verdicts with these statuses"}
+    )
+    
     # Vector store settings
     collection_name: str = "guidelines"  # Updated to match index configuration
     vector_store_dir: Path = Path("vector_store")
     
+    sharded: bool = field(
+        default=False,
+        metadata={"description": "Search the per-guideline/topic collections listed in shards.json"}
+    )
+    shard_search_workers: int = field(
+        default=8,
+        metadata={"description": "Maximum shards searched in parallel"}
+    )
+    
+    hnsw: HnswConfiguration = field(
+        default_factory=HnswConfiguration,
+        metadata={"description": "Expected HNSW parameters; must match the indexed collection"}
+    )
+    
     # Search settings
     top_k: int = 5
     
+    search_backend: str = field(
+        default="auto",
+        metadata={"description": "chroma (HNSW), numpy (exact, in memory) or auto"}
+    )
+    exact_search_max_chunks: int = field(
+        default=20_000,
+        metadata={"description": "Largest collection searched exactly when search_backend is auto"}
+    )
+    exact_search_precision: str = field(
+        default="float32",
+        metadata={"description": "Candidate matrix type for numpy search: float32, float16 or int8"}
+    )
+    exact_search_dimensions: Optional[int] = field(
+        default=None,
+        metadata={"description": "Leading embedding dimensions used to find candidates (all if None)"}
+    )
+    rescore_candidates: int = field(
+        default=50,
+        metadata={"description": "Candidates per query re-ranked at full precision"}
+    )
+    
+    # Speculative retrieval: search the raw sentence while it is classified
+    speculative_prefetch: bool = field(
+        default=False,
+        metadata={"description": "Search each sentence during classification and reuse the hits for its claim"}
+    )
+    prefetch_min_similarity: float = field(
+        default=0.9,
+        metadata={"description": "Minimum similarity of the verification query to the sentence for prefetched hits to be used"}
+    )
+    prefetch_workers: int = field(
+        default=4,
+        metadata={"description": "Maximum prefetch searches in flight"}
+    )
+    
+    # Grouped synthesis (batch retrieval graph)
+    synthesis_group_size: int = field(
+        default=4,
+        metadata={"description": "Maximum claims verified in one synthesis call (1 disables grouping)"}
+    )
+    group_min_overlap: float = field(
+        default=0.6,
+        metadata={"description": "Minimum share of a claim's retrieved chunks a group must already contain"}
+    )
+    
     similarity_threshold: float = field(
         default=0.7,
         metadata={"description": "Minimum similarity score for results"}
@@ -0,0 +1,185 @@
+"""Speculative retrieval while sentences are being classified.
+
+The verification query formed by ``QueryFormationAgent`` is usually
+``verify: <sentence>``, yet retrieval only starts once the classification
+round-trip has returned it. ``RetrievalPrefetcher`` searches that predicted
+query while the classification call is still in flight. When the claim
+comes back with the predicted query, or a near-identical one, the
+prefetched hits are put into ``RetrievalState.results`` and the search node
+skips its own embedding and search call. Otherwise, and for sentences that
+need no verification, the hits are discarded.
+"""
+
+import asyncio
+import difflib
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+
+from retrieval_graph.configuration import RetrievalConfiguration
+from retrieval_graph.search import ChromaSearcher, ShardedSearcher, _scored_docs
+from shared import tracing
+from shared.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_QUERY_PREFIX = re.compile(r"^\s*verify:\s*", re.IGNORECASE)
+
+def _normalize(text: str) -> str:
+    text = _QUERY_PREFIX.sub("", text)
+    return _WHITESPACE.sub(" ", text).strip().rstrip(".!?;: ").casefold()
+
+def predicted_query(sentence: str) -> str:
+    """Verification query the agent forms for most claims."""
+    return f"verify: {sentence.strip()}"
+
+def query_similarity(sentence: str, query: str) -> float:
+    """Similarity of a verification query to its sentence (1.0 = same text).
+
+    The ``verify:`` prefix, case, whitespace and final punctuation are ignored.
+    """
+    sentence, query = _normalize(sentence), _normalize(query)
+    if sentence == query:
+        return 1.0
+    return difflib.SequenceMatcher(None, sentence, query, autojunk=False).ratio()
+
+class RetrievalPrefetcher:
+    """Search sentences speculatively and hand out the hits per claim.
+
+    Searchers with ``submit(query, k)`` (the service's ``SearchBatcher``)
+    batch prefetches with their other requests; other searchers run them
+    on a small thread pool.
+
+    Args:
+        searcher: Search backend shared with the retrieval graph
+        config: Retrieval configuration (uses ``top_k``,
+            ``prefetch_min_similarity`` and ``prefetch_workers``)
+        shards: Guideline shards or topics to search (sharded searcher only)
+    """
+
+    def __init__(
+        self,
+        searcher: Any,
+        config: RetrievalConfiguration,
+        shards: Optional[Sequence[str]] = None
+    ):
+        if isinstance(searcher, Chroma):
+            searcher = ChromaSearcher(searcher)
+        self.searcher = searcher
+        self.config = config
+        self.shards = list(shards) if shards else None
+        # Sentence -> (search, claims still expected to take it)
+        self._pending: Dict[str, Tuple[Future, int]] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if not hasattr(searcher, "submit"):
+            self._executor = ThreadPoolExecutor(
+                max_workers=config.prefetch_workers,
+                thread_name_prefix="prefetch"
+            )
+
+    def submit(self, sentence: str) -> Future:
+        """Start searching a sentence; the future resolves to its ranked hits."""
+        query = predicted_query(sentence)
+        if self._executor is None:
+            return self.searcher.submit(query, self.config.top_k)
+        return self._executor.submit(self._search, query)
+
+    def _search(self, query: str):
+        if self.shards and isinstance(self.searcher, ShardedSearcher):
+            return self.searcher.search([query], self.config.top_k, shards=self.shards)[0]
+        return self.searcher.search([query], self.config.top_k)[0]
+
+    def _usable(self, future: Future, sentence: str, query: Optional[str], cancel: bool = True) -> bool:
+        if query is None or query_similarity(sentence, query) < self.config.prefetch_min_similarity:
+            if cancel:
+                future.cancel()
+            tracing.record_outcome("prefetch", "miss")
+            return False
+        return True
+
+    def _hits(self, future: Future) -> Optional[List[Document]]:
+        if future.cancelled() or future.exception() is not None:
+            # The search node retries on its own
+            tracing.record_outcome("prefetch", "failed")
+            return None
+        tracing.record_outcome("prefetch", "hit")
+        return _scored_docs(future.result())
+
+    def _wait(self, future: Future) -> Optional[List[Document]]:
+        try:
+            future.result()
+        except Exception:
+            pass
+        return self._hits(future)
+
+    def result(self, future: Future, sentence: str, query: Optional[str]) -> Optional[List[Document]]:
+        """Prefetched hits for the claim's query, or None if it differs too much.
+
+        Blocks until the search has finished.
+        """
+        if not self._usable(future, sentence, query):
+            return None
+        return self._wait(future)
+
+    async def aresult(self, future: Future, sentence: str, query: Optional[str]) -> Optional[List[Document]]:
+        """Async ``result`` that awaits the search without blocking the event loop."""
+        if not self._usable(future, sentence, query):
+            return None
+        try:
+            await asyncio.wrap_future(future)
+        except Exception:
+            pass
+        return self._hits(future)
+
+    def cancel(self, future: Future) -> None:
+        """Drop a prefetch whose sentence needs no verification."""
+        future.cancel()
+        tracing.record_outcome("prefetch", "discarded")
+
+    def start(self, sentence: str) -> None:
+        """Prefetch a sentence for a later ``take``; repeated sentences share one search."""
+        with self._lock:
+            future, count = self._pending.get(sentence, (None, 0))
+            self._pending[sentence] = (future or self.submit(sentence), count + 1)
+
+    def _release(self, sentence: str) -> Tuple[Optional[Future], bool]:
+        """Pending search of a sentence and whether no other occurrence needs it."""
+        with self._lock:
+            future, count = self._pending.pop(sentence, (None, 0))
+            if count > 1:
+                self._pending[sentence] = (future, count - 1)
+            return future, count == 1
+
+    def take(self, sentence: str, query: Optional[str]) -> Optional[List[Document]]:
+        """Hits started for ``sentence`` if they can serve ``query``, else None."""
+        future, last = self._release(sentence)
+        if future is None or not self._usable(future, sentence, query, cancel=last):
+            return None
+        return self._wait(future)
+
+    def discard(self, sentence: str) -> None:
+        """Drop the prefetch of a sentence that needs no verification."""
+        future, last = self._release(sentence)
+        if future is not None and last:
+            self.cancel(future)
+
+    def clear(self) -> None:
+        """Drop all prefetches that were never taken."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for future, _ in pending.values():
+            future.cancel()
+        if pending:
+            logger.debug("Dropped %d unused prefetches", len(pending))
+
+    def close(self) -> None:
+        """Drop pending prefetches and stop the worker threads."""
+        self.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
@@ -1,3 +1,5 @@
+from langchain_core.prompts import ChatPromptTemplate
+
 VERIFICATION_QUERY_TEMPLATE = """In diesem Absatz:
 "{context_paragraph}"
 
@@ -8,13 +10,11 @@ Bitte formuliere eine präzise Verifizierungsanfrage, die wir gegen die medizini
 
 Die Anfrage sollte mit "verify:" beginnen und in einem neutralen, sachlichen Ton formuliert sein."""
 
-RESULT_SYNTHESIS_PROMPT = """Basierend auf den medizinischen Leitlinien, analysiere bitte folgende Aussage:
-
-Kontext: {context}
-Zu überprüfende Aussage: {query}
-
-Ursprüngliche Begründung für Überprüfung:
-{verification_reasoning}
+# Fixed instructions go into the system message and the per-claim guideline
+# excerpts, claim and reasoning come last, so every synthesis call starts
+# with the same prefix (tools + instructions) that the provider can cache
+RESULT_SYNTHESIS_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """Du überprüfst Aussagen aus medizinischen Artikeln anhand von Auszügen aus medizinischen Leitlinien.
 
 Deine Aufgabe:
 1. Vergleiche die Aussage mit den Leitlinien
@@ -29,7 +29,16 @@ WICHTIG:
 - Bei Konflikten oder Aktualisierungsbedarf als FLAGGED markieren
 - Bei Übereinstimmung mit Leitlinien als VALID markieren
 
-Formatiere deine Antwort als strukturiertes JSON gemäß der vorgegebenen Funktion."""
+Formatiere deine Antwort als strukturiertes JSON gemäß der vorgegebenen Funktion."""),
+    
+    ("user", """Basierend auf den medizinischen Leitlinien, analysiere bitte folgende Aussage:
+
+Kontext: {context}
+Zu überprüfende Aussage: {query}
+
+Ursprüngliche Begründung für Überprüfung:
+{verification_reasoning}""")
+])
 
 RESULT_SYNTHESIS_PROMPT_CONFIG = [{
             "type": "function",
@@ -88,4 +97,65 @@ RESULT_SYNTHESIS_PROMPT_CONFIG = [{
                     "required": ["status", "confidence_score", "relevant_guideline_sections", "analysis"]
                 }
             }
-        }]
\ No newline at end of file
+        }]
+# Several claims that retrieved largely the same guideline chunks are
+# verified in one call over the shared context; claims are numbered [1]..[n]
+GROUP_SYNTHESIS_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """Du überprüfst mehrere Aussagen aus medizinischen Artikeln anhand derselben Auszüge aus medizinischen Leitlinien.
+
+Deine Aufgabe für jede Aussage einzeln:
+1. Vergleiche die Aussage mit den Leitlinien
+2. Bewerte die Übereinstimmung oder mögliche Konflikte
+3. Berücksichtige dabei die ursprüngliche Begründung für die Überprüfung
+4. Gib eine detaillierte Analyse mit Belegen aus den Leitlinien
+
+WICHTIG: 
+- Beziehe dich explizit auf die relevanten Stellen in den Leitlinien
+- Bewerte die Konfidenz deiner Analyse
+- Markiere unklare oder mehrdeutige Fälle als UNCLEAR
+- Bei Konflikten oder Aktualisierungsbedarf als FLAGGED markieren
+- Bei Übereinstimmung mit Leitlinien als VALID markieren
+- Gib für jede Aussage genau ein Ergebnis mit ihrer Nummer (claim_number) zurück
+
+Formatiere deine Antwort als strukturiertes JSON gemäß der vorgegebenen Funktion."""),
+    
+    ("user", """Basierend auf den medizinischen Leitlinien, analysiere bitte folgende Aussagen:
+
+Kontext: {context}
+
+Zu überprüfende Aussagen:
+{claims}""")
+])
+
+GROUP_SYNTHESIS_CLAIM_TEMPLATE = """[{number}] Aussage: {query}
+Ursprüngliche Begründung für Überprüfung: {verification_reasoning}"""
+
+_VERDICT_SCHEMA = RESULT_SYNTHESIS_PROMPT_CONFIG[0]["function"]["parameters"]
+
+GROUP_SYNTHESIS_PROMPT_CONFIG = [{
+            "type": "function",
+            "function": {
+                "name": "format_group_verification",
+                "description": "Format one verification result per claim as a JSON object",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "results": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "claim_number": {
+                                        "type": "integer",
+                                        "description": "Nummer der Aussage aus der Anfrage"
+                                    },
+                                    **_VERDICT_SCHEMA["properties"]
+                                },
+                                "required": ["claim_number", *_VERDICT_SCHEMA["required"]]
+                            }
+                        }
+                    },
+                    "required": ["results"]
+                }
+            }
+        }]
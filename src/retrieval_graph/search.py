@@ -0,0 +1,694 @@
+import asyncio
+import heapq
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Awaitable, Dict, Any, Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+
+from retrieval_graph.state import BatchRetrievalState, RetrievalState
+from retrieval_graph.configuration import RetrievalConfiguration
+from shared import tracing
+from shared.configuration import HnswConfiguration
+from shared.shards import ShardRegistry
+from shared.logging_utils import get_logger
+from shared.utils import check_hnsw_configuration, setup_embeddings
+from shared.versions import CollectionVersions
+
+logger = get_logger(__name__)
+
+# One ranked result list per query: (chunk, distance) with lower = closer
+SearchResults = List[List[Tuple[Document, float]]]
+
+class ChromaSearcher:
+    """Embed queries and look them up in a Chroma collection.
+
+    Batches are embedded with a single ``embed_documents`` call and sent to
+    Chroma as one multi-query request.
+    """
+
+    def __init__(self, vectorstore: Chroma):
+        self.vectorstore = vectorstore
+
+    def embed(self, queries: Sequence[str]) -> List[List[float]]:
+        """Embed one or more queries."""
+        with tracing.span("embedding", queries=len(queries)):
+            if len(queries) == 1:
+                return [self.vectorstore.embeddings.embed_query(queries[0])]
+            return self.vectorstore.embeddings.embed_documents(list(queries))
+
+    def search_by_vectors(self, vectors: Sequence[List[float]], k: int) -> SearchResults:
+        """Return the ``k`` nearest chunks for each query vector."""
+        with tracing.span("vector_search", k=k, queries=len(vectors)):
+            results = self.vectorstore._collection.query(
+                query_embeddings=list(vectors),
+                n_results=k,
+                include=["documents", "metadatas", "distances"]
+            )
+
+        return [
+            [
+                (Document(page_content=content, metadata=metadata or {}, id=doc_id), distance)
+                for content, metadata, doc_id, distance in zip(
+                    results["documents"][i],
+                    results["metadatas"][i],
+                    results["ids"][i],
+                    results["distances"][i]
+                )
+            ]
+            for i in range(len(vectors))
+        ]
+
+    def search(self, queries: Sequence[str], k: int) -> SearchResults:
+        """Embed and search a batch of queries."""
+        return self.search_by_vectors(self.embed(queries), k)
+
+    async def aembed(self, queries: Sequence[str]) -> List[List[float]]:
+        """Embed queries with the embedding model's native async API."""
+        with tracing.span("embedding", queries=len(queries)):
+            if len(queries) == 1:
+                return [await self.vectorstore.embeddings.aembed_query(queries[0])]
+            return await self.vectorstore.embeddings.aembed_documents(list(queries))
+
+    async def asearch_by_vectors(self, vectors: Sequence[List[float]], k: int) -> SearchResults:
+        """Chroma's local client is synchronous, so the lookup runs on a worker thread."""
+        return await asyncio.to_thread(self.search_by_vectors, vectors, k)
+
+    async def asearch(self, queries: Sequence[str], k: int) -> SearchResults:
+        """Async ``search``."""
+        return await self.asearch_by_vectors(await self.aembed(queries), k)
+
+PRECISIONS = ("float32", "float16", "int8")
+
+def _norms(matrix: np.ndarray, block_size: int = 8192) -> np.ndarray:
+    """Row L2 norms, computed in blocks so memory-mapped matrices stay paged out."""
+    norms = np.empty(matrix.shape[0], dtype=np.float32)
+    for start in range(0, matrix.shape[0], block_size):
+        block = np.asarray(matrix[start:start + block_size], dtype=np.float32)
+        norms[start:start + block_size] = np.sqrt(np.einsum("ij,ij->i", block, block))
+    return norms
+
+def _to_distances(space: str, dots: np.ndarray, query_norms: np.ndarray, row_norms: np.ndarray) -> np.ndarray:
+    """Turn dot products into Chroma distances (lower = closer).
+    
+    ``dots`` is queries x rows; ``query_norms`` has one entry per query and
+    ``row_norms`` broadcasts against ``dots``.
+    """
+    query_norms = query_norms[:, None]
+    if space == "cosine":
+        return 1.0 - dots / (np.where(query_norms == 0, 1.0, query_norms) * np.where(row_norms == 0, 1.0, row_norms))
+    if space == "ip":
+        return 1.0 - dots
+    return np.maximum(query_norms ** 2 + row_norms ** 2 - 2.0 * dots, 0.0)
+
+def _top_k(distances: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Column indices and distances of the ``k`` smallest entries per row, sorted."""
+    k = min(k, distances.shape[1])
+    top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    top_distances = np.take_along_axis(distances, top, axis=1)
+    order = np.argsort(top_distances, axis=1)
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_distances, order, axis=1)
+
+class NumpySearcher(ChromaSearcher):
+    """Nearest-neighbour search over an in-memory embedding matrix.
+    
+    All chunk embeddings of the collection are loaded once into a contiguous
+    float32 matrix; queries are answered with one matrix product and
+    ``argpartition``. Distances follow the collection's HNSW space so scores
+    are interchangeable with ``ChromaSearcher`` (squared L2, ``1 - cosine``
+    or ``1 - dot``; lower = closer).
+    
+    With ``cache_dir`` the matrix is stored as ``<collection>.npy`` plus a
+    JSON sidecar and memory-mapped on later starts. The cache is rebuilt
+    when the collection id (changes on rebuild), its size or its published
+    version (bumped by every index write, see ``shared.versions``) changes.
+    
+    Setting ``precision`` to float16/int8 or ``coarse_dimensions`` keeps
+    only a reduced candidate matrix resident: the leading
+    ``coarse_dimensions`` components (text-embedding-3 vectors can be
+    shortened this way), stored at ``precision`` with a per-row scale for
+    int8. The best ``rescore_candidates`` per query are then re-ranked with
+    the full float32 vectors, which are read from the memory-mapped cache.
+    Fewer dimensions cut both memory and search time; int8 cuts memory by
+    4x at a small cost in time. float16 halves memory but NumPy converts it
+    slowly, so it is mostly useful when memory is the only constraint.
+    
+    Args:
+        vectorstore: Chroma vector store providing embeddings and chunks
+        cache_dir: Directory for the memory-mapped matrix (in memory only
+            if omitted)
+        precision: Storage type of the candidate matrix
+        coarse_dimensions: Leading dimensions used for the candidate pass
+            (all if omitted)
+        rescore_candidates: Candidates per query re-ranked at full precision
+        version: Published collection version
+    """
+    
+    def __init__(
+        self,
+        vectorstore: Chroma,
+        cache_dir: Optional[Path] = None,
+        precision: str = "float32",
+        coarse_dimensions: Optional[int] = None,
+        rescore_candidates: int = 50,
+        version: int = 0
+    ):
+        super().__init__(vectorstore)
+        if precision not in PRECISIONS:
+            raise ValueError(f"precision must be one of {PRECISIONS}")
+        
+        collection = vectorstore._collection
+        self.space = HnswConfiguration.from_metadata(collection.metadata).space
+        
+        fingerprint = {"collection_id": str(collection.id), "count": collection.count(), "version": version}
+        loaded = self._load_cache(cache_dir, collection.name, fingerprint) if cache_dir else None
+        if loaded is None:
+            loaded = self._load_collection(collection)
+            if cache_dir:
+                self._write_cache(cache_dir, collection.name, fingerprint, *loaded)
+                # Re-open memory-mapped so full-precision rows stay on disk
+                loaded = self._load_cache(cache_dir, collection.name, fingerprint)
+        self.matrix, self.ids, self.documents, self.metadatas = loaded
+        
+        dimensions = self.matrix.shape[1] if self.matrix.ndim == 2 else 0
+        if coarse_dimensions is not None and coarse_dimensions >= dimensions:
+            coarse_dimensions = None
+        self.precision = precision
+        self.coarse_dimensions = coarse_dimensions
+        self.rescore_candidates = rescore_candidates
+        self.rescoring = precision != "float32" or coarse_dimensions is not None
+        
+        if self.rescoring:
+            coarse = self.matrix[:, :coarse_dimensions] if coarse_dimensions else self.matrix
+            self._coarse_norms = _norms(coarse)
+            if precision == "int8":
+                self._coarse_scale = np.empty(len(coarse), dtype=np.float32)
+                self._coarse = np.empty(coarse.shape, dtype=np.int8)
+                for start in range(0, len(coarse), 8192):
+                    block = np.asarray(coarse[start:start + 8192], dtype=np.float32)
+                    scale = np.abs(block).max(axis=1) / 127.0
+                    scale[scale == 0] = 1.0
+                    self._coarse_scale[start:start + 8192] = scale
+                    self._coarse[start:start + 8192] = np.round(block / scale[:, None])
+            else:
+                self._coarse = np.ascontiguousarray(coarse, dtype=precision)
+                self._coarse_scale = None
+        else:
+            self._coarse = self.matrix
+            self._coarse_norms = _norms(self.matrix)
+            self._coarse_scale = None
+        
+        logger.info(
+            "Loaded %d x %d embedding matrix for exact search (%s, candidates %s x %d, %.1f MB resident)",
+            len(self.ids),
+            dimensions,
+            self.space,
+            precision,
+            coarse_dimensions or dimensions,
+            self.memory_bytes / (1024 * 1024)
+        )
+    
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes that stay resident: the scanned candidate matrix plus its norms.
+        
+        A memory-mapped full-precision matrix only used for rescoring is not
+        counted, as just the candidate rows are paged in.
+        """
+        arrays = [self._coarse, self._coarse_norms, self._coarse_scale]
+        if not isinstance(self.matrix, np.memmap):
+            arrays.append(self.matrix)
+        unique = {id(a): a for a in arrays if a is not None}
+        return sum(a.nbytes for a in unique.values())
+    
+    @staticmethod
+    def _load_collection(collection: Any, page_size: int = 5000):
+        ids, documents, metadatas, embeddings = [], [], [], []
+        for offset in range(0, collection.count(), page_size):
+            batch = collection.get(
+                limit=page_size,
+                offset=offset,
+                include=["embeddings", "documents", "metadatas"]
+            )
+            ids.extend(batch["ids"])
+            documents.extend(batch["documents"])
+            metadatas.extend(meta or {} for meta in batch["metadatas"])
+            embeddings.extend(batch["embeddings"])
+        if not ids:
+            # Nothing indexed yet: searches return no hits
+            return np.zeros((0, 0), dtype=np.float32), ids, documents, metadatas
+        matrix = np.ascontiguousarray(np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1))
+        return matrix, ids, documents, metadatas
+    
+    @staticmethod
+    def _load_cache(cache_dir: Path, name: str, fingerprint: Dict[str, Any]):
+        matrix_path = Path(cache_dir) / f"{name}.npy"
+        sidecar_path = Path(cache_dir) / f"{name}.json"
+        if not (matrix_path.exists() and sidecar_path.exists()):
+            return None
+        with open(sidecar_path, 'r', encoding='utf-8') as f:
+            sidecar = json.load(f)
+        if sidecar.get("fingerprint") != fingerprint:
+            logger.info("Exact search cache for %s is stale, reloading from Chroma", name)
+            return None
+        matrix = np.load(matrix_path, mmap_mode="r")
+        return matrix, sidecar["ids"], sidecar["documents"], sidecar["metadatas"]
+    
+    @staticmethod
+    def _write_cache(cache_dir: Path, name: str, fingerprint: Dict[str, Any], matrix, ids, documents, metadatas):
+        cache_dir = Path(cache_dir)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # Write then rename so concurrent readers never see a partial file
+        matrix_tmp = cache_dir / f"{name}.npy.tmp"
+        with open(matrix_tmp, 'wb') as f:
+            np.save(f, matrix)
+        os.replace(matrix_tmp, cache_dir / f"{name}.npy")
+        sidecar_tmp = cache_dir / f"{name}.json.tmp"
+        with open(sidecar_tmp, 'w', encoding='utf-8') as f:
+            json.dump(
+                {"fingerprint": fingerprint, "ids": ids, "documents": documents, "metadatas": metadatas},
+                f,
+                ensure_ascii=False
+            )
+        os.replace(sidecar_tmp, cache_dir / f"{name}.json")
+    
+    def _coarse_dots(self, queries: np.ndarray, block_size: int = 8192) -> np.ndarray:
+        if self.coarse_dimensions:
+            queries = queries[:, :self.coarse_dimensions]
+        if self._coarse.dtype == np.float32:
+            return queries @ self._coarse.T
+        
+        dots = np.empty((len(queries), len(self._coarse)), dtype=np.float32)
+        for start in range(0, len(self._coarse), block_size):
+            block = self._coarse[start:start + block_size].astype(np.float32)
+            dots[:, start:start + block_size] = queries @ block.T
+        if self._coarse_scale is not None:
+            dots *= self._coarse_scale
+        return dots
+    
+    def distances(self, vectors: Sequence[List[float]]) -> np.ndarray:
+        """Distances of every query vector to every chunk (queries x chunks).
+        
+        Computed on the candidate matrix, i.e. approximate when
+        ``precision`` or ``coarse_dimensions`` reduce it.
+        """
+        queries = np.asarray(vectors, dtype=np.float32)
+        coarse_queries = queries[:, :self.coarse_dimensions] if self.coarse_dimensions else queries
+        return _to_distances(
+            self.space,
+            self._coarse_dots(queries),
+            np.linalg.norm(coarse_queries, axis=1),
+            self._coarse_norms
+        )
+    
+    def _rescore(self, queries: np.ndarray, candidates: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Re-rank candidate rows with the full-precision vectors."""
+        rows = np.asarray(self.matrix[candidates.ravel()], dtype=np.float32)
+        rows = rows.reshape(candidates.shape + (rows.shape[-1],))
+        dots = np.einsum("qcd,qd->qc", rows, queries)
+        distances = _to_distances(
+            self.space,
+            dots,
+            np.linalg.norm(queries, axis=1),
+            np.sqrt(np.einsum("qcd,qcd->qc", rows, rows))
+        )
+        order, distances = _top_k(distances, distances.shape[1])
+        return np.take_along_axis(candidates, order, axis=1), distances
+    
+    async def asearch_by_vectors(self, vectors: Sequence[List[float]], k: int) -> SearchResults:
+        """Search inline: an in-memory lookup is cheaper than a thread hop."""
+        return self.search_by_vectors(vectors, k)
+    
+    def search_by_vectors(self, vectors: Sequence[List[float]], k: int) -> SearchResults:
+        """Return the ``k`` nearest chunks for each query vector."""
+        if not self.ids:
+            return [[] for _ in vectors]
+        
+        with tracing.span("vector_search", k=k, queries=len(vectors), backend="numpy"):
+            queries = np.asarray(vectors, dtype=np.float32)
+            distances = self.distances(queries)
+            if self.rescoring:
+                candidates, _ = _top_k(distances, max(k, self.rescore_candidates))
+                top, top_distances = self._rescore(queries, candidates)
+                top, top_distances = top[:, :k], top_distances[:, :k]
+            else:
+                top, top_distances = _top_k(distances, k)
+        
+        return [
+            [
+                (
+                    Document(
+                        page_content=self.documents[i],
+                        metadata=dict(self.metadatas[i]),
+                        id=self.ids[i]
+                    ),
+                    float(distance)
+                )
+                for i, distance in zip(row, row_distances)
+            ]
+            for row, row_distances in zip(top.tolist(), top_distances.tolist())
+        ]
+
+def create_searcher(
+    vectorstore: Chroma,
+    config: RetrievalConfiguration,
+    cache_dir: Optional[Path] = None
+) -> ChromaSearcher:
+    """Pick the search backend for a collection.
+    
+    ``search_backend="auto"`` uses exact NumPy search up to
+    ``exact_search_max_chunks`` chunks and Chroma's HNSW index above.
+    
+    Args:
+        vectorstore: Chroma vector store
+        config: Retrieval configuration
+        cache_dir: Where ``NumpySearcher`` memory-maps its matrix
+    """
+    backend = config.search_backend
+    if backend not in ("auto", "chroma", "numpy"):
+        raise ValueError(f"Unknown search backend: {backend}")
+    
+    if backend == "auto":
+        count = vectorstore._collection.count()
+        backend = "numpy" if 0 < count <= config.exact_search_max_chunks else "chroma"
+    
+    logger.info("Using %s search backend", backend)
+    if backend == "numpy":
+        return NumpySearcher(
+            vectorstore,
+            cache_dir=cache_dir,
+            precision=config.exact_search_precision,
+            coarse_dimensions=config.exact_search_dimensions,
+            rescore_candidates=config.rescore_candidates,
+            version=CollectionVersions.for_directory(config.vector_store_dir).version(vectorstore._collection.name)
+        )
+    return ChromaSearcher(vectorstore)
+
+class ShardedSearcher:
+    """Fan a search out over per-shard searchers and merge by distance.
+    
+    Queries are embedded once; every selected shard is then searched in
+    parallel with the same vectors and the ``k`` closest chunks across
+    shards are returned. All shards must use the same embedding model and
+    distance space.
+    
+    Args:
+        searchers: Shard name to searcher (``ChromaSearcher`` or
+            ``NumpySearcher``)
+        registry: Shard registry used to resolve topics to shards
+        max_workers: Maximum shards searched concurrently
+    """
+    
+    def __init__(
+        self,
+        searchers: Dict[str, ChromaSearcher],
+        registry: Optional[ShardRegistry] = None,
+        max_workers: int = 8
+    ):
+        if not searchers:
+            raise ValueError("ShardedSearcher needs at least one shard")
+        self.searchers = searchers
+        self.registry = registry
+        self._executor = ThreadPoolExecutor(
+            max_workers=min(max_workers, len(searchers)),
+            thread_name_prefix="shard-search"
+        )
+    
+    def select(self, shards: Optional[Sequence[str]] = None) -> List[str]:
+        """Shard names to search for the given shard names or topics."""
+        if not shards:
+            return list(self.searchers)
+        if self.registry is not None:
+            selected = self.registry.select(shards)
+        else:
+            selected = {name: name for name in shards if name in self.searchers}
+        return [name for name in selected if name in self.searchers] or list(self.searchers)
+    
+    def embed(self, queries: Sequence[str]) -> List[List[float]]:
+        return next(iter(self.searchers.values())).embed(queries)
+    
+    def search_by_vectors(
+        self,
+        vectors: Sequence[List[float]],
+        k: int,
+        shards: Optional[Sequence[str]] = None
+    ) -> SearchResults:
+        """Search the selected shards in parallel and merge the hits."""
+        names = self.select(shards)
+        with tracing.span("shard_fan_out", shards=len(names)):
+            if len(names) == 1:
+                per_shard = [self.searchers[names[0]].search_by_vectors(vectors, k)]
+            else:
+                per_shard = list(self._executor.map(
+                    lambda name: self.searchers[name].search_by_vectors(vectors, k),
+                    names
+                ))
+        
+        return self._merge(per_shard, len(vectors), k)
+    
+    @staticmethod
+    def _merge(per_shard: Sequence[SearchResults], queries: int, k: int) -> SearchResults:
+        merged = []
+        for i in range(queries):
+            hits = [hit for results in per_shard for hit in results[i]]
+            merged.append(heapq.nsmallest(k, hits, key=lambda hit: hit[1]))
+        return merged
+    
+    def search(
+        self,
+        queries: Sequence[str],
+        k: int,
+        shards: Optional[Sequence[str]] = None
+    ) -> SearchResults:
+        """Embed and search a batch of queries on the selected shards."""
+        return self.search_by_vectors(self.embed(queries), k, shards=shards)
+    
+    async def aembed(self, queries: Sequence[str]) -> List[List[float]]:
+        return await next(iter(self.searchers.values())).aembed(queries)
+    
+    async def asearch_by_vectors(
+        self,
+        vectors: Sequence[List[float]],
+        k: int,
+        shards: Optional[Sequence[str]] = None
+    ) -> SearchResults:
+        """Async fan-out: the shards are searched concurrently on the event loop."""
+        names = self.select(shards)
+        with tracing.span("shard_fan_out", shards=len(names)):
+            per_shard = await asyncio.gather(*(
+                self.searchers[name].asearch_by_vectors(vectors, k) for name in names
+            ))
+        return self._merge(per_shard, len(vectors), k)
+    
+    async def asearch(
+        self,
+        queries: Sequence[str],
+        k: int,
+        shards: Optional[Sequence[str]] = None
+    ) -> SearchResults:
+        """Async ``search``."""
+        return await self.asearch_by_vectors(await self.aembed(queries), k, shards=shards)
+    
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+def create_sharded_searcher(config: RetrievalConfiguration, embeddings: Any) -> ShardedSearcher:
+    """Open every shard listed in the registry of ``config.vector_store_dir``.
+    
+    Args:
+        config: Retrieval configuration; backend selection applies per shard
+        embeddings: Embedding model shared by all shards
+    """
+    registry = ShardRegistry.for_directory(config.vector_store_dir)
+    if not registry.shards:
+        raise ValueError(f"No shards registered in {registry.path}; index with shard_by set first")
+    
+    searchers = {}
+    for shard, entry in registry.shards.items():
+        vectorstore = Chroma(
+            collection_name=entry["collection"],
+            embedding_function=embeddings,
+            persist_directory=str(config.vector_store_dir),
+            collection_metadata=config.hnsw.to_metadata()
+        )
+        check_hnsw_configuration(vectorstore._collection, config.hnsw)
+        searchers[shard] = create_searcher(vectorstore, config, cache_dir=config.vector_store_dir / "exact")
+    
+    logger.info("Opened %d shards from %s", len(searchers), registry.path)
+    return ShardedSearcher(searchers, registry, max_workers=config.shard_search_workers)
+
+def open_searcher(config: RetrievalConfiguration) -> Any:
+    """Searcher over the guideline store described by ``config``.
+
+    All registered shards when ``config.sharded`` is set, otherwise the
+    persistent collection (exact search cached under ``exact/``).
+    """
+    embeddings = setup_embeddings(config.embedding_model, config.embedding_dimensions)
+    if config.sharded:
+        return create_sharded_searcher(config, embeddings)
+    vectorstore = Chroma(
+        collection_name=config.collection_name,
+        embedding_function=embeddings,
+        persist_directory=str(config.vector_store_dir),
+        collection_metadata=config.hnsw.to_metadata()
+    )
+    return create_searcher(vectorstore, config, cache_dir=config.vector_store_dir / "exact")
+
+def _scored_docs(results: List[Tuple[Document, float]]) -> List[Document]:
+    """Hits as documents with the score in their metadata."""
+    docs = []
+    for doc, score in results:
+        doc.metadata["score"] = score
+        docs.append(doc)
+    return docs
+
+def _search_result(state: RetrievalState, results: List[Tuple[Document, float]]) -> Dict[str, Any]:
+    """Attach scores to the hits and build the node update."""
+    docs = _scored_docs(results)
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Found %d results", len(docs))
+        for doc in docs:
+            logger.debug("- Score %.3f: %s...", doc.metadata["score"], doc.page_content[:100])
+
+    if not docs:
+        logger.warning("No documents found in search for query: %s", state.query)
+
+    return {"results": docs}
+
+def make_search_node(
+    searcher: Any,
+    config: RetrievalConfiguration
+) -> Callable[[RetrievalState], Dict[str, Any]]:
+    """Create the semantic search node.
+
+    Args:
+        searcher: Search backend with ``search(queries, k)`` (e.g.
+            ``ChromaSearcher``); a bare Chroma vector store is wrapped
+        config: Retrieval configuration (uses ``top_k``)
+
+    Returns:
+        Graph node that maps a ``RetrievalState`` to ``{"results": [...]}``;
+        results already in the state (prefetched) are passed through
+    """
+    if isinstance(searcher, Chroma):
+        searcher = ChromaSearcher(searcher)
+
+    def search_node(state: RetrievalState) -> Dict[str, Any]:
+        """Perform semantic search."""
+        if state.results:
+            logger.debug("Using %d prefetched results for query: %s", len(state.results), state.query)
+            return {"results": state.results}
+        logger.debug("Executing search for query: %s", state.query)
+
+        try:
+            if state.shards and isinstance(searcher, ShardedSearcher):
+                results = searcher.search([state.query], config.top_k, shards=state.shards)[0]
+            else:
+                results = searcher.search([state.query], config.top_k)[0]
+            return _search_result(state, results)
+
+        except Exception as e:
+            logger.error("Search error: %s", e)
+            return {"results": []}
+
+    return search_node
+
+def make_async_search_node(
+    searcher: Any,
+    config: RetrievalConfiguration
+) -> Callable[[RetrievalState], Awaitable[Dict[str, Any]]]:
+    """Create the async counterpart of ``make_search_node``.
+
+    Uses the searcher's ``asearch`` (async embedding, Chroma lookups on a
+    worker thread, in-memory lookups inline); searchers without one are
+    run on a worker thread.
+    """
+    if isinstance(searcher, Chroma):
+        searcher = ChromaSearcher(searcher)
+
+    async def asearch_node(state: RetrievalState) -> Dict[str, Any]:
+        """Perform semantic search without blocking the event loop."""
+        if state.results:
+            logger.debug("Using %d prefetched results for query: %s", len(state.results), state.query)
+            return {"results": state.results}
+        logger.debug("Executing search for query: %s", state.query)
+
+        try:
+            if state.shards and isinstance(searcher, ShardedSearcher):
+                results = await searcher.asearch([state.query], config.top_k, shards=state.shards)
+            elif hasattr(searcher, "asearch"):
+                results = await searcher.asearch([state.query], config.top_k)
+            else:
+                results = await asyncio.to_thread(searcher.search, [state.query], config.top_k)
+            return _search_result(state, results[0])
+
+        except Exception as e:
+            logger.error("Search error: %s", e)
+            return {"results": []}
+
+    return asearch_node
+
+def make_batch_search_node(
+    searcher: Any,
+    config: RetrievalConfiguration
+) -> Callable[[BatchRetrievalState], Dict[str, Any]]:
+    """Create the search node of the batch graph.
+
+    All queries go to the searcher in one call, i.e. one embedding request.
+
+    Returns:
+        Graph node that maps a ``BatchRetrievalState`` to ``{"results": [...]}``
+        with one hit list per query
+    """
+    if isinstance(searcher, Chroma):
+        searcher = ChromaSearcher(searcher)
+
+    def search_node(state: BatchRetrievalState) -> Dict[str, Any]:
+        """Perform semantic search for every query."""
+        logger.debug("Executing search for %d queries", len(state.queries))
+
+        try:
+            if state.shards and isinstance(searcher, ShardedSearcher):
+                results = searcher.search(state.queries, config.top_k, shards=state.shards)
+            else:
+                results = searcher.search(state.queries, config.top_k)
+            return {"results": [_scored_docs(hits) for hits in results]}
+
+        except Exception as e:
+            logger.error("Search error: %s", e)
+            return {"results": [[] for _ in state.queries]}
+
+    return search_node
+
+def make_async_batch_search_node(
+    searcher: Any,
+    config: RetrievalConfiguration
+) -> Callable[[BatchRetrievalState], Awaitable[Dict[str, Any]]]:
+    """Create the async counterpart of ``make_batch_search_node``."""
+    if isinstance(searcher, Chroma):
+        searcher = ChromaSearcher(searcher)
+
+    async def asearch_node(state: BatchRetrievalState) -> Dict[str, Any]:
+        """Perform semantic search for every query without blocking the event loop."""
+        logger.debug("Executing search for %d queries", len(state.queries))
+
+        try:
+            if state.shards and isinstance(searcher, ShardedSearcher):
+                results = await searcher.asearch(state.queries, config.top_k, shards=state.shards)
+            elif hasattr(searcher, "asearch"):
+                results = await searcher.asearch(state.queries, config.top_k)
+            else:
+                results = await asyncio.to_thread(searcher.search, state.queries, config.top_k)
+            return {"results": [_scored_docs(hits) for hits in results]}
+
+        except Exception as e:
+            logger.error("Search error: %s", e)
+            return {"results": [[] for _ in state.queries]}
+
+    return asearch_node
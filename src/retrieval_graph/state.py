@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import Annotated, List, Optional
+from typing import Annotated, Any, Dict, List, Optional
 from langchain_core.documents import Document
 from langgraph.graph.message import add_messages
 
@@ -9,6 +9,24 @@ class RetrievalState:
     
     query: str
     verification_reasoning: str
+    # Shard names or topics to search (all shards if empty)
+    shards: Optional[List[str]] = None
     messages: Annotated[List, add_messages] = field(default_factory=list)
+    # Prefetched hits (retrieval_graph.prefetch) make the search node a no-op
     results: List[Document] = field(default_factory=list)
-    status: Optional[str] = None 
\ No newline at end of file
+    verification_result: Optional[Dict[str, Any]] = None
+    status: Optional[str] = None
+
+@dataclass
+class BatchRetrievalState:
+    """State of the batch retrieval process (many claims at once)."""
+    
+    queries: List[str]
+    verification_reasonings: List[str]
+    # Shard names or topics to search (all shards if empty)
+    shards: Optional[List[str]] = None
+    # Per claim, in query order
+    results: List[List[Document]] = field(default_factory=list)
+    # Claim indices verified together in one synthesis call
+    groups: List[List[int]] = field(default_factory=list)
+    verification_results: List[Dict[str, Any]] = field(default_factory=list)
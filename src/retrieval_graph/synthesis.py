@@ -0,0 +1,297 @@
+"""Verdict synthesis for single claims and groups of claims.
+
+``Synthesizer`` turns retrieved guideline chunks into a verification result
+with the synthesis tool, including the optional model cascade. Claims that
+retrieved largely the same chunks can be verified together with
+``synthesize_group``: the shared context is sent once and the model returns
+one verdict per claim. Malformed group output falls back to one call per
+claim.
+
+``group_claims`` decides which claims to verify together.
+"""
+
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.messages import BaseMessage
+
+from retrieval_graph.configuration import RetrievalConfiguration
+from retrieval_graph.prompts import (
+    GROUP_SYNTHESIS_CLAIM_TEMPLATE,
+    GROUP_SYNTHESIS_PROMPT,
+    GROUP_SYNTHESIS_PROMPT_CONFIG,
+    RESULT_SYNTHESIS_PROMPT,
+    RESULT_SYNTHESIS_PROMPT_CONFIG
+)
+from shared import scheduling, tracing
+from shared.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# (query, verification_reasoning, retrieved chunks)
+ClaimEvidence = Tuple[str, str, Sequence[Document]]
+
+_STATUSES = set(RESULT_SYNTHESIS_PROMPT_CONFIG[0]["function"]["parameters"]["properties"]["status"]["enum"])
+
+def group_claims(
+    chunk_ids: Sequence[Sequence[str]],
+    max_group_size: int,
+    min_overlap: float
+) -> List[List[int]]:
+    """Cluster claims whose retrieved chunks overlap.
+
+    Claims are visited in order, so neighbouring claims of a paragraph end
+    up together. A claim joins the group that already holds the largest
+    share of its chunks, if that share is at least ``min_overlap`` and the
+    group is not full; otherwise it starts a new group.
+
+    Args:
+        chunk_ids: Retrieved chunk ids per claim
+        max_group_size: Maximum claims per group (1 disables grouping)
+        min_overlap: Minimum share of a claim's chunks already in the group
+
+    Returns:
+        Groups as lists of claim indices
+    """
+    groups: List[List[int]] = []
+    group_chunks: List[set] = []
+    for index, ids in enumerate(chunk_ids):
+        ids = set(ids)
+        best, best_overlap = None, 0.0
+        if ids and max_group_size > 1:
+            for group, chunks in enumerate(group_chunks):
+                if len(groups[group]) >= max_group_size:
+                    continue
+                overlap = len(ids & chunks) / len(ids)
+                if overlap >= min_overlap and overlap > best_overlap:
+                    best, best_overlap = group, overlap
+        if best is None:
+            groups.append([index])
+            group_chunks.append(ids)
+        else:
+            groups[best].append(index)
+            group_chunks[best] |= ids
+    return groups
+
+def _no_results() -> Dict[str, Any]:
+    return {
+        "status": "UNCLEAR",
+        "messages": ["Keine relevanten Leitlinien gefunden."]
+    }
+
+def _tool_arguments(response: Any) -> Optional[Dict[str, Any]]:
+    if response.additional_kwargs.get('tool_calls'):
+        tool_call = response.additional_kwargs['tool_calls'][0]
+        return json.loads(tool_call['function']['arguments'])
+    return None
+
+class Synthesizer:
+    """Synthesis calls with the tools bound and the cascade applied.
+
+    Args:
+        config: Retrieval configuration (cascade thresholds)
+        llm: Chat model for synthesis
+        escalation_llm: Stronger chat model for uncertain verdicts (no
+            cascade if None)
+    """
+
+    def __init__(self, config: RetrievalConfiguration, llm: Any, escalation_llm: Optional[Any] = None):
+        self.config = config
+        self.llm = llm.bind(tools=RESULT_SYNTHESIS_PROMPT_CONFIG)
+        self.group_llm = llm.bind(tools=GROUP_SYNTHESIS_PROMPT_CONFIG)
+        self.escalation_llm = (
+            escalation_llm.bind(tools=RESULT_SYNTHESIS_PROMPT_CONFIG)
+            if escalation_llm is not None else None
+        )
+
+    @staticmethod
+    def _context(docs: Sequence[Document]) -> str:
+        return "\n\n".join(doc.page_content for doc in docs)
+
+    def prompt(self, query: str, verification_reasoning: str, docs: Sequence[Document]) -> List[BaseMessage]:
+        logger.debug("Analysiere %d Ergebnisse", len(docs))
+        return RESULT_SYNTHESIS_PROMPT.format_messages(
+            query=query,
+            context=self._context(docs),
+            verification_reasoning=verification_reasoning
+        )
+
+    def group_prompt(self, items: Sequence[ClaimEvidence]) -> List[BaseMessage]:
+        # Shared context: every chunk once, in first-retrieved order
+        docs: Dict[str, Document] = {}
+        for _, _, claim_docs in items:
+            for doc in claim_docs:
+                docs.setdefault(doc.id or doc.page_content, doc)
+        claims = "\n\n".join(
+            GROUP_SYNTHESIS_CLAIM_TEMPLATE.format(
+                number=number,
+                query=query,
+                verification_reasoning=verification_reasoning
+            )
+            for number, (query, verification_reasoning, _) in enumerate(items, 1)
+        )
+        return GROUP_SYNTHESIS_PROMPT.format_messages(
+            context=self._context(list(docs.values())),
+            claims=claims
+        )
+
+    @staticmethod
+    def _parse(response: Any, stage: str = "synthesis") -> Dict[str, Any]:
+        tracing.record_usage(stage, response)
+
+        # Extract the JSON from the function call
+        result = _tool_arguments(response)
+        if result is not None:
+            return result
+
+        return {
+            "status": "ERROR",
+            "messages": ["Fehler bei der Verarbeitung der Antwort."]
+        }
+
+    @staticmethod
+    def _parse_group(response: Any, size: int) -> Optional[List[Dict[str, Any]]]:
+        """Verdicts in claim order, or None if the output is unusable."""
+        tracing.record_usage("group_synthesis", response)
+        try:
+            arguments = _tool_arguments(response)
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(arguments, dict) or not isinstance(arguments.get("results"), list):
+            return None
+
+        verdicts: Dict[int, Dict[str, Any]] = {}
+        for verdict in arguments["results"]:
+            if not isinstance(verdict, dict):
+                return None
+            number = verdict.pop("claim_number", None)
+            if (not isinstance(number, int) or not 1 <= number <= size or number in verdicts
+                    or verdict.get("status") not in _STATUSES
+                    or not isinstance(verdict.get("confidence_score"), (int, float))):
+                return None
+            verdicts[number] = verdict
+        if len(verdicts) != size:
+            return None
+        return [verdicts[number] for number in range(1, size + 1)]
+
+    def _needs_escalation(self, verdict: Dict[str, Any]) -> bool:
+        if self.escalation_llm is None:
+            return False
+        confidence = verdict.get("confidence_score")
+        needed = (
+            verdict.get("status") in self.config.escalation_statuses
+            or not isinstance(confidence, (int, float))
+            or confidence < self.config.escalation_confidence
+        )
+        tracing.record_outcome("synthesis", "escalated" if needed else "settled")
+        return needed
+
+    def _escalated(self, response: Any) -> Dict[str, Any]:
+        verdict = self._parse(response, "synthesis_escalation")
+        verdict["escalated"] = True
+        return verdict
+
+    def synthesize(self, query: str, verification_reasoning: str, docs: Sequence[Document]) -> Dict[str, Any]:
+        """Verification result for one claim."""
+        if not docs:
+            logger.debug("Keine relevanten Leitlinien gefunden")
+            return _no_results()
+
+        messages = self.prompt(query, verification_reasoning, docs)
+        with tracing.span("synthesis"):
+            response = scheduling.invoke(self.llm, messages)
+        verdict = self._parse(response)
+        if not self._needs_escalation(verdict):
+            return verdict
+        return self.escalate(query, verification_reasoning, docs, messages)
+
+    def escalate(
+        self,
+        query: str,
+        verification_reasoning: str,
+        docs: Sequence[Document],
+        messages: Optional[List[BaseMessage]] = None
+    ) -> Dict[str, Any]:
+        """Verification result for one claim from the escalation model."""
+        with tracing.span("synthesis_escalation"):
+            response = scheduling.invoke(self.escalation_llm, messages or self.prompt(query, verification_reasoning, docs))
+        return self._escalated(response)
+
+    async def asynthesize(self, query: str, verification_reasoning: str, docs: Sequence[Document]) -> Dict[str, Any]:
+        """Async ``synthesize`` using the models' native ``ainvoke``."""
+        if not docs:
+            logger.debug("Keine relevanten Leitlinien gefunden")
+            return _no_results()
+
+        messages = self.prompt(query, verification_reasoning, docs)
+        with tracing.span("synthesis"):
+            response = await scheduling.ainvoke(self.llm, messages)
+        verdict = self._parse(response)
+        if not self._needs_escalation(verdict):
+            return verdict
+        return await self.aescalate(query, verification_reasoning, docs, messages)
+
+    async def aescalate(
+        self,
+        query: str,
+        verification_reasoning: str,
+        docs: Sequence[Document],
+        messages: Optional[List[BaseMessage]] = None
+    ) -> Dict[str, Any]:
+        """Async ``escalate``."""
+        with tracing.span("synthesis_escalation"):
+            response = await scheduling.ainvoke(
+                self.escalation_llm,
+                messages or self.prompt(query, verification_reasoning, docs)
+            )
+        return self._escalated(response)
+
+    def synthesize_group(self, items: Sequence[ClaimEvidence]) -> List[Dict[str, Any]]:
+        """Verification results for claims sharing most of their evidence.
+
+        Args:
+            items: ``(query, verification_reasoning, docs)`` per claim
+
+        Returns:
+            One verification result per item, in order
+        """
+        if len(items) == 1:
+            return [self.synthesize(*items[0])]
+
+        with tracing.span("group_synthesis", claims=len(items)):
+            response = scheduling.invoke(self.group_llm, self.group_prompt(items))
+        verdicts = self._parse_group(response, len(items))
+        if verdicts is None:
+            logger.warning("Malformed group verdict for %d claims, verifying them one by one", len(items))
+            tracing.record_outcome("group_synthesis", "fallback")
+            return [self.synthesize(*item) for item in items]
+
+        tracing.record_outcome("group_synthesis", "grouped")
+        return [
+            self.escalate(*item) if self._needs_escalation(verdict) else verdict
+            for item, verdict in zip(items, verdicts)
+        ]
+
+    async def asynthesize_group(self, items: Sequence[ClaimEvidence]) -> List[Dict[str, Any]]:
+        """Async ``synthesize_group``."""
+        if len(items) == 1:
+            return [await self.asynthesize(*items[0])]
+
+        with tracing.span("group_synthesis", claims=len(items)):
+            response = await scheduling.ainvoke(self.group_llm, self.group_prompt(items))
+        verdicts = self._parse_group(response, len(items))
+        if verdicts is None:
+            logger.warning("Malformed group verdict for %d claims, verifying them one by one", len(items))
+            tracing.record_outcome("group_synthesis", "fallback")
+            return list(await asyncio.gather(*(self.asynthesize(*item) for item in items)))
+
+        tracing.record_outcome("group_synthesis", "grouped")
+
+        async def settle(item: ClaimEvidence, verdict: Dict[str, Any]) -> Dict[str, Any]:
+            if self._needs_escalation(verdict):
+                return await self.aescalate(*item)
+            return verdict
+
+        return list(await asyncio.gather(*(settle(item, verdict) for item, verdict in zip(items, verdicts))))
@@ -0,0 +1,311 @@
+"""Targeted re-verification after guideline updates.
+
+When guidelines change, only claims whose evidence changed need a new
+verdict. Using the run index (``results/index.sqlite``), which records the
+chunk ids, content hashes and sources every claim relied on, and the
+collection history in ``vector_store/versions.json``, a claim of the latest
+run per article is re-verified when
+
+- one of its evidence chunks is no longer in the store and its guideline
+  was removed (``removed``),
+- one of its evidence chunks is no longer in the store, i.e. the section
+  was edited (``modified``), or
+- a guideline changed after the run and re-running its search now ranks a
+  new chunk of that guideline among the top results (``outranked``; costs
+  one embedding per claim, no LLM call).
+
+The other claims are copied unchanged into a new run directory, so the new
+run is complete and the run index compares it with its predecessor.
+
+Run from ``src/``:
+    python reverify.py --dry-run
+    python reverify.py --group-size 4
+"""
+
+import argparse
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from main import search_guidelines, search_guidelines_batch
+from retrieval_graph.configuration import RetrievalConfiguration
+from retrieval_graph.search import ShardedSearcher, open_searcher
+from shared import scheduling, tracing
+from shared.logging_utils import configure_logging, get_logger
+from shared.output_formatter import claim_files, iter_claims
+from shared.records import Claim, RecordTables, VerifiedClaim
+from shared.run_index import DEFAULT_INDEX_NAME, RunIndex, content_hash, update_index
+from shared.versions import CollectionVersions
+
+logger = get_logger("reverify")
+
+def store_contents(searcher: Any, page_size: int = 5000) -> Dict[str, str]:
+    """Content hash -> source of every chunk currently in the store."""
+    if isinstance(searcher, ShardedSearcher):
+        collections = [s.vectorstore._collection for s in searcher.searchers.values()]
+    else:
+        collections = [searcher.vectorstore._collection]
+
+    contents = {}
+    for collection in collections:
+        for offset in range(0, collection.count(), page_size):
+            batch = collection.get(limit=page_size, offset=offset, include=["documents", "metadatas"])
+            for document, metadata in zip(batch["documents"], batch["metadatas"]):
+                contents[content_hash(document)] = (metadata or {}).get("source")
+    return contents
+
+def find_stale_claims(
+    run: Dict[str, Any],
+    index: RunIndex,
+    versions: CollectionVersions,
+    contents: Dict[str, str],
+    searcher: Optional[Any] = None,
+    top_k: int = 5
+) -> Dict[int, str]:
+    """Claims of a run that need a new verdict, with the reason.
+
+    Args:
+        run: Run row from ``RunIndex.latest_runs``
+        index: Run index holding the run's evidence
+        versions: Collection versions (change history)
+        contents: ``store_contents`` of the current store
+        searcher: Searcher for the ``outranked`` check (skipped if None)
+        top_k: Results per query considered for the ``outranked`` check
+
+    Returns:
+        Claim number -> ``removed``, ``modified`` or ``outranked``
+    """
+    evidence = index.evidence(run["run_id"])
+    indexed_sources = set(contents.values())
+
+    stale: Dict[int, str] = {}
+    for claim_number, rows in evidence.items():
+        for row in rows:
+            if row["content_hash"] is None or row["content_hash"] in contents:
+                continue
+            stale[claim_number] = "modified" if row["source"] in indexed_sources else "removed"
+            if stale[claim_number] == "removed":
+                break
+
+    changed, _ = versions.changes_since(run["started_at"])
+    if searcher is None or not changed:
+        return stale
+
+    # New chunks of changed guidelines may now outrank the recorded evidence
+    candidates = [
+        (claim_number, claim_data)
+        for claim_number, claim_data in iter_claims(Path(run["results_dir"]), resolve=False)
+        if claim_number not in stale and claim_data.get("verification_query")
+    ]
+    if not candidates:
+        return stale
+    with tracing.span("reverify_search", queries=len(candidates)):
+        hits = searcher.search([claim_data["verification_query"] for _, claim_data in candidates], top_k)
+    for (claim_number, _), claim_hits in zip(candidates, hits):
+        known = {row["content_hash"] for row in evidence.get(claim_number, [])}
+        if any(
+            content_hash(doc.page_content) not in known and doc.metadata.get("source") in changed
+            for doc, _ in claim_hits
+        ):
+            stale[claim_number] = "outranked"
+    return stale
+
+def _new_run_dir(results_root: Path) -> Path:
+    """Create a run directory of its own, even for runs started in the same second.
+
+    Articles are re-verified one after another and several can finish
+    within a second; later ones get a ``_1``, ``_2``, ... suffix, as an
+    existing directory (and its index rows) belongs to another run.
+    """
+    results_root.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    run_id, suffix = timestamp, 0
+    while True:
+        try:
+            (results_root / run_id).mkdir()
+            return results_root / run_id
+        except FileExistsError:
+            suffix += 1
+            run_id = f"{timestamp}_{suffix}"
+
+def reverify_run(
+    results_dir: Path,
+    stale: Dict[int, str],
+    retrieval: Optional[Any] = None,
+    batch_retrieval: Optional[Any] = None,
+    results_root: Optional[Path] = None
+) -> Path:
+    """Write a new run with the stale claims re-verified and the rest copied.
+
+    Args:
+        results_dir: Run to update
+        stale: Claim number -> reason (``find_stale_claims``)
+        retrieval: Compiled retrieval graph (defaults to the shared graph)
+        batch_retrieval: Compiled batch retrieval graph; used instead of
+            ``retrieval`` when given
+        results_root: Where the new run directory is created (next to the
+            old run by default)
+
+    Returns:
+        Directory of the new run
+    """
+    results_dir = Path(results_dir)
+    new_dir = _new_run_dir(Path(results_root or results_dir.parent))
+    timestamp = new_dir.name
+    tracer = tracing.start_run(timestamp)
+
+    with open(results_dir / "summary.json", 'r', encoding='utf-8') as f:
+        summary = json.load(f)
+    tables = RecordTables.load(results_dir) or RecordTables()
+
+    # Claims as written; their chunk references stay valid as the tables are carried over
+    claims_data = dict(iter_claims(results_dir, resolve=False))
+    stale_numbers = [number for number in sorted(stale) if number in claims_data]
+    claims = []
+    for number in stale_numbers:
+        data = claims_data[number]
+        # Runs written before the record tables carry the paragraph inline
+        paragraph_id = data.get("paragraph_id") or tables.add_paragraph(
+            "", None, data.get("context_paragraph", "")
+        )
+        claims.append(Claim(
+            data["original_sentence"],
+            data["verification_query"],
+            data.get("verification_reasoning", ""),
+            paragraph_id
+        ))
+
+    logger.info("Re-verifying %d of %d claims of %s", len(claims), len(claims_data), results_dir.name)
+    if batch_retrieval is not None:
+        retrieval_results = search_guidelines_batch(claims, batch_retrieval)
+    else:
+        retrieval_results = [
+            search_guidelines(claim.query, claim.reasoning, graph=retrieval)
+            for claim in claims
+        ]
+    for number, claim, retrieval_result in zip(stale_numbers, claims, retrieval_results):
+        result = VerifiedClaim(
+            claim,
+            tables.add_chunks(retrieval_result.get('chunks', [])),
+            retrieval_result.get('verification', {})
+        ).to_dict()
+        result["reverification"] = {
+            "reason": stale[number],
+            "previous_status": (claims_data[number].get("verification_result") or {}).get("status")
+        }
+        claims_data[number] = result
+
+    with tracing.span("result_writing"):
+        for number, data in claims_data.items():
+            with open(new_dir / f"claim_{number}.json", 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+        tables.write(new_dir)
+        summary.update({
+            "timestamp": timestamp,
+            "reverified_from": results_dir.name,
+            "reverified_claims": {str(number): stale[number] for number in stale_numbers}
+        })
+        with open(new_dir / "summary.json", 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    tracer.write_report(new_dir / "trace.json")
+    update_index(new_dir)
+    logger.info("Re-verified run saved to: %s", new_dir)
+    return new_dir
+
+def reverify(
+    results_root: Path,
+    config: RetrievalConfiguration,
+    searcher: Optional[Any] = None,
+    retrieval: Optional[Any] = None,
+    batch_retrieval: Optional[Any] = None,
+    check_outranking: bool = True,
+    dry_run: bool = False
+) -> List[Tuple[str, Dict[int, str], Optional[Path]]]:
+    """Re-verify the stale claims of the latest run per article.
+
+    Returns:
+        ``(run_id, stale claims, new run directory)`` per run with stale
+        claims (no directory for dry runs)
+    """
+    searcher = searcher or open_searcher(config)
+    versions = CollectionVersions.for_directory(config.vector_store_dir)
+    contents = store_contents(searcher)
+
+    updated = []
+    with RunIndex(Path(results_root) / DEFAULT_INDEX_NAME) as index:
+        runs = index.latest_runs()
+        for run in runs:
+            if not claim_files(Path(run["results_dir"])):
+                continue
+            stale = find_stale_claims(
+                run,
+                index,
+                versions,
+                contents,
+                searcher=searcher if check_outranking else None,
+                top_k=config.top_k
+            )
+            if not stale:
+                continue
+            logger.info("%s (%s): %d stale claims", run["run_id"], run["article"], len(stale))
+            new_dir = None if dry_run else reverify_run(
+                Path(run["results_dir"]),
+                stale,
+                retrieval=retrieval,
+                batch_retrieval=batch_retrieval
+            )
+            updated.append((run["run_id"], stale, new_dir))
+
+    logger.info("%d of %d runs had stale claims", len(updated), len(runs))
+    return updated
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description='Re-verify claims whose guideline evidence changed.')
+    parser.add_argument('--results-root', type=Path, default=Path("results"))
+    parser.add_argument('--vector-store', type=Path, default=Path("vector_store"))
+    parser.add_argument('--sharded', action='store_true', help='Search the shards listed in shards.json')
+    parser.add_argument('--group-size', type=int, default=1, help='Verify up to this many claims with overlapping evidence per LLM call')
+    parser.add_argument('--no-outranking', action='store_true', help='Only check whether evidence chunks changed (no embedding calls)')
+    parser.add_argument('--dry-run', action='store_true', help='List stale claims without re-verifying them')
+    parser.add_argument('--tokens-per-minute', type=int, help='OpenAI token budget; this run gets the batch share of it')
+    parser.add_argument('--log-level', default='INFO')
+    args = parser.parse_args()
+
+    configure_logging(args.log_level.upper())
+    if args.tokens_per_minute:
+        scheduling.set_scheduler(scheduling.RequestScheduler(
+            scheduling.SchedulerConfiguration(tokens_per_minute=args.tokens_per_minute)
+        ))
+
+    config = RetrievalConfiguration(
+        vector_store_dir=args.vector_store,
+        sharded=args.sharded,
+        synthesis_group_size=args.group_size
+    )
+    searcher = open_searcher(config)
+
+    retrieval = batch_retrieval = None
+    if not args.dry_run:
+        from retrieval_graph.builder import create_batch_retrieval_graph, create_retrieval_graph
+        if args.group_size > 1:
+            batch_retrieval = create_batch_retrieval_graph(config, searcher=searcher)
+        else:
+            retrieval = create_retrieval_graph(config, searcher=searcher)
+
+    for run_id, stale, new_dir in reverify(
+        args.results_root,
+        config,
+        searcher=searcher,
+        retrieval=retrieval,
+        batch_retrieval=batch_retrieval,
+        check_outranking=not args.no_outranking,
+        dry_run=args.dry_run
+    ):
+        reasons = ", ".join(f"#{number} {reason}" for number, reason in sorted(stale.items()))
+        print(f"{run_id}: {reasons}" + (f" -> {new_dir}" if new_dir else ""))
+
+if __name__ == "__main__":
+    main()
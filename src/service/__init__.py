@@ -0,0 +1,5 @@
+"""Long-running HTTP verification service with warm graphs."""
+
+from service.configuration import ServiceConfiguration
+
+__all__ = ["ServiceConfiguration"]
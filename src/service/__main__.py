@@ -0,0 +1,38 @@
+import argparse
+
+import uvicorn
+from dotenv import load_dotenv
+
+from retrieval_graph.configuration import RetrievalConfiguration
+from service.app import create_app
+from service.configuration import ServiceConfiguration
+from shared.scheduling import SchedulerConfiguration
+from shared.logging_utils import configure_logging
+
+def main():
+    """Run the verification service with uvicorn."""
+    parser = argparse.ArgumentParser(description='Run the NetDoktor verification service.')
+    parser.add_argument('--host', default=ServiceConfiguration.host)
+    parser.add_argument('--port', type=int, default=ServiceConfiguration.port)
+    parser.add_argument('--max-batch-size', type=int, default=ServiceConfiguration.max_batch_size)
+    parser.add_argument('--max-batch-wait-ms', type=float, default=ServiceConfiguration.max_batch_wait_ms)
+    parser.add_argument('--speculative', action='store_true', help='Search sentences while they are classified')
+    parser.add_argument('--tokens-per-minute', type=int, help='OpenAI token budget shared by interactive and batch calls')
+    parser.add_argument('--log-level', default='INFO')
+    args = parser.parse_args()
+    
+    load_dotenv()
+    configure_logging(args.log_level.upper())
+    
+    config = ServiceConfiguration(
+        host=args.host,
+        port=args.port,
+        max_batch_size=args.max_batch_size,
+        max_batch_wait_ms=args.max_batch_wait_ms,
+        retrieval=RetrievalConfiguration(speculative_prefetch=args.speculative),
+        scheduler=SchedulerConfiguration(tokens_per_minute=args.tokens_per_minute)
+    )
+    uvicorn.run(create_app(config), host=config.host, port=config.port)
+
+if __name__ == "__main__":
+    main()
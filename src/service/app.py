@@ -0,0 +1,330 @@
+"""Resident HTTP service for claim verification.
+
+Keeps the vector store, embedding client and LLM clients warm across
+requests. Concurrent searches are micro-batched and identical in-flight
+requests are coalesced.
+
+Run locally with:
+    python -m service --port 8000
+or:
+    uvicorn service.app:app
+"""
+
+import asyncio
+import itertools
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, HTTPException
+from langchain_chroma import Chroma
+from pydantic import BaseModel
+
+from query_formation.agent import QueryFormationAgent
+from query_formation.processor import QueryFormationProcessor
+from query_formation.state import QueryContext
+from retrieval_graph.builder import create_retrieval_graph
+from retrieval_graph.prefetch import RetrievalPrefetcher
+from retrieval_graph.search import ShardedSearcher, create_searcher, create_sharded_searcher
+from retrieval_graph.state import RetrievalState
+from service.batching import RequestCoalescer, SearchBatcher
+from service.configuration import ServiceConfiguration
+from shared import scheduling, tracing
+from shared.logging_utils import get_logger
+from shared.utils import format_results, setup_embeddings
+
+logger = get_logger(__name__)
+
+class SearchRequest(BaseModel):
+    query: str
+    top_k: Optional[int] = None
+
+class ClaimRequest(BaseModel):
+    sentence: str
+    heading: str = ""
+    subheading: str = ""
+    paragraph: Optional[str] = None
+    # Skip classification when the caller already has a verification query
+    query: Optional[str] = None
+    reasoning: Optional[str] = None
+    # Scheduler priority class
+    priority: str = "interactive"
+
+class ArticleRequest(BaseModel):
+    markdown: str
+    max_sentences: Optional[int] = None
+    priority: str = "batch"
+
+class VerificationService:
+    """Warm pipeline components shared by all requests."""
+
+    def __init__(
+        self,
+        config: ServiceConfiguration,
+        vectorstore: Optional[Chroma] = None,
+        llm: Optional[Any] = None,
+        query_llm: Optional[Any] = None
+    ):
+        self.config = config
+        retrieval = config.retrieval
+
+        if vectorstore is None and retrieval.sharded:
+            searcher = create_sharded_searcher(
+                retrieval,
+                setup_embeddings(retrieval.embedding_model, retrieval.embedding_dimensions)
+            )
+        else:
+            cache_dir = None
+            if vectorstore is None:
+                cache_dir = retrieval.vector_store_dir / "exact"
+                vectorstore = Chroma(
+                    collection_name=retrieval.collection_name,
+                    embedding_function=setup_embeddings(retrieval.embedding_model, retrieval.embedding_dimensions),
+                    persist_directory=str(retrieval.vector_store_dir),
+                    collection_metadata=retrieval.hnsw.to_metadata()
+                )
+            searcher = create_searcher(vectorstore, retrieval, cache_dir=cache_dir)
+        self.vectorstore = vectorstore
+        self.searcher = searcher
+
+        self.batcher = SearchBatcher(
+            searcher,
+            max_batch_size=config.max_batch_size,
+            max_wait_ms=config.max_batch_wait_ms
+        )
+        self.graph = create_retrieval_graph(
+            retrieval,
+            vectorstore=vectorstore,
+            llm=llm,
+            searcher=self.batcher
+        )
+        # Sentences are searched through the batcher while they are classified
+        self.prefetcher = RetrievalPrefetcher(self.batcher, retrieval) if retrieval.speculative_prefetch else None
+        self.agent = QueryFormationAgent(config.query_formation, llm=query_llm)
+        self.coalescer = RequestCoalescer()
+        # Admits every LLM call of the process by priority class
+        self.scheduler = scheduling.RequestScheduler(config.scheduler)
+        scheduling.set_scheduler(self.scheduler)
+        # Scheduler flow per article request; ids of finished requests can be reused
+        self._article_flows = itertools.count()
+
+    def close(self) -> None:
+        if scheduling.get_scheduler() is self.scheduler:
+            scheduling.set_scheduler(None)
+        self.scheduler.close()
+        self.batcher.close()
+        if isinstance(self.searcher, ShardedSearcher):
+            self.searcher.close()
+
+    async def search(self, query: str, top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Retrieval only: nearest guideline chunks for a query."""
+        k = top_k or self.config.retrieval.top_k
+        hits = await asyncio.wrap_future(self.batcher.submit(query, k))
+        return [
+            {
+                "content": doc.page_content,
+                "metadata": doc.metadata,
+                "score": score,
+                "id": doc.id
+            }
+            for doc, score in hits
+        ]
+
+    async def classify(self, sentence: str, context: QueryContext) -> Dict[str, Any]:
+        """Decide whether a sentence needs verification and form its query."""
+        # Keyed by priority class too: the shared call is scheduled in the
+        # class of the request that starts it, so an interactive claim must
+        # not wait on an article's batch call
+        key = (
+            "classify",
+            sentence,
+            context.heading,
+            context.subheading,
+            context.paragraph,
+            scheduling.current_priority()
+        )
+        return await self.coalescer.run(
+            key,
+            lambda: self.agent.aanalyze_sentence(sentence, context)
+        )
+
+    async def verify(
+        self,
+        query: str,
+        reasoning: str,
+        prefetched: Optional[List[Any]] = None
+    ) -> Dict[str, Any]:
+        """Run retrieval and synthesis for a verification query.
+        
+        ``prefetched`` hits for the query replace the graph's search.
+        """
+        state = RetrievalState(query=query, verification_reasoning=reasoning, results=prefetched or [])
+        result = await self.coalescer.run(
+            ("verify", query, reasoning, scheduling.current_priority()),
+            lambda: self.graph.ainvoke(state)
+        )
+        return {
+            "retrieved_chunks": format_results(result.get("results", [])),
+            "verification_result": result.get("verification_result") or {}
+        }
+
+    def check_priority(self, priority: str) -> None:
+        if priority not in self.scheduler.classes:
+            raise HTTPException(status_code=400, detail=f"Unknown priority class: {priority}")
+
+    async def verify_claim(self, request: ClaimRequest) -> Dict[str, Any]:
+        self.check_priority(request.priority)
+        context = QueryContext(
+            heading=request.heading,
+            subheading=request.subheading,
+            paragraph=request.paragraph or request.sentence
+        )
+        with scheduling.priority(request.priority):
+            return await self._verify_sentence(request.sentence, context, request.query, request.reasoning)
+
+    async def verify_article(self, request: ArticleRequest) -> Dict[str, Any]:
+        """Classify every sentence of an article and verify the claims."""
+        self.check_priority(request.priority)
+        jobs = []
+        for section in QueryFormationProcessor.parse_markdown_sections(request.markdown):
+            if not section["paragraph"]:
+                continue
+            context = QueryContext(
+                heading=section["heading"],
+                subheading=section["subheading"],
+                paragraph=section["paragraph"]
+            )
+            for sentence in QueryFormationProcessor.split_sentences(section["paragraph"]):
+                jobs.append((sentence, context))
+
+        if request.max_sentences:
+            jobs = jobs[:request.max_sentences]
+
+        semaphore = asyncio.Semaphore(self.config.max_concurrency)
+
+        async def run(sentence: str, context: QueryContext) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._verify_sentence(sentence, context)
+
+        async def run_paragraph(sentences: List[str], context: QueryContext) -> List[Dict[str, Any]]:
+            # The first sentence puts the paragraph's prompt prefix into the
+            # provider's prompt cache; its siblings are sent once it is there
+            first = await run(sentences[0], context)
+            rest = await asyncio.gather(*(run(sentence, context) for sentence in sentences[1:]))
+            return [first, *rest]
+
+        paragraphs = [
+            ([sentence for sentence, _ in group], context)
+            for context, group in itertools.groupby(jobs, key=lambda job: job[1])
+        ]
+        # The article is one flow: concurrent articles share their class fairly
+        with scheduling.priority(request.priority, flow=next(self._article_flows)):
+            results = [
+                result
+                for paragraph_results in await asyncio.gather(
+                    *(run_paragraph(sentences, context) for sentences, context in paragraphs)
+                )
+                for result in paragraph_results
+            ]
+        claims = [result for result in results if result["needs_verification"]]
+        return {
+            "total_sentences": len(jobs),
+            "total_claims": len(claims),
+            "claims": claims
+        }
+
+    async def _verify_sentence(
+        self,
+        sentence: str,
+        context: QueryContext,
+        query: Optional[str] = None,
+        reasoning: Optional[str] = None
+    ) -> Dict[str, Any]:
+        prefetched = None
+        if query is None:
+            prefetch = None
+            if self.prefetcher is not None and len(sentence.strip()) >= self.config.query_formation.min_claim_length:
+                prefetch = self.prefetcher.submit(sentence)
+            analysis = await self.classify(sentence, context)
+            if not analysis.get("needs_verification"):
+                if prefetch is not None:
+                    self.prefetcher.cancel(prefetch)
+                return {
+                    "original_sentence": sentence,
+                    "needs_verification": False,
+                    "reasoning": analysis.get("reasoning")
+                }
+            query = analysis["query"]
+            reasoning = analysis.get("reasoning", "")
+            if prefetch is not None:
+                prefetched = await self.prefetcher.aresult(prefetch, sentence, query)
+
+        verification = await self.verify(query, reasoning or "", prefetched)
+        return {
+            "original_sentence": sentence,
+            "needs_verification": True,
+            "context_paragraph": context.paragraph,
+            "verification_query": query,
+            **verification
+        }
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "collection_size": (
+                self.vectorstore._collection.count()
+                if self.vectorstore is not None
+                else sum(s.vectorstore._collection.count() for s in self.searcher.searchers.values())
+            ),
+            "search_requests": self.batcher.requests,
+            "search_batches": self.batcher.batches,
+            "coalesced_requests": self.coalescer.coalesced,
+            "scheduler": self.scheduler.stats()
+        }
+
+def create_app(
+    config: Optional[ServiceConfiguration] = None,
+    service: Optional[VerificationService] = None
+) -> FastAPI:
+    """Create the FastAPI application.
+
+    Args:
+        config: Service configuration (defaults to ``ServiceConfiguration()``)
+        service: Pre-built service, e.g. with fake backends; built on startup
+            from ``config`` when omitted
+    """
+    config = config or ServiceConfiguration()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        app.state.service = service or VerificationService(config)
+        logger.info("Verification service ready")
+        try:
+            yield
+        finally:
+            app.state.service.close()
+
+    app = FastAPI(title="NetDoktor verification service", lifespan=lifespan)
+
+    @app.get("/health")
+    async def health() -> Dict[str, Any]:
+        return app.state.service.health()
+
+    @app.get("/stats")
+    async def stats() -> Dict[str, Any]:
+        return tracing.get_tracer().report()
+
+    @app.post("/search")
+    async def search(request: SearchRequest) -> Dict[str, Any]:
+        return {"results": await app.state.service.search(request.query, request.top_k)}
+
+    @app.post("/verify/claim")
+    async def verify_claim(request: ClaimRequest) -> Dict[str, Any]:
+        return await app.state.service.verify_claim(request)
+
+    @app.post("/verify/article")
+    async def verify_article(request: ArticleRequest) -> Dict[str, Any]:
+        return await app.state.service.verify_article(request)
+
+    return app
+
+app = create_app()
@@ -0,0 +1,140 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, NamedTuple, Sequence, TypeVar
+
+from retrieval_graph.search import SearchResults
+from shared.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+class _SearchRequest(NamedTuple):
+    query: str
+    k: int
+    future: Future
+
+class SearchBatcher:
+    """Collects concurrent search calls into micro-batches.
+    
+    Callers from any thread submit single queries; a background thread waits
+    up to ``max_wait_ms`` for more requests and then embeds and searches the
+    whole batch with one call to the wrapped searcher. Identical queries in a
+    batch are searched once. Exposes the same ``search(queries, k)`` interface
+    as the searcher, so it can back the retrieval graph's search node.
+    
+    Example:
+        >>> batcher = SearchBatcher(ChromaSearcher(vectorstore))
+        >>> hits = batcher.submit("verify: ...", k=5).result()
+    """
+    
+    def __init__(self, searcher: Any, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.searcher = searcher
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        
+        # Counters for the health endpoint
+        self.requests = 0
+        self.batches = 0
+        
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="search-batcher", daemon=True)
+        self._thread.start()
+    
+    def submit(self, query: str, k: int) -> Future:
+        """Queue a single query; the future resolves to its ranked hits."""
+        future: Future = Future()
+        self._queue.put(_SearchRequest(query, k, future))
+        return future
+    
+    def search(self, queries: Sequence[str], k: int) -> SearchResults:
+        """Blocking batch search through the batcher."""
+        futures = [self.submit(query, k) for query in queries]
+        return [future.result() for future in futures]
+    
+    async def asearch(self, queries: Sequence[str], k: int) -> SearchResults:
+        """Batch search from a coroutine; awaits the batcher without a thread hop."""
+        return list(await asyncio.gather(*(
+            asyncio.wrap_future(self.submit(query, k)) for query in queries
+        )))
+    
+    def close(self) -> None:
+        """Stop the background thread after draining queued requests."""
+        self._queue.put(None)
+        self._thread.join()
+    
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                break
+            
+            batch = [first]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                batch.append(request)
+            
+            self._execute(batch)
+    
+    def _execute(self, batch: List[_SearchRequest]) -> None:
+        # Requests cancelled while queued (discarded prefetches) are not searched
+        batch = [request for request in batch if request.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        queries = list(dict.fromkeys(request.query for request in batch))
+        k = max(request.k for request in batch)
+        
+        try:
+            results = dict(zip(queries, self.searcher.search(queries, k)))
+        except Exception as e:
+            logger.error("Batched search failed: %s", e)
+            for request in batch:
+                request.future.set_exception(e)
+            return
+        
+        self.batches += 1
+        self.requests += len(batch)
+        logger.debug("Searched %d queries for %d requests", len(queries), len(batch))
+        
+        for request in batch:
+            request.future.set_result(results[request.query][:request.k])
+
+class RequestCoalescer:
+    """Shares one in-flight computation between identical concurrent requests.
+    
+    The first caller for a key starts the work; callers arriving while it is
+    still running await the same result. Nothing is cached once it completes.
+    """
+    
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.started = 0
+        self.coalesced = 0
+    
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """Run ``func`` for ``key`` unless an identical call is in flight."""
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(func())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+            self.started += 1
+        else:
+            self.coalesced += 1
+        
+        # Shielded so one client disconnecting does not cancel the others
+        return await asyncio.shield(future)
@@ -0,0 +1,37 @@
+from dataclasses import dataclass, field
+
+from retrieval_graph.configuration import RetrievalConfiguration
+from query_formation.configuration import QueryFormationConfig
+from shared.scheduling import SchedulerConfiguration
+
+@dataclass
+class ServiceConfiguration:
+    """Configuration for the resident verification service."""
+    
+    # Server settings
+    host: str = "127.0.0.1"
+    port: int = 8000
+    
+    # Micro-batching of concurrent search calls
+    max_batch_size: int = field(
+        default=32,
+        metadata={"description": "Maximum number of queries embedded and searched together"}
+    )
+    max_batch_wait_ms: float = field(
+        default=5.0,
+        metadata={"description": "How long the first query of a batch waits for company"}
+    )
+    
+    # Article processing
+    max_concurrency: int = field(
+        default=16,
+        metadata={"description": "Maximum in-flight LLM calls per article request"}
+    )
+    
+    # Component settings
+    retrieval: RetrievalConfiguration = field(default_factory=RetrievalConfiguration)
+    query_formation: QueryFormationConfig = field(default_factory=QueryFormationConfig)
+    scheduler: SchedulerConfiguration = field(
+        default_factory=SchedulerConfiguration,
+        metadata={"description": "Priority classes and token budget for all LLM calls"}
+    )
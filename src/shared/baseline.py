@@ -0,0 +1,106 @@
+"""Results of the previous run of an article, for incremental re-checks.
+
+Articles are revised constantly, and most sentences survive an edit. An
+``ArticleBaseline`` holds the classifications (``sentences.json``) and
+verdicts (claim files) of the latest run of an article, keyed by sentence
+fingerprint: the normalized sentence under its heading and subheading
+(``records.sentence_fingerprint``). ``QueryFormationProcessor`` reuses the
+classification of every sentence found in the baseline, and
+``process_and_verify_claims`` reuses the verdict of a claim whose
+verification query is unchanged, so only new or modified text reaches the
+LLMs. Verdicts are reused as they were; ``reverify.py`` re-checks them when
+guidelines change.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from shared.logging_utils import get_logger
+from shared.output_formatter import iter_claims
+from shared.records import RecordTables, analysis_failed, sentence_fingerprint
+from shared.run_index import DEFAULT_INDEX_NAME, RunIndex
+
+logger = get_logger(__name__)
+
+class ArticleBaseline:
+    """Classifications and verdicts of one earlier run.
+
+    Args:
+        results_dir: Run directory written with record tables (runs with
+            inline claims cannot be matched and give an empty baseline)
+    """
+
+    def __init__(self, results_dir: Path):
+        self.results_dir = Path(results_dir)
+        self.classifications: Dict[str, Dict[str, Any]] = {}
+        self.verdicts: Dict[str, Dict[str, Any]] = {}
+
+        tables = RecordTables.load(self.results_dir)
+        if tables is None:
+            return
+        for fingerprint, record in tables.sentences.items():
+            classification = {
+                "needs_verification": record.needs_verification,
+                "query": record.query,
+                "reasoning": record.reasoning
+            }
+            # Failed classifications (written by older runs) count as new text
+            if not analysis_failed(classification):
+                self.classifications[fingerprint] = classification
+        for _, claim_data in iter_claims(self.results_dir):
+            paragraph = tables.paragraphs.get(claim_data.get("paragraph_id"))
+            if paragraph is None:
+                continue
+            fingerprint = sentence_fingerprint(
+                paragraph.heading, paragraph.subheading, claim_data["original_sentence"]
+            )
+            # Failed searches and syntheses are verified again
+            if (claim_data.get("verification_result") or {}).get("status") != "ERROR":
+                self.verdicts[fingerprint] = claim_data
+            # Runs written before sentences.json only know their claims
+            self.classifications.setdefault(fingerprint, {
+                "needs_verification": True,
+                "query": claim_data["verification_query"],
+                "reasoning": claim_data.get("verification_reasoning", "")
+            })
+
+    @classmethod
+    def for_article(cls, article: Path, results_root: Path) -> Optional["ArticleBaseline"]:
+        """Baseline from the latest indexed run of ``article``, or None."""
+        db_path = Path(results_root) / DEFAULT_INDEX_NAME
+        if not db_path.exists():
+            return None
+        with RunIndex(db_path) as index:
+            run = index.latest_run(str(article))
+        if run is None or not Path(run["results_dir"]).exists():
+            return None
+        baseline = cls(Path(run["results_dir"]))
+        logger.info(
+            "Comparing with run %s (%d sentences, %d verdicts)",
+            run["run_id"],
+            len(baseline.classifications),
+            len(baseline.verdicts)
+        )
+        return baseline
+
+    def classification(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Stored classification of a sentence, or None if it is new or edited."""
+        return self.classifications.get(fingerprint)
+
+    def verdict(self, fingerprint: str, query: str) -> Optional[Dict[str, Any]]:
+        """Stored retrieval and verdict of a claim, if its query is unchanged.
+
+        Returns:
+            ``{"chunks": [...], "verification": {...}}`` like
+            ``search_guidelines``, or None
+        """
+        claim_data = self.verdicts.get(fingerprint)
+        if claim_data is None or claim_data.get("verification_query") != query:
+            return None
+        chunks: List[Dict[str, Any]] = [
+            chunk for chunk in claim_data.get("retrieved_chunks") or [] if "content" in chunk
+        ]
+        return {
+            "chunks": chunks,
+            "verification": claim_data.get("verification_result") or {}
+        }
@@ -0,0 +1,183 @@
+"""Index-time cleaning: page furniture and near-duplicate chunks.
+
+Guideline PDFs repeat running headers, footers, page numbers and legal
+notes on every page, and overlapping chunk windows produce chunks that are
+almost identical. Both waste embedding calls and crowd real content out of
+``top_k``.
+
+``strip_page_furniture`` removes lines that recur on a large share of a
+document's pages (digits are ignored when comparing, so ``Seite 3 von 40``
+matches ``Seite 4 von 40``) and bare page numbers at the top or bottom of a
+page. ``drop_near_duplicates`` removes chunks whose MinHash signature is
+close to an earlier chunk's, using locality-sensitive hashing so only
+candidate pairs are compared.
+"""
+
+import re
+from collections import Counter
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Sequence, Tuple
+
+import mmh3
+import numpy as np
+from langchain_core.documents import Document
+
+# Lines at the top and bottom of a page where running headers/footers sit
+EDGE_LINES = 3
+
+_DIGITS = re.compile(r"\d+")
+_WHITESPACE = re.compile(r"\s+")
+_WORDS = re.compile(r"\w+", re.UNICODE)
+_PAGE_NUMBER = re.compile(r"^(seite|page|s\.)?\s*\d+(\s*(von|of|/)\s*\d+)?$", re.IGNORECASE)
+
+@dataclass
+class CleaningReport:
+    """What the cleaning stage removed."""
+    pages: int = 0
+    furniture_lines: int = 0
+    furniture_chars: int = 0
+    chunks: int = 0
+    duplicate_chunks: int = 0
+    duplicate_chars: int = 0
+
+    def merge(self, other: "CleaningReport") -> None:
+        for name, value in asdict(other).items():
+            setattr(self, name, getattr(self, name) + value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+def _line_key(line: str) -> str:
+    return _WHITESPACE.sub(" ", _DIGITS.sub("#", line)).strip().lower()
+
+def strip_page_furniture(
+    pages: List[Document],
+    min_page_share: float = 0.6,
+    min_pages: int = 3
+) -> Tuple[List[Document], CleaningReport]:
+    """Remove running headers, footers, page numbers and repeated boilerplate.
+
+    Args:
+        pages: Pages of one document, in order
+        min_page_share: A line counts as furniture when it appears on at
+            least this share of the pages
+        min_pages: Documents with fewer pages are only stripped of page numbers
+
+    Returns:
+        Cleaned pages (same metadata) and what was removed
+    """
+    report = CleaningReport(pages=len(pages))
+    page_lines = [page.page_content.splitlines() for page in pages]
+
+    # Count every distinct line once per page
+    counts = Counter(
+        key
+        for lines in page_lines
+        for key in {_line_key(line) for line in lines}
+        if key
+    )
+    threshold = max(2, int(min_page_share * len(pages) + 0.5))
+    repeated = (
+        {key for key, count in counts.items() if count >= threshold}
+        if len(pages) >= min_pages else set()
+    )
+
+    cleaned = []
+    for page, lines in zip(pages, page_lines):
+        kept = []
+        for number, line in enumerate(lines):
+            key = _line_key(line)
+            at_edge = number < EDGE_LINES or number >= len(lines) - EDGE_LINES
+            if key in repeated or (at_edge and _PAGE_NUMBER.match(line.strip())):
+                report.furniture_lines += 1
+                report.furniture_chars += len(line)
+            else:
+                kept.append(line)
+        cleaned.append(Document(page_content="\n".join(kept), metadata=page.metadata))
+
+    return cleaned, report
+
+class MinHasher:
+    """MinHash signatures over word shingles.
+
+    Each shingle is hashed once with MurmurHash3; the ``num_perm`` hash
+    functions are derived from it with multiply-shift hashing in NumPy.
+
+    Args:
+        num_perm: Signature length
+        shingle_size: Words per shingle
+        seed: Seed for the hash functions
+    """
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # Odd multipliers keep multiply-shift hashing universal
+        self._a = rng.integers(1, 2**63, size=(num_perm, 1), dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, size=(num_perm, 1), dtype=np.uint64)
+
+    def _shingles(self, text: str) -> np.ndarray:
+        words = _WORDS.findall(text.lower())
+        size = self.shingle_size
+        shingles = {
+            " ".join(words[i:i + size])
+            for i in range(max(len(words) - size + 1, 1))
+        }
+        return np.fromiter(
+            (mmh3.hash(shingle, 0, signed=False) for shingle in shingles),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+
+    def signature(self, text: str) -> np.ndarray:
+        shingles = self._shingles(text)
+        with np.errstate(over="ignore"):
+            hashed = (self._a * shingles[np.newaxis, :] + self._b) >> np.uint64(32)
+        return hashed.min(axis=1)
+
+def drop_near_duplicates(
+    chunks: Sequence[Document],
+    threshold: float = 0.85,
+    num_perm: int = 64,
+    bands: int = 16
+) -> Tuple[List[Document], CleaningReport]:
+    """Keep the first of every group of near-identical chunks.
+
+    Args:
+        chunks: Chunks in document order
+        threshold: Estimated Jaccard similarity (of 5-word shingles) above
+            which a chunk counts as a duplicate of an earlier one
+        num_perm: MinHash signature length
+        bands: LSH bands; ``num_perm`` must be divisible by it
+
+    Returns:
+        Remaining chunks and what was removed
+    """
+    if num_perm % bands:
+        raise ValueError("num_perm must be divisible by bands")
+    rows = num_perm // bands
+    hasher = MinHasher(num_perm=num_perm)
+    report = CleaningReport(chunks=len(chunks))
+
+    kept: List[Document] = []
+    signatures: List[np.ndarray] = []
+    buckets: Dict[Tuple[int, bytes], List[int]] = {}
+    for chunk in chunks:
+        signature = hasher.signature(chunk.page_content)
+        band_keys = [
+            (band, signature[band * rows:(band + 1) * rows].tobytes())
+            for band in range(bands)
+        ]
+        candidates = {index for key in band_keys for index in buckets.get(key, ())}
+        if any(np.mean(signatures[index] == signature) >= threshold for index in candidates):
+            report.duplicate_chunks += 1
+            report.duplicate_chars += len(chunk.page_content)
+            continue
+
+        for key in band_keys:
+            buckets.setdefault(key, []).append(len(kept))
+        signatures.append(signature)
+        kept.append(chunk)
+
+    return kept, report
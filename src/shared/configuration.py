@@ -1,5 +1,5 @@
-from dataclasses import dataclass, field
-from typing import Annotated
+from dataclasses import asdict, dataclass, field, fields
+from typing import Annotated, Any, Dict, Optional
 from pathlib import Path
 
 @dataclass
@@ -21,6 +21,10 @@ class BaseConfiguration:
         default="text-embedding-3-small",
         metadata={"description": "OpenAI embedding model to use"}
     )
+    embedding_dimensions: Optional[int] = field(
+        default=None,
+        metadata={"description": "Shortened embedding size supported by text-embedding-3 models (full size if None)"}
+    )
     
     # Path settings
     input_dir: Path = field(
@@ -32,4 +36,59 @@ class BaseConfiguration:
     vector_store_dir: Path = field(
         default=Path("vector_store"),
         metadata={"description": "Directory for storing vector databases"}
-    ) 
\ No newline at end of file
+    ) 
+@dataclass
+class HnswConfiguration:
+    """HNSW parameters of a Chroma collection.
+
+    Chroma fixes these when the collection is created; changing them for an
+    existing collection requires ``python -m index_graph.rebuild``. Defaults
+    are Chroma's own.
+    """
+    
+    space: str = field(
+        default="l2",
+        metadata={"description": "Distance function: l2, cosine or ip"}
+    )
+    construction_ef: int = field(
+        default=100,
+        metadata={"description": "Candidate list size while building the graph (higher = better recall, slower indexing)"}
+    )
+    search_ef: int = field(
+        default=10,
+        metadata={"description": "Candidate list size while searching (higher = better recall, slower queries)"}
+    )
+    M: int = field(
+        default=16,
+        metadata={"description": "Neighbours per node (higher = better recall, more memory)"}
+    )
+    batch_size: int = field(
+        default=100,
+        metadata={"description": "Vectors buffered before they are added to the HNSW index"}
+    )
+    sync_threshold: int = field(
+        default=1000,
+        metadata={"description": "Vectors added before the index is persisted to disk"}
+    )
+    num_threads: Optional[int] = field(
+        default=None,
+        metadata={"description": "Threads used to build the index (None = all cores)"}
+    )
+    
+    def to_metadata(self) -> Dict[str, Any]:
+        """Collection metadata understood by Chroma (``hnsw:*`` keys)."""
+        return {
+            f"hnsw:{name}": value
+            for name, value in asdict(self).items()
+            if value is not None
+        }
+    
+    @classmethod
+    def from_metadata(cls, metadata: Optional[Dict[str, Any]]) -> "HnswConfiguration":
+        """Read the settings of an existing collection (missing keys are Chroma defaults)."""
+        metadata = metadata or {}
+        return cls(**{
+            f.name: metadata[f"hnsw:{f.name}"]
+            for f in fields(cls)
+            if f"hnsw:{f.name}" in metadata
+        })
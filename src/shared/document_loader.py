@@ -1,13 +1,49 @@
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 from langchain_community.document_loaders import PyPDFLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
 
-def load_and_split_pdf(
+from shared.logging_utils import get_logger
+from shared.page_cache import PageCache
+
+logger = get_logger(__name__)
+
+def extract_pdf_pages(file_path: Path) -> List[Document]:
+    """Extract the text of every page of a PDF (one document per page)."""
+    return PyPDFLoader(str(file_path)).load()
+
+def load_pdf_pages(
     file_path: Path,
+    cache: Optional[PageCache] = None,
+    digest: Optional[str] = None
+) -> List[Document]:
+    """Pages of a PDF, from the parsed-page cache when one is given.
+
+    ``digest`` is the PDF's SHA-256 if already computed; the cache then
+    does not hash the file again.
+    """
+    if cache is None:
+        return extract_pdf_pages(file_path)
+    return cache.load(file_path, extract_pdf_pages, digest)
+
+def split_pages(
+    pages: List[Document],
     chunk_size: int = 1000,
     chunk_overlap: int = 100
+) -> List[Document]:
+    """Split pages into token-sized chunks, keeping the page metadata."""
+    text_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap
+    )
+    return text_splitter.split_documents(pages)
+
+def load_and_split_pdf(
+    file_path: Path,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 100,
+    cache: Optional[PageCache] = None
 ) -> List[Document]:
     """Load and chunk a PDF document.
     
@@ -15,6 +51,7 @@ def load_and_split_pdf(
         file_path: Path to the PDF file
         chunk_size: Size of text chunks
         chunk_overlap: Overlap between chunks
+        cache: Parsed-page cache, so re-chunking skips PDF parsing
         
     Returns:
         List of document chunks
@@ -23,14 +60,6 @@ def load_and_split_pdf(
         >>> chunks = load_and_split_pdf(Path("guideline.pdf"))
         >>> print(f"Created {len(chunks)} chunks")
     """
-    loader = PyPDFLoader(str(file_path))
-    documents = loader.load()
-    
-    text_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap
-    )
-    
-    chunks = text_splitter.split_documents(documents)
-    print(f"Created {len(chunks)} chunks from {file_path.name}")
-    return chunks 
\ No newline at end of file
+    chunks = split_pages(load_pdf_pages(file_path, cache), chunk_size, chunk_overlap)
+    logger.debug("Created %d chunks from %s", len(chunks), file_path.name)
+    return chunks
\ No newline at end of file
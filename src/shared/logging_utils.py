@@ -1,40 +1,133 @@
+import atexit
 import logging
+import logging.handlers
 import json
+import queue
+import sys
+import threading
 from pathlib import Path
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Union
+
+# Root of the application's logger hierarchy; third-party loggers (httpx,
+# chromadb, ...) stay untouched by configure_logging.
+ROOT_LOGGER = "netdoktor"
+
+# Attributes every LogRecord has; anything else was passed via ``extra``
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def get_logger(name: str) -> logging.Logger:
+    """Return a logger below the application root (``netdoktor.<name>``)."""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+class JsonLinesFormatter(logging.Formatter):
+    """Format records as compact single-line JSON objects.
+    
+    Fields passed through ``extra`` are included as top-level keys.
+    """
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=str)
+
+@atexit.register
+def _stop_listener() -> None:
+    """Stop the queue listener, flushing queued records."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+def configure_logging(
+    level: Union[int, str] = logging.INFO,
+    json_file: Optional[Path] = None,
+    console: bool = True
+) -> None:
+    """Route application logs through a background queue listener.
+    
+    Callers only enqueue records; formatting and I/O happen on the listener
+    thread, so logging does not serialize concurrent work on stdout. Calling
+    this again replaces the previous configuration.
+    
+    Args:
+        level: Minimum level for application loggers
+        json_file: Optional file receiving every record as a JSON line
+        console: Whether to print human-readable messages to stderr
+    """
+    global _listener
+    
+    _stop_listener()
+    
+    handlers = []
+    if console:
+        console_handler = logging.StreamHandler(sys.stderr)
+        console_handler.setFormatter(logging.Formatter("%(message)s"))
+        handlers.append(console_handler)
+    if json_file is not None:
+        Path(json_file).parent.mkdir(parents=True, exist_ok=True)
+        file_handler = logging.FileHandler(json_file, encoding='utf-8')
+        file_handler.setFormatter(JsonLinesFormatter())
+        handlers.append(file_handler)
+    
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger(ROOT_LOGGER)
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(level)
+    root.propagate = False
+    
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
 
 class QueryFormationLogger:
-    """Logger for query formation process with structured output."""
+    """Streams query formation results to a JSON lines file.
+    
+    Every analysis is appended (and flushed) as one line as soon as it is
+    logged, so results survive a crash and memory stays constant regardless
+    of article length. Summary statistics are kept as running counters.
+    """
     
     def __init__(self, log_dir: str = "logs/query_formation"):
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(parents=True, exist_ok=True)
         
-        # Create timestamp for log file
+        # Create timestamp for output files
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
-        # Setup main logger
-        self.logger = logging.getLogger("query_formation")
-        self.logger.setLevel(logging.INFO)
-        
-        # Remove any existing handlers
-        self.logger.handlers = []
-        
-        # Create single log file handler
-        self.log_file = self.log_dir / f"query_formation_{timestamp}.log"
-        file_handler = logging.FileHandler(self.log_file, encoding='utf-8')
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        file_handler.setFormatter(formatter)
-        
-        # Add handler
-        self.logger.addHandler(file_handler)
+        # Diagnostics go through the shared application logger hierarchy and
+        # take their level from configure_logging
+        self.logger = get_logger("query_formation")
         
-        # Store results for summary
-        self.results = []
+        # Streamed per-sentence results and the final summary
+        self.results_file = self.log_dir / f"query_formation_results_{timestamp}.jsonl"
+        self.json_file = self.log_dir / f"query_formation_summary_{timestamp}.json"
+        self._stream = None
+        self._lock = threading.Lock()
         
-        # Store JSON results file path
-        self.json_file = self.log_dir / f"query_formation_results_{timestamp}.json"
+        # Running counters for get_summary
+        self.total_sentences = 0
+        self.needs_verification = 0
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str)
+        with self._lock:
+            if self._stream is None:
+                self._stream = open(self.results_file, 'a', encoding='utf-8')
+            self._stream.write(line + "\n")
+            self._stream.flush()
 
     def log_analysis(
         self,
@@ -43,68 +136,69 @@ class QueryFormationLogger:
         analysis_result: Dict[str, Any]
     ) -> None:
         """Log a single sentence analysis with its context."""
+        needs_verification = bool(analysis_result.get('needs_verification', False))
         
-        # Create a nicely formatted log message
-        log_message = (
-            f"\nSentence Analysis:"
-            f"\n==================="
-            f"\nSentence: {sentence}"
-            f"\nContext:"
-            f"\n  Heading: {context.get('heading', '')}"
-            f"\n  Subheading: {context.get('subheading', '')}"
-            f"\n  Paragraph: {context.get('paragraph', '')}"
-            f"\nAnalysis Result:"
-            f"\n  Needs Verification: {analysis_result.get('needs_verification', False)}"
-            f"\n  Query: {analysis_result.get('query', 'None')}"
-            f"\n  Reasoning: {analysis_result.get('reasoning', 'None')}"
-            f"\n-------------------\n"
-        )
-        
-        self.logger.info(log_message)
+        # Detailed per-sentence output is only built when DEBUG is enabled
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                "Sentence analysis: needs_verification=%s query=%r sentence=%r",
+                needs_verification,
+                analysis_result.get('query'),
+                sentence,
+                extra={
+                    "heading": context.get('heading', ''),
+                    "subheading": context.get('subheading', ''),
+                    "reasoning": analysis_result.get('reasoning')
+                }
+            )
         
-        # Store structured result
-        self.results.append({
+        self._write({
             "sentence": sentence,
             "context": context,
             "analysis": analysis_result,
             "timestamp": datetime.now().isoformat()
         })
+        
+        with self._lock:
+            self.total_sentences += 1
+            if needs_verification:
+                self.needs_verification += 1
 
     def log_error(self, error_message: str, details: Dict[str, Any] = None) -> None:
         """Log error messages with optional details."""
-        self.logger.error(
-            f"Error: {error_message}"
-            + (f"\nDetails: {json.dumps(details, indent=2)}" if details else "")
-        )
+        self.logger.error("Error: %s", error_message, extra={"details": details} if details else None)
 
     def save_results(self) -> None:
-        """Save accumulated results to JSON file."""
-        summary = self.get_summary()
-        
+        """Write the summary file and flush the result stream."""
         output = {
-            "summary": summary,
-            "results": self.results,
+            "summary": self.get_summary(),
+            "results_file": str(self.results_file),
             "metadata": {
                 "timestamp": datetime.now().isoformat(),
-                "total_entries": len(self.results)
+                "total_entries": self.total_sentences
             }
         }
         
         with open(self.json_file, 'w', encoding='utf-8') as f:
             json.dump(output, f, indent=2, ensure_ascii=False)
+        self.close()
             
-        self.logger.info(f"Results saved to: {self.json_file}")
+        self.logger.info("Results saved to: %s", self.results_file)
+
+    def close(self) -> None:
+        """Close the result stream; later analyses reopen it in append mode."""
+        with self._lock:
+            if self._stream is not None:
+                self._stream.close()
+                self._stream = None
 
     def get_summary(self) -> Dict[str, Any]:
         """Get summary statistics of analyzed sentences."""
-        total = len(self.results)
-        needs_verification = sum(
-            1 for r in self.results 
-            if r["analysis"].get("needs_verification", False)
-        )
+        total = self.total_sentences
+        needs_verification = self.needs_verification
         
         return {
             "total_sentences": total,
             "needs_verification": needs_verification,
             "verification_rate": f"{(needs_verification/total)*100:.2f}%" if total > 0 else "0%"
-        } 
\ No newline at end of file
+        }
@@ -3,14 +3,93 @@ from rich.table import Table
 from rich.panel import Panel
 from rich.text import Text
 from rich.box import ROUNDED
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Tuple
 from pathlib import Path
+import argparse
+import itertools
+import json
+import re
+
+from shared.records import RecordTables
+
+def _truncate(text: str, max_chars: Optional[int]) -> str:
+    """Shorten text to ``max_chars`` characters (None keeps it whole)."""
+    if max_chars is None or len(text) <= max_chars:
+        return text
+    return text[:max_chars].rstrip() + " …"
+
+def _claim_number(claim_file: Path) -> int:
+    match = re.search(r"(\d+)$", claim_file.stem)
+    return int(match.group(1)) if match else 0
+
+def claim_files(results_dir: Path) -> List[Path]:
+    """List claim files of a run in claim order (claim_2 before claim_10)."""
+    return sorted(results_dir.glob("claim_*.json"), key=_claim_number)
+
+def claim_matches(
+    claim_data: Dict[str, Any],
+    statuses: Optional[Sequence[str]] = None,
+    min_confidence: Optional[float] = None
+) -> bool:
+    """Check a claim against the status and confidence filters."""
+    result = claim_data.get("verification_result") or {}
+    if statuses and result.get("status") not in statuses:
+        return False
+    if min_confidence is not None and (result.get("confidence_score") or 0.0) < min_confidence:
+        return False
+    return True
+
+def iter_claims(
+    results_dir: Path,
+    statuses: Optional[Sequence[str]] = None,
+    min_confidence: Optional[float] = None,
+    resolve: bool = True
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Lazily load matching claims as ``(claim_number, claim_data)`` pairs.
+    
+    With ``resolve`` the paragraph and chunk text of compact runs is filled
+    in from the run's ``paragraphs.json``/``chunks.json``, so callers see
+    the same layout for old and new runs. Without it, retrieved chunks of
+    compact runs only carry ``id`` and ``score``; ``resolve_claims`` fills
+    in a selection of them later.
+    """
+    tables = RecordTables.load(results_dir) if resolve else None
+    for claim_file in claim_files(results_dir):
+        with open(claim_file, 'r', encoding='utf-8') as f:
+            claim_data = json.load(f)
+        if claim_matches(claim_data, statuses, min_confidence):
+            if tables is not None:
+                claim_data = tables.resolve(claim_data)
+            yield _claim_number(claim_file), claim_data
+
+def resolve_claims(
+    results_dir: Path,
+    claims: List[Tuple[int, Dict[str, Any]]]
+) -> List[Tuple[int, Dict[str, Any]]]:
+    """Fill in the paragraph and chunk text of claims read with ``resolve=False``.
+
+    Only the paragraphs and chunks the given claims refer to are kept, so a
+    page of claims does not build the records of the whole run.
+    """
+    if not claims:
+        return claims
+    paragraph_ids = {claim_data.get("paragraph_id") for _, claim_data in claims}
+    chunk_ids = {
+        hit.get("id")
+        for _, claim_data in claims
+        for hit in claim_data.get("retrieved_chunks") or []
+    }
+    tables = RecordTables.load(results_dir, paragraph_ids, chunk_ids)
+    if tables is None:
+        return claims
+    return [(claim_number, tables.resolve(claim_data)) for claim_number, claim_data in claims]
 
 class VerificationOutputFormatter:
     """Format verification results for console output."""
     
-    def __init__(self):
+    def __init__(self, max_chunk_chars: Optional[int] = 300):
         self.console = Console()
+        self.max_chunk_chars = max_chunk_chars
         
     def format_claim(self, claim_data: Dict[str, Any], claim_number: int) -> None:
         """Format a single claim verification result."""
@@ -56,7 +135,7 @@ class VerificationOutputFormatter:
             table.add_column("Source", style="dim", width=30)
             
             for chunk in claim_data["retrieved_chunks"]:
-                content = chunk["content"]
+                content = _truncate(chunk["content"], self.max_chunk_chars)
                 source = Path(chunk["metadata"]["source"]).name
                 score = f"{chunk['score']:.3f}"
                 table.add_row(score, content, source)
@@ -74,12 +153,15 @@ class VerificationOutputFormatter:
                 message_text = "\n".join(messages)
             else:
                 message_text = str(messages)
+            # Synthesized results carry their explanation in the analysis block
+            if not message_text and isinstance(result.get("analysis"), dict):
+                message_text = result["analysis"].get("reasoning", "")
             
             result_panel = Panel(
                 Text(message_text or "No verification message available", style="bold white"),
                 title=f"Verification Result ({result.get('status', 'NO_RESULT')})",
                 box=ROUNDED,
-                border_style="green" if result.get("status") == "SUCCESS" else "red"
+                border_style="green" if result.get("status") in ("SUCCESS", "VALID") else "red"
             )
             self.console.print(result_panel, soft_wrap=True, crop=False)
         else:
@@ -95,20 +177,113 @@ class VerificationOutputFormatter:
         # Separator
         self.console.print("\n" + "="*80 + "\n", soft_wrap=True, crop=False)
 
-def format_verification_results(results_dir: Path) -> None:
-    """Format all verification results from a directory."""
-    import json
+    def format_summary_table(self, claims: List[Tuple[int, Dict[str, Any]]], title: str) -> None:
+        """Render claims as one compact table row each."""
+        table = Table(
+            title=title,
+            box=ROUNDED,
+            show_header=True,
+            header_style="bold magenta",
+            expand=True
+        )
+        table.add_column("#", style="cyan", justify="right", no_wrap=True, width=4)
+        table.add_column("Status", no_wrap=True, width=9)
+        table.add_column("Conf.", justify="right", no_wrap=True, width=5)
+        table.add_column("Claim", style="yellow", overflow="ellipsis", no_wrap=True, ratio=1)
+        table.add_column("Top Source", style="dim", overflow="ellipsis", no_wrap=True, width=20)
+        
+        for claim_number, claim_data in claims:
+            result = claim_data.get("verification_result") or {}
+            status = result.get("status", "NO_RESULT")
+            confidence = result.get("confidence_score")
+            chunks = claim_data.get("retrieved_chunks") or []
+            top_source = Path(chunks[0]["metadata"]["source"]).name if chunks else "-"
+            table.add_row(
+                str(claim_number),
+                f"[green]{status}[/green]" if status in ("SUCCESS", "VALID") else f"[red]{status}[/red]",
+                f"{confidence:.2f}" if isinstance(confidence, (int, float)) else "-",
+                claim_data.get("original_sentence", ""),
+                top_source
+            )
+        
+        self.console.print(table)
+
+def format_verification_results(
+    results_dir: Path,
+    statuses: Optional[Sequence[str]] = None,
+    min_confidence: Optional[float] = None,
+    page: int = 1,
+    page_size: Optional[int] = 20,
+    max_chunk_chars: Optional[int] = 300,
+    compact: bool = False
+) -> None:
+    """Format verification results from a directory, one page at a time.
     
-    formatter = VerificationOutputFormatter()
-    console = Console()
+    Claim files are read lazily and only until the requested page is full,
+    so rendering cost depends on the page, not on the size of the run.
     
-    # Get all claim files
-    claim_files = sorted(results_dir.glob("claim_*.json"))
+    Args:
+        results_dir: Run directory containing ``claim_*.json`` files
+        statuses: Only show claims with these statuses (e.g. FLAGGED, UNCLEAR)
+        min_confidence: Only show claims with at least this confidence score
+        page: 1-based page number
+        page_size: Claims per page (None renders all matching claims)
+        max_chunk_chars: Truncate evidence chunks to this length (None = full text)
+        compact: Render a one-line-per-claim summary table instead of panels
+    """
+    formatter = VerificationOutputFormatter(max_chunk_chars=max_chunk_chars)
+    console = formatter.console
     
-    console.print(f"\n[bold]Processing {len(claim_files)} claims from {results_dir.name}[/bold]\n", 
-                 soft_wrap=True, crop=False)
+    # Claims are resolved once the page is known, from the records it cites
+    claims = iter_claims(results_dir, statuses, min_confidence, resolve=False)
+    has_more = False
+    if page_size is not None:
+        start = (page - 1) * page_size
+        # Read one claim beyond the page to know whether another page exists
+        claims = list(itertools.islice(claims, start, start + page_size + 1))
+        has_more = len(claims) > page_size
+        claims = claims[:page_size]
+    claims = resolve_claims(results_dir, list(claims))
     
-    for i, claim_file in enumerate(claim_files, 1):
-        with open(claim_file, 'r', encoding='utf-8') as f:
-            claim_data = json.load(f)
-        formatter.format_claim(claim_data, i) 
\ No newline at end of file
+    filters = []
+    if statuses:
+        filters.append("status " + "/".join(statuses))
+    if min_confidence is not None:
+        filters.append(f"confidence >= {min_confidence}")
+    title = f"{results_dir.name} page {page}" + (f" ({', '.join(filters)})" if filters else "")
+    console.print(f"\n[bold]Claims from {title}[/bold]\n", soft_wrap=True, crop=False)
+    
+    if compact and claims:
+        formatter.format_summary_table(claims, title)
+    elif not compact:
+        for claim_number, claim_data in claims:
+            formatter.format_claim(claim_data, claim_number)
+    if not claims:
+        console.print("[yellow]No matching claims[/yellow]")
+    elif has_more:
+        console.print(f"[dim]More claims available - use page {page + 1} to continue[/dim]")
+
+def main():
+    """Command line entry point for browsing a results directory."""
+    parser = argparse.ArgumentParser(description='Show verification results.')
+    parser.add_argument('results_dir', type=Path, help='Run directory, e.g. results/20250101_120000')
+    parser.add_argument('--status', nargs='+', help='Only show these statuses (e.g. FLAGGED UNCLEAR)')
+    parser.add_argument('--min-confidence', type=float, help='Only show claims with at least this confidence')
+    parser.add_argument('--page', type=int, default=1)
+    parser.add_argument('--page-size', type=int, default=20, help='Claims per page (0 shows all)')
+    parser.add_argument('--max-chunk-chars', type=int, default=300, help='Truncate evidence chunks (0 shows full text)')
+    parser.add_argument('--compact', action='store_true', help='One table row per claim')
+    args = parser.parse_args()
+    
+    format_verification_results(
+        args.results_dir,
+        statuses=[status.upper() for status in args.status] if args.status else None,
+        min_confidence=args.min_confidence,
+        page=args.page,
+        page_size=args.page_size or None,
+        max_chunk_chars=args.max_chunk_chars or None,
+        compact=args.compact
+    )
+
+if __name__ == "__main__":
+    main()
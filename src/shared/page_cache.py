@@ -0,0 +1,211 @@
+"""On-disk cache of extracted PDF pages.
+
+Text extraction with ``PyPDFLoader`` is the slowest CPU step of indexing,
+and chunking experiments repeat it for every ``chunk_size``/``chunk_overlap``
+combination. ``PageCache`` stores the extracted page text and metadata as
+gzipped JSON, keyed by the SHA-256 of the PDF and the extractor version, so
+an unchanged PDF is parsed once and a new pypdf release invalidates the
+entries. Entries are evicted by age and by total size, least recently used
+first.
+
+Example:
+    python -m shared.page_cache stats
+    python -m shared.page_cache evict --max-age-days 7 --max-mb 200
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.documents import Document
+
+from shared.logging_utils import configure_logging, get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CACHE_DIR = Path(".cache/pages")
+
+def extractor_version() -> str:
+    """Identifier of the text extraction stack; part of every cache key."""
+    try:
+        import pypdf
+        pypdf_version = pypdf.__version__
+    except ImportError:  # pragma: no cover - optional dependency
+        pypdf_version = "none"
+    return f"pypdfloader-pypdf{pypdf_version}"
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class PageCache:
+    """Extracted pages keyed by PDF content hash and extractor version.
+
+    Args:
+        cache_dir: Directory holding the cache entries
+        max_age_days: Evict entries not used for this long (keep if None)
+        max_mb: Evict least recently used entries above this total size
+            (unbounded if None)
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path = DEFAULT_CACHE_DIR,
+        max_age_days: Optional[float] = 30,
+        max_mb: Optional[float] = 500
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_age_days = max_age_days
+        self.max_mb = max_mb
+        self.version = extractor_version()
+        self.hits = 0
+        self.misses = 0
+
+    def _entry(self, file_path: Path, digest: Optional[str] = None) -> Path:
+        version = hashlib.sha1(self.version.encode("utf-8")).hexdigest()[:8]
+        return self.cache_dir / f"{digest or file_sha256(file_path)}-{version}.json.gz"
+
+    def get(self, file_path: Path, entry: Optional[Path] = None) -> Optional[List[Document]]:
+        """Cached pages of a PDF, or None."""
+        entry = entry or self._entry(file_path)
+        try:
+            with gzip.open(entry, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Mark as recently used for eviction
+        os.utime(entry)
+
+        # The same PDF may have been cached under another path
+        return [
+            Document(
+                page_content=page["page_content"],
+                metadata={**page["metadata"], "source": str(file_path)}
+            )
+            for page in data["pages"]
+        ]
+
+    def put(self, file_path: Path, pages: List[Document], entry: Optional[Path] = None) -> None:
+        """Store the pages of a PDF."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entry = entry or self._entry(file_path)
+        tmp_entry = entry.with_name(entry.name + ".tmp")
+        with gzip.open(tmp_entry, 'wt', encoding='utf-8') as f:
+            json.dump({
+                "extractor": self.version,
+                "source": str(file_path),
+                "pages": [
+                    {"page_content": page.page_content, "metadata": page.metadata}
+                    for page in pages
+                ]
+            }, f, ensure_ascii=False)
+        os.replace(tmp_entry, entry)
+
+    def load(
+        self,
+        file_path: Path,
+        extract: Callable[[Path], List[Document]],
+        digest: Optional[str] = None
+    ) -> List[Document]:
+        """Cached pages of a PDF, extracting and storing them on a miss.
+
+        Args:
+            file_path: PDF to load
+            extract: Parser used on a miss
+            digest: ``file_sha256`` of the PDF if the caller already has it,
+                so the file is not read again to find its entry
+        """
+        entry = self._entry(file_path, digest)
+        pages = self.get(file_path, entry)
+        if pages is not None:
+            self.hits += 1
+            logger.debug("Page cache hit for %s", file_path.name)
+            return pages
+
+        self.misses += 1
+        pages = extract(file_path)
+        self.put(file_path, pages, entry)
+        return pages
+
+    def entries(self) -> List[Path]:
+        if not self.cache_dir.exists():
+            return []
+        return list(self.cache_dir.glob("*.json.gz"))
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self.entries()
+        return {
+            "cache_dir": str(self.cache_dir),
+            "extractor": self.version,
+            "entries": len(entries),
+            "size_mb": round(sum(entry.stat().st_size for entry in entries) / (1024 * 1024), 3),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+    def evict(self) -> int:
+        """Remove expired entries, then the least recently used above ``max_mb``.
+
+        Returns:
+            Number of removed entries
+        """
+        entries = sorted(
+            ((entry, entry.stat()) for entry in self.entries()),
+            key=lambda item: item[1].st_mtime
+        )
+        removed = 0
+        now = time.time()
+        if self.max_age_days is not None:
+            cutoff = now - self.max_age_days * 86400
+            while entries and entries[0][1].st_mtime < cutoff:
+                entries.pop(0)[0].unlink(missing_ok=True)
+                removed += 1
+
+        if self.max_mb is not None:
+            total = sum(stat.st_size for _, stat in entries)
+            while entries and total > self.max_mb * 1024 * 1024:
+                entry, stat = entries.pop(0)
+                entry.unlink(missing_ok=True)
+                total -= stat.st_size
+                removed += 1
+
+        if removed:
+            logger.info("Evicted %d page cache entries from %s", removed, self.cache_dir)
+        return removed
+
+    def clear(self) -> int:
+        entries = self.entries()
+        for entry in entries:
+            entry.unlink(missing_ok=True)
+        return len(entries)
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description='Inspect or trim the parsed PDF page cache.')
+    parser.add_argument('--cache-dir', type=Path, default=DEFAULT_CACHE_DIR)
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('stats', help='Show entry count and size')
+    evict = commands.add_parser('evict', help='Remove old entries and trim to a size')
+    evict.add_argument('--max-age-days', type=float, default=30)
+    evict.add_argument('--max-mb', type=float, default=500)
+    commands.add_parser('clear', help='Remove all entries')
+    args = parser.parse_args()
+
+    configure_logging()
+
+    if args.command == 'evict':
+        PageCache(args.cache_dir, args.max_age_days, args.max_mb).evict()
+    elif args.command == 'clear':
+        print(f"Removed {PageCache(args.cache_dir).clear()} entries")
+    print(json.dumps(PageCache(args.cache_dir).stats(), indent=2))
+
+if __name__ == "__main__":
+    main()
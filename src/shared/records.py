@@ -0,0 +1,252 @@
+"""Compact claim and retrieval records.
+
+Claims and retrieval hits are small ``__slots__`` records that point to
+their paragraph and guideline chunks by id instead of embedding copies of
+the text. ``RecordTables`` holds each paragraph and chunk once per run and
+is written next to the claim files as ``paragraphs.json`` and
+``chunks.json``; ``claim_<n>.json`` then only carries the ids and scores.
+``output_formatter.iter_claims`` resolves the references when reading, so
+runs written in either layout look the same to readers. ``sentences.json``
+records the classification of every sentence by fingerprint, so the next
+run of an edited article can reuse it (see ``shared.baseline``).
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+PARAGRAPHS_FILE = "paragraphs.json"
+CHUNKS_FILE = "chunks.json"
+SENTENCES_FILE = "sentences.json"
+
+# Reasoning of classifications that failed (API error, no tool call); they
+# are not stored, so the sentence is classified again next run
+ANALYSIS_ERROR_PREFIX = "Fehler bei der Analyse"
+
+# Plain ``__slots__`` instead of ``dataclass(slots=True)``, which needs
+# Python 3.10; slotted dataclasses therefore have no field defaults.
+
+@dataclass
+class Paragraph:
+    """Article paragraph a claim was taken from."""
+    __slots__ = ("id", "heading", "subheading", "text")
+    id: str
+    heading: str
+    subheading: Optional[str]
+    text: str
+
+@dataclass
+class Claim:
+    """Sentence that needs verification, with its query."""
+    __slots__ = ("sentence", "query", "reasoning", "paragraph_id")
+    sentence: str
+    query: str
+    reasoning: str
+    paragraph_id: str
+
+@dataclass
+class SentenceRecord:
+    """Classification of an article sentence."""
+    __slots__ = ("fingerprint", "paragraph_id", "sentence", "needs_verification", "query", "reasoning")
+    fingerprint: str
+    paragraph_id: str
+    sentence: str
+    needs_verification: bool
+    query: Optional[str]
+    reasoning: Optional[str]
+
+@dataclass
+class ChunkRecord:
+    """Guideline chunk as returned by retrieval."""
+    __slots__ = ("id", "content", "metadata")
+    id: str
+    content: str
+    metadata: Dict[str, Any]
+
+@dataclass
+class ChunkHit:
+    """Reference to a retrieved chunk and its score for one claim."""
+    __slots__ = ("chunk_id", "score")
+    chunk_id: str
+    score: Optional[float]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.chunk_id, "score": self.score}
+
+@dataclass
+class VerifiedClaim:
+    """A claim with its retrieval hits and verification result."""
+    __slots__ = ("claim", "hits", "verification")
+    claim: Claim
+    hits: List[ChunkHit]
+    verification: Dict[str, Any]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Compact ``claim_<n>.json`` content (references only)."""
+        return {
+            "original_sentence": self.claim.sentence,
+            "paragraph_id": self.claim.paragraph_id,
+            "verification_query": self.claim.query,
+            "verification_reasoning": self.claim.reasoning,
+            "retrieved_chunks": [hit.to_dict() for hit in self.hits],
+            "verification_result": self.verification
+        }
+
+def _digest(*parts: str) -> str:
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+def sentence_fingerprint(heading: Optional[str], subheading: Optional[str], sentence: str) -> str:
+    """Identifier of a sentence under its headings, stable across edits elsewhere.
+
+    Whitespace is normalized, so re-wrapped text keeps its fingerprint.
+    """
+    return _digest(heading or "", subheading or "", " ".join(sentence.split()))
+
+def analysis_failed(analysis: Dict[str, Any]) -> bool:
+    """Whether a classification is an error fallback rather than a result."""
+    return not analysis.get("needs_verification") and (analysis.get("reasoning") or "").startswith(ANALYSIS_ERROR_PREFIX)
+
+class RecordTables:
+    """Paragraphs, sentences and chunks shared by all claims of a run."""
+
+    def __init__(self):
+        self.paragraphs: Dict[str, Paragraph] = {}
+        self.sentences: Dict[str, SentenceRecord] = {}
+        self.chunks: Dict[str, ChunkRecord] = {}
+
+    def add_paragraph(self, heading: str, subheading: Optional[str], text: str) -> str:
+        """Store a paragraph once and return its id."""
+        paragraph_id = _digest(heading or "", subheading or "", text)
+        if paragraph_id not in self.paragraphs:
+            self.paragraphs[paragraph_id] = Paragraph(paragraph_id, heading, subheading, text)
+        return paragraph_id
+
+    def add_sentence(self, paragraph_id: str, sentence: str, analysis: Dict[str, Any]) -> str:
+        """Store the classification of a sentence and return its fingerprint."""
+        paragraph = self.paragraphs[paragraph_id]
+        fingerprint = sentence_fingerprint(paragraph.heading, paragraph.subheading, sentence)
+        self.sentences[fingerprint] = SentenceRecord(
+            fingerprint,
+            paragraph_id,
+            sentence,
+            bool(analysis.get("needs_verification")),
+            analysis.get("query"),
+            analysis.get("reasoning")
+        )
+        return fingerprint
+
+    def add_chunks(self, chunks: Iterable[Dict[str, Any]]) -> List[ChunkHit]:
+        """Store retrieved chunks once and return their hits.
+
+        Args:
+            chunks: Results with ``content``, ``metadata``, ``score`` and
+                (usually) the vector store ``id``
+        """
+        hits = []
+        for chunk in chunks:
+            metadata = chunk.get("metadata") or {}
+            chunk_id = chunk.get("id") or _digest(str(metadata.get("source", "")), chunk["content"])
+            # A chunk re-indexed under the same id since the tables were
+            # written (see reverify.py) takes its current content
+            known = self.chunks.get(chunk_id)
+            if known is None or known.content != chunk["content"]:
+                self.chunks[chunk_id] = ChunkRecord(chunk_id, chunk["content"], metadata)
+            hits.append(ChunkHit(chunk_id, chunk.get("score")))
+        return hits
+
+    def write(self, results_dir: Path) -> None:
+        """Write ``paragraphs.json``, ``sentences.json`` and ``chunks.json`` into a run directory."""
+        _write_json(Path(results_dir) / PARAGRAPHS_FILE, {
+            p.id: {"heading": p.heading, "subheading": p.subheading, "text": p.text}
+            for p in self.paragraphs.values()
+        })
+        _write_json(Path(results_dir) / SENTENCES_FILE, {
+            s.fingerprint: {
+                "paragraph_id": s.paragraph_id,
+                "sentence": s.sentence,
+                "needs_verification": s.needs_verification,
+                "query": s.query,
+                "reasoning": s.reasoning
+            }
+            for s in self.sentences.values()
+        })
+        _write_json(Path(results_dir) / CHUNKS_FILE, {
+            c.id: {"content": c.content, "metadata": c.metadata}
+            for c in self.chunks.values()
+        })
+
+    @classmethod
+    def load(
+        cls,
+        results_dir: Path,
+        paragraph_ids: Optional[Set[str]] = None,
+        chunk_ids: Optional[Set[str]] = None
+    ) -> Optional["RecordTables"]:
+        """Tables of a run directory, or None for runs with inline claims.
+
+        Args:
+            results_dir: Run directory
+            paragraph_ids: Only keep these paragraphs
+            chunk_ids: Only keep these chunks; when either filter is given
+                the tables are for resolving claims and ``sentences.json``
+                is not read
+        """
+        results_dir = Path(results_dir)
+        if not (results_dir / CHUNKS_FILE).exists():
+            return None
+        tables = cls()
+        with open(results_dir / CHUNKS_FILE, 'r', encoding='utf-8') as f:
+            for chunk_id, chunk in json.load(f).items():
+                if chunk_ids is None or chunk_id in chunk_ids:
+                    tables.chunks[chunk_id] = ChunkRecord(chunk_id, chunk["content"], chunk["metadata"])
+        if (results_dir / PARAGRAPHS_FILE).exists():
+            with open(results_dir / PARAGRAPHS_FILE, 'r', encoding='utf-8') as f:
+                for paragraph_id, p in json.load(f).items():
+                    if paragraph_ids is None or paragraph_id in paragraph_ids:
+                        tables.paragraphs[paragraph_id] = Paragraph(
+                            paragraph_id, p["heading"], p["subheading"], p["text"]
+                        )
+        partial = paragraph_ids is not None or chunk_ids is not None
+        if not partial and (results_dir / SENTENCES_FILE).exists():
+            with open(results_dir / SENTENCES_FILE, 'r', encoding='utf-8') as f:
+                for fingerprint, s in json.load(f).items():
+                    tables.sentences[fingerprint] = SentenceRecord(
+                        fingerprint,
+                        s["paragraph_id"],
+                        s["sentence"],
+                        s["needs_verification"],
+                        s["query"],
+                        s["reasoning"]
+                    )
+        return tables
+
+    def resolve(self, claim_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Expand a compact claim into the inline layout.
+
+        Adds ``context_paragraph`` and the ``content``/``metadata`` of every
+        retrieved chunk; claims that are already inline pass through.
+        """
+        paragraph = self.paragraphs.get(claim_data.get("paragraph_id"))
+        if paragraph is not None and "context_paragraph" not in claim_data:
+            claim_data["context_paragraph"] = paragraph.text
+        resolved = []
+        for hit in claim_data.get("retrieved_chunks") or []:
+            chunk = self.chunks.get(hit.get("id"))
+            if chunk is not None and "content" not in hit:
+                hit = {"content": chunk.content, "metadata": chunk.metadata, **hit}
+            resolved.append(hit)
+        claim_data["retrieved_chunks"] = resolved
+        return claim_data
+
+def _write_json(path: Path, data: Any) -> None:
+    tmp_path = path.with_suffix(".json.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
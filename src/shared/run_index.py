@@ -0,0 +1,492 @@
+"""SQLite index of verification results across runs.
+
+Every run of ``process_and_verify_claims`` writes one directory of claim JSON
+files. The index keeps one row per run and one row per claim (status,
+confidence, top chunk ids), so questions like "how many FLAGGED claims did
+last week's articles have" are answered without opening the run directories.
+Every retrieved chunk a claim relied on is recorded as evidence (chunk id,
+content hash, source), so the claims affected by a guideline update can be
+found without reading the claims (see ``reverify.py``).
+
+The index is updated when a run completes. Existing archives can be imported
+with ``backfill``:
+
+    python -m shared.run_index backfill results
+    python -m shared.run_index runs --since 2025-01-01
+    python -m shared.run_index trend --status FLAGGED UNCLEAR
+    python -m shared.run_index claims --status FLAGGED --article article.md
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from rich.box import ROUNDED
+from rich.console import Console
+from rich.table import Table
+
+from shared.logging_utils import get_logger
+from shared.output_formatter import iter_claims
+
+logger = get_logger(__name__)
+
+DEFAULT_INDEX_NAME = "index.sqlite"
+
+# Number of retrieved chunk ids stored per claim
+TOP_CHUNKS = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    article TEXT,
+    results_dir TEXT NOT NULL,
+    total_claims INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS claims (
+    run_id TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    claim_number INTEGER NOT NULL,
+    claim_hash TEXT NOT NULL,
+    status TEXT,
+    confidence REAL,
+    top_chunk_ids TEXT NOT NULL,
+    PRIMARY KEY (run_id, claim_number)
+);
+CREATE TABLE IF NOT EXISTS evidence (
+    run_id TEXT NOT NULL,
+    claim_number INTEGER NOT NULL,
+    rank INTEGER NOT NULL,
+    chunk_id TEXT NOT NULL,
+    content_hash TEXT,
+    source TEXT,
+    PRIMARY KEY (run_id, claim_number, rank),
+    FOREIGN KEY (run_id, claim_number) REFERENCES claims(run_id, claim_number) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_runs_started_at ON runs(started_at);
+CREATE INDEX IF NOT EXISTS idx_claims_status ON claims(status);
+CREATE INDEX IF NOT EXISTS idx_claims_hash ON claims(claim_hash);
+CREATE INDEX IF NOT EXISTS idx_evidence_chunk ON evidence(chunk_id);
+CREATE INDEX IF NOT EXISTS idx_evidence_content ON evidence(content_hash);
+CREATE INDEX IF NOT EXISTS idx_evidence_source ON evidence(source);
+"""
+
+def claim_hash(sentence: str) -> str:
+    """Stable identifier of a claim sentence across runs (whitespace-insensitive)."""
+    normalized = re.sub(r"\s+", " ", sentence).strip()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+
+def content_hash(text: str) -> str:
+    """Identifier of chunk text, independent of the chunk's id."""
+    return claim_hash(text)
+
+def chunk_id(chunk: Dict[str, Any]) -> str:
+    """Identifier of a retrieved chunk.
+
+    Uses the vector store id when the result contains one, and falls back to
+    ``source:page`` for results written before ids were recorded.
+    """
+    if chunk.get("id"):
+        return str(chunk["id"])
+    metadata = chunk.get("metadata") or {}
+    return f"{Path(str(metadata.get('source', '?'))).name}:{metadata.get('page', '?')}"
+
+def _started_at(run_id: str) -> str:
+    """ISO timestamp from a ``%Y%m%d_%H%M%S`` run id (run id if it does not parse).
+
+    Runs started in the same second carry a ``_<n>`` suffix (see reverify.py),
+    which becomes a fraction so they still sort in start order.
+    """
+    match = re.fullmatch(r"(\d{4})(\d{2})(\d{2})_(\d{2})(\d{2})(\d{2})(?:_(\d+))?", run_id)
+    if not match:
+        return run_id
+    year, month, day, hour, minute, second, suffix = match.groups()
+    started_at = f"{year}-{month}-{day}T{hour}:{minute}:{second}"
+    return f"{started_at}.{int(suffix):06d}" if suffix else started_at
+
+class RunIndex:
+    """Read/write access to the run index database.
+
+    Args:
+        db_path: SQLite file; created with its schema on first use
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "RunIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def record_run(
+        self,
+        run_id: str,
+        results_dir: Path,
+        article: Optional[str],
+        claims: Iterable[Tuple[int, Dict[str, Any]]]
+    ) -> int:
+        """Insert or replace a run and its claims.
+
+        Args:
+            run_id: Run identifier (the results directory name)
+            results_dir: Directory holding the run's claim files
+            article: Input article path
+            claims: ``(claim_number, claim_data)`` pairs as written to
+                ``claim_<n>.json``; chunk content and metadata (resolved)
+                fill in the evidence hashes and sources
+
+        Returns:
+            Number of claims recorded
+        """
+        rows = []
+        evidence = []
+        for claim_number, claim_data in claims:
+            result = claim_data.get("verification_result") or {}
+            chunks = claim_data.get("retrieved_chunks") or []
+            for rank, chunk in enumerate(chunks):
+                evidence.append((
+                    run_id,
+                    claim_number,
+                    rank,
+                    chunk_id(chunk),
+                    content_hash(chunk["content"]) if chunk.get("content") is not None else None,
+                    (chunk.get("metadata") or {}).get("source")
+                ))
+            rows.append((
+                run_id,
+                claim_number,
+                claim_hash(claim_data.get("original_sentence", "")),
+                result.get("status"),
+                result.get("confidence_score"),
+                json.dumps([chunk_id(chunk) for chunk in chunks[:TOP_CHUNKS]])
+            ))
+
+        with self._conn:
+            self._conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+            self._conn.execute(
+                "INSERT INTO runs (run_id, started_at, article, results_dir, total_claims) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (run_id, _started_at(run_id), article, str(results_dir), len(rows))
+            )
+            self._conn.executemany(
+                "INSERT INTO claims (run_id, claim_number, claim_hash, status, confidence, top_chunk_ids) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.executemany(
+                "INSERT INTO evidence (run_id, claim_number, rank, chunk_id, content_hash, source) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                evidence
+            )
+        return len(rows)
+
+    def index_results_dir(self, results_dir: Path) -> int:
+        """Read a finished run directory and record it."""
+        results_dir = Path(results_dir)
+        summary_file = results_dir / "summary.json"
+        summary = {}
+        if summary_file.exists():
+            with open(summary_file, 'r', encoding='utf-8') as f:
+                summary = json.load(f)
+
+        return self.record_run(
+            run_id=summary.get("timestamp", results_dir.name),
+            results_dir=results_dir,
+            article=summary.get("input_file"),
+            # Resolved so evidence rows get the chunk content hash and source
+            claims=iter_claims(results_dir)
+        )
+
+    def backfill(self, results_root: Path, force: bool = False) -> int:
+        """Index every run directory under ``results_root``.
+
+        Args:
+            results_root: Directory containing the timestamped run directories
+            force: Re-index runs that are already in the index
+
+        Returns:
+            Number of runs indexed
+        """
+        known = {row["results_dir"] for row in self._conn.execute("SELECT results_dir FROM runs")}
+        indexed = 0
+        for results_dir in sorted(Path(results_root).iterdir()):
+            if not (results_dir / "summary.json").exists():
+                continue
+            if not force and str(results_dir) in known:
+                continue
+            self.index_results_dir(results_dir)
+            indexed += 1
+        logger.info("Indexed %d runs from %s", indexed, results_root)
+        return indexed
+
+    def _filters(
+        self,
+        since: Optional[str],
+        until: Optional[str],
+        article: Optional[str],
+        statuses: Optional[Sequence[str]] = None
+    ) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        if since:
+            clauses.append("runs.started_at >= ?")
+            params.append(since)
+        if until:
+            clauses.append("runs.started_at < ?")
+            params.append(until)
+        if article:
+            clauses.append("runs.article LIKE ?")
+            params.append(f"%{article}%")
+        if statuses:
+            clauses.append(f"claims.status IN ({', '.join('?' * len(statuses))})")
+            params.extend(statuses)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def runs(
+        self,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        article: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Runs with their claim counts per status, newest first."""
+        where, params = self._filters(since, until, article)
+        query = (
+            "SELECT runs.run_id, runs.started_at, runs.article, runs.total_claims, "
+            "claims.status, COUNT(claims.claim_number) AS count "
+            "FROM runs LEFT JOIN claims ON claims.run_id = runs.run_id"
+            f"{where} GROUP BY runs.run_id, claims.status ORDER BY runs.started_at DESC"
+        )
+
+        runs: Dict[str, Dict[str, Any]] = {}
+        for row in self._conn.execute(query, params):
+            run = runs.setdefault(row["run_id"], {
+                "run_id": row["run_id"],
+                "started_at": row["started_at"],
+                "article": row["article"],
+                "total_claims": row["total_claims"],
+                "statuses": {}
+            })
+            if row["status"] is not None:
+                run["statuses"][row["status"]] = row["count"]
+
+        result = list(runs.values())
+        return result[:limit] if limit else result
+
+    def trend(
+        self,
+        statuses: Optional[Sequence[str]] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        article: Optional[str] = None,
+        period: str = "day"
+    ) -> List[Dict[str, Any]]:
+        """Claim counts per status and day/week/month."""
+        formats = {"day": "%Y-%m-%d", "week": "%Y-W%W", "month": "%Y-%m"}
+        if period not in formats:
+            raise ValueError(f"period must be one of {sorted(formats)}")
+
+        where, params = self._filters(since, until, article, statuses)
+        query = (
+            f"SELECT strftime('{formats[period]}', runs.started_at) AS period, claims.status, "
+            "COUNT(*) AS count, ROUND(AVG(claims.confidence), 3) AS mean_confidence "
+            "FROM claims JOIN runs ON runs.run_id = claims.run_id"
+            f"{where} GROUP BY period, claims.status ORDER BY period, claims.status"
+        )
+        return [dict(row) for row in self._conn.execute(query, params)]
+
+    def claims(
+        self,
+        statuses: Optional[Sequence[str]] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        article: Optional[str] = None,
+        min_confidence: Optional[float] = None,
+        limit: Optional[int] = 100
+    ) -> List[Dict[str, Any]]:
+        """Individual claims matching the filters, newest run first."""
+        where, params = self._filters(since, until, article, statuses)
+        if min_confidence is not None:
+            where += (" AND " if where else " WHERE ") + "claims.confidence >= ?"
+            params.append(min_confidence)
+        query = (
+            "SELECT claims.*, runs.started_at, runs.article, runs.results_dir "
+            "FROM claims JOIN runs ON runs.run_id = claims.run_id"
+            f"{where} ORDER BY runs.started_at DESC, claims.claim_number"
+        )
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        rows = []
+        for row in self._conn.execute(query, params):
+            record = dict(row)
+            record["top_chunk_ids"] = json.loads(record["top_chunk_ids"])
+            rows.append(record)
+        return rows
+
+    def latest_runs(self, before: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Newest run per article, optionally only runs started before a time."""
+        # The cutoff applies to the newest run looked up per article, not
+        # just to the outer rows, or articles re-run since then drop out
+        cutoff, params = ("AND started_at < ?", [before]) if before else ("", [])
+        query = (
+            "SELECT run_id, started_at, article, results_dir FROM runs AS r "
+            "WHERE started_at = ("
+            f"SELECT MAX(started_at) FROM runs WHERE article IS r.article {cutoff}) "
+            "ORDER BY started_at DESC"
+        )
+        return [dict(row) for row in self._conn.execute(query, params)]
+
+    def latest_run(self, article: str) -> Optional[Dict[str, Any]]:
+        """Newest run of an article, or None."""
+        row = self._conn.execute(
+            "SELECT run_id, started_at, article, results_dir FROM runs "
+            "WHERE article = ? ORDER BY started_at DESC LIMIT 1",
+            (article,)
+        ).fetchone()
+        return dict(row) if row is not None else None
+
+    def evidence(self, run_id: str) -> Dict[int, List[Dict[str, Any]]]:
+        """Evidence rows of a run per claim number, in rank order."""
+        rows: Dict[int, List[Dict[str, Any]]] = {}
+        query = (
+            "SELECT claim_number, chunk_id, content_hash, source FROM evidence "
+            "WHERE run_id = ? ORDER BY claim_number, rank"
+        )
+        for row in self._conn.execute(query, (run_id,)):
+            rows.setdefault(row["claim_number"], []).append(dict(row))
+        return rows
+
+    def claims_citing(self, sources: Iterable[str]) -> List[Dict[str, Any]]:
+        """Claims (run id, claim number) whose evidence came from any of ``sources``."""
+        sources = sorted(set(sources))
+        if not sources:
+            return []
+        query = (
+            "SELECT DISTINCT run_id, claim_number FROM evidence "
+            f"WHERE source IN ({', '.join('?' * len(sources))}) ORDER BY run_id, claim_number"
+        )
+        return [dict(row) for row in self._conn.execute(query, sources)]
+
+    def status_changes(self, run_id: str, baseline_run_id: str) -> List[Dict[str, Any]]:
+        """Claims whose status differs between two runs (matched by claim hash)."""
+        query = (
+            "SELECT current.claim_hash, current.claim_number, "
+            "baseline.status AS baseline_status, current.status AS status, "
+            "baseline.confidence AS baseline_confidence, current.confidence AS confidence "
+            "FROM claims AS current JOIN claims AS baseline "
+            "ON baseline.claim_hash = current.claim_hash AND baseline.run_id = ? "
+            "WHERE current.run_id = ? AND baseline.status IS NOT current.status "
+            "ORDER BY current.claim_number"
+        )
+        return [dict(row) for row in self._conn.execute(query, (baseline_run_id, run_id))]
+
+def update_index(results_dir: Path, db_path: Optional[Path] = None) -> None:
+    """Record a finished run in the index next to its results directory.
+
+    Failures are logged rather than raised so that indexing never loses a run.
+    """
+    results_dir = Path(results_dir)
+    db_path = db_path or results_dir.parent / DEFAULT_INDEX_NAME
+    try:
+        with closing(RunIndex(db_path)) as index:
+            index.index_results_dir(results_dir)
+    except (sqlite3.Error, OSError, ValueError) as e:
+        logger.error("Failed to update run index %s: %s", db_path, e)
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, dict):
+        return " ".join(f"{key}={count}" for key, count in sorted(value.items()))
+    if isinstance(value, list):
+        return ", ".join(str(item) for item in value)
+    return str(value)
+
+def _print_table(title: str, columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> None:
+    table = Table(title=title, box=ROUNDED, show_header=True, header_style="bold magenta")
+    for column in columns:
+        table.add_column(column)
+    for row in rows:
+        table.add_row(*[_cell(value) for value in row])
+    Console().print(table)
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description='Query the verification run index.')
+    parser.add_argument('--db', type=Path, default=Path("results") / DEFAULT_INDEX_NAME, help='Index database')
+    parser.add_argument('--json', action='store_true', help='Print JSON instead of a table')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    backfill = commands.add_parser('backfill', help='Index existing run directories')
+    backfill.add_argument('results_root', type=Path, nargs='?', default=Path("results"))
+    backfill.add_argument('--force', action='store_true', help='Re-index runs already in the index')
+
+    def add_filters(command: argparse.ArgumentParser) -> None:
+        command.add_argument('--since', help='Earliest run start (ISO date or timestamp)')
+        command.add_argument('--until', help='Exclusive latest run start')
+        command.add_argument('--article', help='Substring of the article path')
+
+    runs = commands.add_parser('runs', help='List runs with status counts')
+    add_filters(runs)
+    runs.add_argument('--limit', type=int, default=20)
+
+    trend = commands.add_parser('trend', help='Claim counts per status over time')
+    add_filters(trend)
+    trend.add_argument('--status', nargs='+')
+    trend.add_argument('--period', choices=['day', 'week', 'month'], default='day')
+
+    claims = commands.add_parser('claims', help='List individual claims')
+    add_filters(claims)
+    claims.add_argument('--status', nargs='+')
+    claims.add_argument('--min-confidence', type=float)
+    claims.add_argument('--limit', type=int, default=100)
+
+    changes = commands.add_parser('changes', help='Claims whose status changed between two runs')
+    changes.add_argument('run_id')
+    changes.add_argument('baseline_run_id')
+
+    args = parser.parse_args()
+
+    with closing(RunIndex(args.db)) as index:
+        if args.command == 'backfill':
+            count = index.backfill(args.results_root, force=args.force)
+            Console().print(f"Indexed {count} runs into {args.db}")
+            return
+
+        if args.command == 'runs':
+            rows = index.runs(args.since, args.until, args.article, args.limit)
+            columns = ["run_id", "started_at", "article", "total_claims", "statuses"]
+        elif args.command == 'trend':
+            rows = index.trend(args.status, args.since, args.until, args.article, args.period)
+            columns = ["period", "status", "count", "mean_confidence"]
+        elif args.command == 'claims':
+            rows = index.claims(
+                args.status, args.since, args.until, args.article, args.min_confidence, args.limit
+            )
+            columns = ["run_id", "claim_number", "claim_hash", "status", "confidence", "top_chunk_ids"]
+        else:
+            rows = index.status_changes(args.run_id, args.baseline_run_id)
+            columns = ["claim_hash", "claim_number", "baseline_status", "status", "baseline_confidence", "confidence"]
+
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+    else:
+        _print_table(args.command.capitalize(), columns, ([row[c] for c in columns] for row in rows))
+
+if __name__ == "__main__":
+    main()
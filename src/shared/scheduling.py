@@ -0,0 +1,436 @@
+"""Priority scheduling of LLM calls that share one OpenAI quota.
+
+Editors checking a single claim through the service and nightly jobs
+pushing thousands of claims through ``retrieval_graph.invoke`` and
+``QueryFormationAgent.analyze_sentence`` compete for the same rate limits.
+A ``RequestScheduler`` admits every chat model call:
+
+- priority classes (``interactive``, ``batch`` by default): a queued call of
+  a higher class is always dispatched before queued calls of lower classes,
+  so interactive requests overtake queued batch work (running calls are
+  never interrupted);
+- per-class concurrency caps and token-rate shares: each class may use at
+  most ``token_share`` of ``tokens_per_minute``, so batch work stays within
+  its budget and leaves headroom for interactive calls;
+- fair queuing within a class: calls are ordered by the tokens their flow
+  (an article request, a job) has already been granted, so one large job
+  cannot monopolize its class;
+- a starvation guard: calls queued longer than ``max_wait_seconds`` are
+  dispatched before younger calls of higher classes.
+
+Instrumented code calls the model through the module-level helpers, which
+pass straight through until a scheduler is installed:
+
+    response = scheduling.invoke(self.llm, messages)
+
+    scheduling.set_scheduler(RequestScheduler(SchedulerConfiguration()))
+    with scheduling.priority("interactive"):
+        ...
+
+Calls made outside a ``priority`` block use ``default_class``.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from shared import tracing
+from shared.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Fair-queuing state is pruned of idle flows above this many entries
+MAX_IDLE_FLOWS = 1024
+
+@dataclass
+class PriorityClass:
+    """Scheduling parameters of one class of requests."""
+
+    name: str
+    priority: int = field(
+        default=0,
+        metadata={"description": "Dispatch order between classes (lower first)"}
+    )
+    max_concurrency: int = field(
+        default=16,
+        metadata={"description": "Maximum calls of this class in flight"}
+    )
+    token_share: float = field(
+        default=1.0,
+        metadata={"description": "Share of tokens_per_minute this class may use"}
+    )
+
+@dataclass
+class SchedulerConfiguration:
+    """Configuration of the LLM request scheduler."""
+
+    classes: List[PriorityClass] = field(
+        default_factory=lambda: [
+            PriorityClass("interactive", priority=0, max_concurrency=32, token_share=1.0),
+            PriorityClass("batch", priority=1, max_concurrency=24, token_share=0.6)
+        ],
+        metadata={"description": "Priority classes"}
+    )
+    default_class: str = field(
+        default="batch",
+        metadata={"description": "Class of calls made outside a priority() block"}
+    )
+    max_concurrency: int = field(
+        default=32,
+        metadata={"description": "Maximum calls in flight across all classes"}
+    )
+    tokens_per_minute: Optional[int] = field(
+        default=None,
+        metadata={"description": "Token budget shared by all classes (unlimited if None)"}
+    )
+    completion_tokens: int = field(
+        default=500,
+        metadata={"description": "Completion tokens assumed per call until its usage is known"}
+    )
+    max_wait_seconds: float = field(
+        default=60.0,
+        metadata={"description": "Queued calls older than this go before higher classes"}
+    )
+
+def estimate_tokens(messages: Any, completion_tokens: int = 0) -> int:
+    """Rough token count of a prompt (4 characters per token) plus the completion."""
+    if isinstance(messages, str):
+        text = messages
+    else:
+        text = "".join(str(getattr(message, "content", message)) for message in messages)
+    return len(text) // 4 + completion_tokens
+
+class Grant:
+    """Admission of one call (``tokens`` is the estimate charged for it)."""
+
+    __slots__ = ("priority_class", "tokens", "waited")
+
+    def __init__(self, priority_class: str, tokens: int, waited: float):
+        self.priority_class = priority_class
+        self.tokens = tokens
+        self.waited = waited
+
+class _Request:
+    __slots__ = ("priority_class", "flow", "tokens", "tag", "enqueued", "future")
+
+    def __init__(self, priority_class: str, flow: Hashable, tokens: int, tag: float):
+        self.priority_class = priority_class
+        self.flow = flow
+        self.tokens = tokens
+        self.tag = tag
+        self.enqueued = time.monotonic()
+        self.future: Future = Future()
+
+class _Bucket:
+    """Token bucket holding up to one minute of its rate."""
+
+    __slots__ = ("capacity", "tokens")
+
+    def __init__(self, tokens_per_minute: float):
+        self.capacity = tokens_per_minute
+        self.tokens = tokens_per_minute
+
+    def refill(self, seconds: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + self.capacity * seconds / 60)
+
+    def charge(self, tokens: float) -> None:
+        # Refunds (negative charges) never fill the bucket past capacity
+        self.tokens = min(self.capacity, self.tokens - tokens)
+
+    def shortfall(self, tokens: int) -> float:
+        # Calls larger than the bucket go through once it is full
+        return max(0.0, min(tokens, self.capacity) - self.tokens)
+
+    def seconds_until(self, tokens: int) -> float:
+        return self.shortfall(tokens) * 60 / self.capacity if self.capacity else 0.0
+
+class RequestScheduler:
+    """Admit LLM calls by priority class, concurrency and token budget.
+
+    Queued calls are dispatched by a background thread, so blocking
+    (``slot``) and async (``aslot``) callers share one queue.
+
+    Args:
+        config: Scheduler configuration
+    """
+
+    def __init__(self, config: Optional[SchedulerConfiguration] = None):
+        self.config = config or SchedulerConfiguration()
+        self.classes: Dict[str, PriorityClass] = {c.name: c for c in self.config.classes}
+        if self.config.default_class not in self.classes:
+            raise ValueError(f"Unknown default class: {self.config.default_class}")
+
+        self._condition = threading.Condition()
+        self._sequence = itertools.count()
+        self._queues: Dict[str, List[Tuple[float, int, _Request]]] = {name: [] for name in self.classes}
+        self._running: Dict[str, int] = {name: 0 for name in self.classes}
+        # Fair queuing: per class the tag of the last dispatched call, per
+        # flow the tag its latest queued call finishes at
+        self._virtual_time: Dict[str, float] = {name: 0.0 for name in self.classes}
+        self._flow_finish: Dict[Tuple[str, Hashable], float] = {}
+
+        self._budget: Optional[_Bucket] = None
+        self._buckets: Dict[str, _Bucket] = {}
+        if self.config.tokens_per_minute:
+            self._budget = _Bucket(self.config.tokens_per_minute)
+            self._buckets = {
+                name: _Bucket(self.config.tokens_per_minute * c.token_share)
+                for name, c in self.classes.items()
+            }
+        self._refilled = time.monotonic()
+
+        self.granted: Dict[str, int] = {name: 0 for name in self.classes}
+        self.overdue: Dict[str, int] = {name: 0 for name in self.classes}
+        self.wait_seconds: Dict[str, float] = {name: 0.0 for name in self.classes}
+        self.tokens_used: Dict[str, int] = {name: 0 for name in self.classes}
+
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="llm-scheduler", daemon=True)
+        self._thread.start()
+
+    def submit(self, priority_class: str, tokens: int, flow: Hashable = None) -> Future:
+        """Queue a call; the future resolves to its ``Grant`` once admitted.
+
+        Cancelling the future before it resolves withdraws the call.
+        """
+        if priority_class not in self.classes:
+            raise ValueError(f"Unknown priority class: {priority_class}")
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Scheduler is closed")
+            key = (priority_class, flow)
+            tag = max(self._virtual_time[priority_class], self._flow_finish.get(key, 0.0)) + tokens
+            self._flow_finish[key] = tag
+            request = _Request(priority_class, flow, tokens, tag)
+            heapq.heappush(self._queues[priority_class], (tag, next(self._sequence), request))
+            self._condition.notify()
+        return request.future
+
+    def settle(self, grant: Grant, tokens: Optional[int]) -> None:
+        """Charge the tokens a call actually used instead of its estimate.
+
+        Args:
+            grant: Grant of the finished call
+            tokens: Tokens reported by the API, or None if the response
+                carried no usage; the estimate then stays charged
+        """
+        with self._condition:
+            if tokens is None:
+                self.tokens_used[grant.priority_class] += grant.tokens
+                return
+            self.tokens_used[grant.priority_class] += tokens
+            if self._budget is not None:
+                extra = tokens - grant.tokens
+                self._budget.charge(extra)
+                self._buckets[grant.priority_class].charge(extra)
+
+    def release(self, grant: Grant) -> None:
+        """Free the slot of a finished call."""
+        with self._condition:
+            self._running[grant.priority_class] -= 1
+            self._condition.notify()
+
+    @contextmanager
+    def slot(self, priority_class: str, tokens: int, flow: Hashable = None) -> Iterator[Grant]:
+        """Block until a call is admitted and release it afterwards."""
+        grant = self.submit(priority_class, tokens, flow).result()
+        try:
+            yield grant
+        finally:
+            self.release(grant)
+
+    @asynccontextmanager
+    async def aslot(self, priority_class: str, tokens: int, flow: Hashable = None) -> AsyncIterator[Grant]:
+        """Async ``slot`` that waits without blocking the event loop."""
+        future = self.submit(priority_class, tokens, flow)
+        try:
+            grant = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # The call may have been admitted just before, or while, the
+            # waiter was cancelled; its slot is given back once the grant lands
+            future.add_done_callback(self._release_abandoned)
+            raise
+        try:
+            yield grant
+        finally:
+            self.release(grant)
+
+    def _release_abandoned(self, future: Future) -> None:
+        if not future.cancelled() and future.exception() is None:
+            self.release(future.result())
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue lengths, running calls and mean queueing time per class."""
+        with self._condition:
+            return {
+                name: {
+                    "queued": len(self._queues[name]),
+                    "running": self._running[name],
+                    "granted": self.granted[name],
+                    "overdue": self.overdue[name],
+                    "tokens": self.tokens_used[name],
+                    "mean_wait_ms": round(1000 * self.wait_seconds[name] / self.granted[name], 3) if self.granted[name] else 0.0
+                }
+                for name in self.classes
+            }
+
+    def close(self) -> None:
+        """Stop dispatching; calls still queued are cancelled."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        queued = [request for queue in self._queues.values() for _, _, request in queue]
+        for request in queued:
+            request.future.cancel()
+        if queued:
+            logger.warning("Scheduler closed with %d queued calls", len(queued))
+
+    def _run(self) -> None:
+        with self._condition:
+            while not self._closed:
+                timeout = self._dispatch()
+                self._condition.wait(timeout)
+
+    def _refill(self, now: float) -> None:
+        if self._budget is not None:
+            elapsed = now - self._refilled
+            self._budget.refill(elapsed)
+            for bucket in self._buckets.values():
+                bucket.refill(elapsed)
+        self._refilled = now
+
+    def _head(self, name: str) -> Optional[_Request]:
+        """Next call of a class in fair-queuing order, dropping withdrawn ones."""
+        queue = self._queues[name]
+        while queue and queue[0][2].future.cancelled():
+            heapq.heappop(queue)
+        return queue[0][2] if queue else None
+
+    def _dispatch(self) -> Optional[float]:
+        """Admit every call that fits; returns how long to wait for tokens."""
+        now = time.monotonic()
+        self._refill(now)
+        wait: Optional[float] = None
+        while sum(self._running.values()) < self.config.max_concurrency:
+            candidates = []
+            for name, priority_class in self.classes.items():
+                head = self._head(name)
+                if head is not None and self._running[name] < priority_class.max_concurrency:
+                    overdue = now - head.enqueued >= self.config.max_wait_seconds
+                    rank = (0, head.enqueued) if overdue else (1, priority_class.priority)
+                    candidates.append((rank, overdue, head))
+            candidates.sort(key=lambda candidate: candidate[0])
+
+            for _, overdue, request in candidates:
+                delay = self._token_delay(request)
+                if not delay:
+                    self._grant(request, now, overdue)
+                    break
+                wait = delay if wait is None else min(wait, delay)
+                # Lower classes may go ahead only if this class is held back
+                # by its own share, not by the shared budget
+                if self._budget.shortfall(request.tokens):
+                    return wait
+            else:
+                return wait
+        return None
+
+    def _token_delay(self, request: _Request) -> float:
+        if self._budget is None:
+            return 0.0
+        bucket = self._buckets[request.priority_class]
+        return max(self._budget.seconds_until(request.tokens), bucket.seconds_until(request.tokens))
+
+    def _grant(self, request: _Request, now: float, overdue: bool) -> None:
+        name = request.priority_class
+        heapq.heappop(self._queues[name])
+        if not request.future.set_running_or_notify_cancel():
+            return
+        self._virtual_time[name] = request.tag
+        if len(self._flow_finish) > MAX_IDLE_FLOWS:
+            # Flows finishing before the virtual time would start there anyway
+            self._flow_finish = {
+                key: finish for key, finish in self._flow_finish.items()
+                if finish > self._virtual_time[key[0]]
+            }
+        if self._budget is not None:
+            self._budget.charge(request.tokens)
+            self._buckets[name].charge(request.tokens)
+        self._running[name] += 1
+        self.granted[name] += 1
+        self.overdue[name] += overdue
+        waited = now - request.enqueued
+        self.wait_seconds[name] += waited
+        request.future.set_result(Grant(name, request.tokens, waited))
+
+_scheduler: Optional[RequestScheduler] = None
+_priority: contextvars.ContextVar[Tuple[Optional[str], Hashable]] = contextvars.ContextVar(
+    "llm_priority", default=(None, None)
+)
+
+def set_scheduler(scheduler: Optional[RequestScheduler]) -> None:
+    """Install the process-wide scheduler (None turns scheduling off)."""
+    global _scheduler
+    _scheduler = scheduler
+
+def get_scheduler() -> Optional[RequestScheduler]:
+    """Return the installed scheduler, if any."""
+    return _scheduler
+
+@contextmanager
+def priority(priority_class: str, flow: Hashable = None) -> Iterator[None]:
+    """Run the LLM calls of the enclosed code (and tasks it starts) in a class.
+
+    Args:
+        priority_class: Name of a configured ``PriorityClass``
+        flow: Calls of the same flow (e.g. one article request) share
+            their class fairly with other flows
+    """
+    token = _priority.set((priority_class, flow))
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def current_priority() -> Optional[str]:
+    """Class set by the enclosing ``priority`` block (None = default class)."""
+    return _priority.get()[0]
+
+def _request(scheduler: RequestScheduler, messages: Any) -> Tuple[str, int, Hashable]:
+    priority_class, flow = _priority.get()
+    tokens = estimate_tokens(messages, scheduler.config.completion_tokens)
+    return priority_class or scheduler.config.default_class, tokens, flow
+
+def _used_tokens(response: Any) -> Optional[int]:
+    """Tokens a response reports, or None if it has no usage metadata."""
+    usage = tracing.usage_from_message(response)
+    used = usage["prompt_tokens"] + usage["completion_tokens"]
+    return used or None
+
+def invoke(llm: Any, messages: Any) -> Any:
+    """``llm.invoke(messages)`` once the scheduler admits the call."""
+    scheduler = _scheduler
+    if scheduler is None:
+        return llm.invoke(messages)
+    with scheduler.slot(*_request(scheduler, messages)) as grant:
+        response = llm.invoke(messages)
+        scheduler.settle(grant, _used_tokens(response))
+    return response
+
+async def ainvoke(llm: Any, messages: Any) -> Any:
+    """Async ``invoke`` using the model's native ``ainvoke``."""
+    scheduler = _scheduler
+    if scheduler is None:
+        return await llm.ainvoke(messages)
+    async with scheduler.aslot(*_request(scheduler, messages)) as grant:
+        response = await llm.ainvoke(messages)
+        scheduler.settle(grant, _used_tokens(response))
+    return response
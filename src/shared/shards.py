@@ -0,0 +1,146 @@
+"""Registry of guideline shards.
+
+With sharding enabled the indexer writes every guideline (or every topic,
+e.g. ``asthma``) into its own Chroma collection. ``shards.json`` in the
+vector store directory records which collection holds which sources, so
+that retrieval can fan out to the relevant shards only and a single shard
+can be re-indexed or rebuilt without touching the others.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from shared.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+REGISTRY_FILE = "shards.json"
+
+SHARD_MODES = ("guideline", "topic")
+
+def shard_collection_name(collection_name: str, shard: str) -> str:
+    """Chroma collection name for a shard (3-63 characters of ``[A-Za-z0-9_-]``)."""
+    slug = re.sub(r"[^A-Za-z0-9_-]+", "-", shard).strip("-_") or "shard"
+    name = f"{collection_name}-{slug}"
+    if len(name) > 63:
+        digest = hashlib.sha1(shard.encode("utf-8")).hexdigest()[:8]
+        name = f"{name[:54].rstrip('-_')}-{digest}"
+    return name
+
+def topic_of(file_path: Path, input_dir: Optional[Path] = None) -> str:
+    """Topic of a guideline file: its first directory below ``input_dir``.
+
+    ``input/asthma/guideline/guideline.pdf`` belongs to ``asthma``. Files
+    outside ``input_dir`` use their parent directory name.
+    """
+    if input_dir is not None:
+        try:
+            relative = Path(file_path).resolve().relative_to(Path(input_dir).resolve())
+            if len(relative.parts) > 1:
+                return relative.parts[0]
+        except ValueError:
+            pass
+    return Path(file_path).parent.name
+
+def shard_key(file_path: Path, mode: str, input_dir: Optional[Path] = None) -> str:
+    """Shard a guideline file belongs to under ``mode``."""
+    if mode not in SHARD_MODES:
+        raise ValueError(f"shard mode must be one of {SHARD_MODES}")
+    if mode == "topic":
+        return topic_of(file_path, input_dir)
+    return Path(file_path).stem
+
+class ShardRegistry:
+    """Shard bookkeeping stored as JSON next to the Chroma files.
+
+    Args:
+        path: Registry file, usually ``<persist_directory>/shards.json``
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.shards: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.shards = json.load(f).get("shards", {})
+
+    @classmethod
+    def for_directory(cls, persist_directory: Path) -> "ShardRegistry":
+        return cls(Path(persist_directory) / REGISTRY_FILE)
+
+    def save(self) -> None:
+        """Write the registry atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".json.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"shards": self.shards}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def register(
+        self,
+        shard: str,
+        collection: str,
+        topic: str,
+        sources: Iterable[str],
+        chunks: int
+    ) -> None:
+        """Add sources and chunks to a shard, creating it if needed."""
+        with self._lock:
+            entry = self.shards.setdefault(shard, {
+                "collection": collection,
+                "topic": topic,
+                "sources": [],
+                "chunks": 0
+            })
+            entry["sources"] = sorted(set(entry["sources"]) | set(map(str, sources)))
+            entry["chunks"] += chunks
+            entry["updated_at"] = datetime.now().isoformat(timespec="seconds")
+
+    def unregister(self, shard: str, sources: Iterable[str], chunks: int) -> None:
+        """Remove sources and their chunk count from a shard.
+
+        A shard left without sources is dropped, so searches skip it.
+        """
+        with self._lock:
+            entry = self.shards.get(shard)
+            if entry is None:
+                return
+            entry["sources"] = sorted(set(entry["sources"]) - set(map(str, sources)))
+            entry["chunks"] = max(entry["chunks"] - chunks, 0)
+            entry["updated_at"] = datetime.now().isoformat(timespec="seconds")
+            if not entry["sources"]:
+                del self.shards[shard]
+
+    def shard_of(self, source: str) -> Optional[str]:
+        """Shard holding a source, or None."""
+        for shard, entry in self.shards.items():
+            if str(source) in entry["sources"]:
+                return shard
+        return None
+
+    def sources(self) -> List[str]:
+        """All sources indexed in any shard."""
+        return sorted({source for entry in self.shards.values() for source in entry["sources"]})
+
+    def select(self, names: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """Map shard name to collection for the shards matching ``names``.
+
+        ``names`` may contain shard names or topics; all shards are returned
+        when it is empty or nothing matches.
+        """
+        wanted = set(names or ())
+        selected = {
+            shard: entry["collection"]
+            for shard, entry in self.shards.items()
+            if shard in wanted or entry.get("topic") in wanted
+        }
+        if wanted and not selected:
+            logger.warning("No shard matches %s, searching all shards", sorted(wanted))
+        return selected or {shard: entry["collection"] for shard, entry in self.shards.items()}
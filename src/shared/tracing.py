@@ -0,0 +1,261 @@
+"""Lightweight per-stage timing and token accounting.
+
+A ``RunTracer`` collects wall time and LLM token usage per named stage
+(parsing, classification, embedding, vector search, synthesis, result
+writing, ...). Instrumented code uses the module-level helpers, which report
+to the tracer of the current run:
+
+    with tracing.span("vector_search", k=5):
+        ...
+
+    @tracing.traced("classification")
+    def analyze_sentence(...): ...
+
+    tracing.record_usage("synthesis", response)
+
+    tracing.record_outcome("synthesis", "escalated")
+
+Spans are additionally exported through OpenTelemetry when it is installed
+and enabled (``start_run(otel=True)`` or ``NETDOKTOR_OTEL=1``); exporters are
+configured with the standard ``OTEL_*`` environment variables.
+"""
+
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack, contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, Optional, Sequence
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # pragma: no cover - optional dependency
+    otel_trace = None
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Linearly interpolated percentile (``q`` in 0-100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def usage_from_message(message: Any) -> Dict[str, int]:
+    """Extract token counts from a chat model response.
+
+    Reads ``usage_metadata`` (LangChain's normalised form) and falls back to
+    the provider's ``token_usage`` block. ``cached_tokens`` is the part of
+    the prompt served from the provider's prompt cache.
+    """
+    usage = getattr(message, "usage_metadata", None)
+    if usage:
+        return {
+            "prompt_tokens": usage.get("input_tokens", 0),
+            "completion_tokens": usage.get("output_tokens", 0),
+            "cached_tokens": (usage.get("input_token_details") or {}).get("cache_read", 0),
+        }
+
+    token_usage = (getattr(message, "response_metadata", None) or {}).get("token_usage") or {}
+    return {
+        "prompt_tokens": token_usage.get("prompt_tokens", 0),
+        "completion_tokens": token_usage.get("completion_tokens", 0),
+        "cached_tokens": (token_usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0),
+    }
+
+# Percentiles are computed over the most recent samples so long-running
+# processes (the verification service) keep constant memory per stage
+MAX_SAMPLES = 10_000
+
+class _StageStats:
+    """Running statistics for one stage."""
+
+    def __init__(self):
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.durations: Deque[float] = deque(maxlen=MAX_SAMPLES)
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+        self.models: Dict[str, Dict[str, int]] = {}
+        self.outcomes: Dict[str, int] = {}
+
+    def add(self, duration: float) -> None:
+        self.calls += 1
+        self.total_seconds += duration
+        self.max_seconds = max(self.max_seconds, duration)
+        self.durations.append(duration)
+
+    def to_dict(self) -> Dict[str, Any]:
+        durations_ms = [d * 1000 for d in self.durations]
+        stats = {
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_seconds": round(self.total_seconds, 6),
+            "mean_ms": round(self.total_seconds * 1000 / self.calls, 3) if self.calls else 0.0,
+            "p50_ms": round(percentile(durations_ms, 50), 3),
+            "p95_ms": round(percentile(durations_ms, 95), 3),
+            "max_ms": round(self.max_seconds * 1000, 3),
+        }
+        if self.prompt_tokens or self.completion_tokens:
+            stats.update({
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "total_tokens": self.prompt_tokens + self.completion_tokens,
+                "cached_tokens": self.cached_tokens,
+                "cache_hit_rate": round(self.cached_tokens / self.prompt_tokens, 4) if self.prompt_tokens else 0.0,
+                "models": self.models,
+            })
+        if self.outcomes:
+            total = sum(self.outcomes.values())
+            stats["outcomes"] = {
+                outcome: {"count": count, "rate": round(count / total, 4)}
+                for outcome, count in self.outcomes.items()
+            }
+        return stats
+
+class RunTracer:
+    """Collects stage timings and token usage for one pipeline run."""
+
+    def __init__(self, name: str = "run", otel: Optional[bool] = None):
+        self.name = name
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+        self._stages: Dict[str, _StageStats] = {}
+        self._lock = threading.Lock()
+
+        if otel is None:
+            otel = os.getenv("NETDOKTOR_OTEL", "").lower() in ("1", "true", "yes")
+        self._otel = otel_trace.get_tracer("netdoktor") if otel and otel_trace else None
+
+    def _stats(self, stage: str) -> _StageStats:
+        stats = self._stages.get(stage)
+        if stats is None:
+            stats = self._stages.setdefault(stage, _StageStats())
+        return stats
+
+    @contextmanager
+    def span(self, stage: str, **attributes: Any) -> Iterator[None]:
+        """Time a block of code under ``stage``."""
+        with ExitStack() as stack:
+            if self._otel is not None:
+                stack.enter_context(
+                    self._otel.start_as_current_span(stage, attributes=attributes or None)
+                )
+
+            start = time.perf_counter()
+            failed = False
+            try:
+                yield
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                duration = time.perf_counter() - start
+                with self._lock:
+                    stats = self._stats(stage)
+                    stats.add(duration)
+                    if failed:
+                        stats.errors += 1
+
+    def record_usage(self, stage: str, message: Any) -> None:
+        """Add the token usage of an LLM response to ``stage``."""
+        usage = usage_from_message(message)
+        model = (getattr(message, "response_metadata", None) or {}).get("model_name", "unknown")
+
+        with self._lock:
+            stats = self._stats(stage)
+            stats.prompt_tokens += usage["prompt_tokens"]
+            stats.completion_tokens += usage["completion_tokens"]
+            stats.cached_tokens += usage["cached_tokens"]
+            per_model = stats.models.setdefault(
+                model, {"prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0}
+            )
+            for key in per_model:
+                per_model[key] += usage[key]
+
+        if self._otel is not None:
+            current = otel_trace.get_current_span()
+            current.set_attribute("llm.prompt_tokens", usage["prompt_tokens"])
+            current.set_attribute("llm.completion_tokens", usage["completion_tokens"])
+            current.set_attribute("llm.cached_tokens", usage["cached_tokens"])
+
+    def record_outcome(self, stage: str, outcome: str) -> None:
+        """Count how a call of ``stage`` ended (e.g. settled or escalated)."""
+        with self._lock:
+            outcomes = self._stats(stage).outcomes
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    def report(self) -> Dict[str, Any]:
+        """Return the per-stage report as a dictionary."""
+        with self._lock:
+            stages = {name: stats.to_dict() for name, stats in self._stages.items()}
+
+        return {
+            "run": self.name,
+            "started_at": self.started_at.isoformat(),
+            "wall_seconds": round(time.perf_counter() - self._start, 6),
+            "stages": stages,
+            "totals": {
+                "prompt_tokens": sum(s.get("prompt_tokens", 0) for s in stages.values()),
+                "completion_tokens": sum(s.get("completion_tokens", 0) for s in stages.values()),
+                "cached_tokens": sum(s.get("cached_tokens", 0) for s in stages.values()),
+            }
+        }
+
+    def write_report(self, path: Path) -> None:
+        """Write the report as JSON."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+
+_current_tracer = RunTracer()
+
+def start_run(name: str = "run", otel: Optional[bool] = None) -> RunTracer:
+    """Start a new run; subsequent spans are recorded on the returned tracer."""
+    global _current_tracer
+    _current_tracer = RunTracer(name, otel=otel)
+    return _current_tracer
+
+def get_tracer() -> RunTracer:
+    """Return the tracer of the current run."""
+    return _current_tracer
+
+def span(stage: str, **attributes: Any):
+    """Time a block of code on the current run's tracer."""
+    return _current_tracer.span(stage, **attributes)
+
+def record_usage(stage: str, message: Any) -> None:
+    """Record LLM token usage on the current run's tracer."""
+    _current_tracer.record_usage(stage, message)
+
+def record_outcome(stage: str, outcome: str) -> None:
+    """Count an outcome of ``stage`` on the current run's tracer."""
+    _current_tracer.record_outcome(stage, outcome)
+
+def traced(stage: str) -> Callable:
+    """Decorator that times every call of the wrapped function under ``stage``.
+    
+    Coroutine functions are timed until they complete.
+    """
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with _current_tracer.span(stage):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _current_tracer.span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
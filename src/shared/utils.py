@@ -1,25 +1,70 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from langchain_openai import OpenAIEmbeddings
 from langchain_core.documents import Document
 import os
 from langchain_chroma import Chroma
 
-def setup_embeddings(model_name: str = "text-embedding-3-small") -> OpenAIEmbeddings:
+from shared.configuration import HnswConfiguration
+from shared.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+def setup_embeddings(
+    model_name: str = "text-embedding-3-small",
+    dimensions: Optional[int] = None
+) -> OpenAIEmbeddings:
     """Initialize OpenAI embeddings.
     
     Args:
         model_name: Name of the OpenAI embedding model
+        dimensions: Shortened output size (text-embedding-3 models only)
         
     Returns:
         Configured OpenAI embeddings instance
     """
     return OpenAIEmbeddings(
         model=model_name,
+        dimensions=dimensions,
         openai_api_key=os.getenv("OPENAI_API_KEY")
     )
 
-def clear_vector_store(persist_dir: str, collection_name: str = "guidelines") -> None:
-    """Clear the existing vector store."""
+def check_hnsw_configuration(collection: Any, expected: HnswConfiguration) -> bool:
+    """Warn when an existing collection was built with other HNSW settings.
+    
+    Args:
+        collection: Chroma collection
+        expected: Configured HNSW settings
+        
+    Returns:
+        True if the collection matches ``expected``
+    """
+    actual = HnswConfiguration.from_metadata(collection.metadata)
+    differences = {
+        name: (value, getattr(expected, name))
+        for name, value in vars(actual).items()
+        if getattr(expected, name) != value
+    }
+    if differences:
+        logger.warning(
+            "Collection %s uses %s; run 'python -m index_graph.rebuild --collection %s' to apply the configured HNSW settings",
+            collection.name,
+            ", ".join(f"{name}={have} (configured {want})" for name, (have, want) in differences.items()),
+            collection.name
+        )
+    return not differences
+
+def clear_vector_store(
+    persist_dir: str,
+    collection_name: str = "guidelines",
+    hnsw: Optional[HnswConfiguration] = None
+) -> None:
+    """Clear the existing vector store.
+    
+    Args:
+        persist_dir: Chroma persistence directory
+        collection_name: Collection to recreate
+        hnsw: HNSW settings of the new collection (Chroma defaults if omitted)
+    """
     try:
         import chromadb
         
@@ -27,23 +72,26 @@ def clear_vector_store(persist_dir: str, collection_name: str = "guidelines") ->
         client = chromadb.PersistentClient(path=persist_dir)
         
         # Get current count
-        print(f"\nClearing vector store...")
+        logger.info("Clearing vector store...")
         
         try:
             # Delete the entire collection if it exists
             client.delete_collection(name=collection_name)
-            print(f"Deleted collection: {collection_name}")
+            logger.info("Deleted collection: %s", collection_name)
         except ValueError as e:
-            print(f"Collection {collection_name} does not exist yet")
+            logger.info("Collection %s does not exist yet", collection_name)
             
         # Create a new empty collection
-        client.create_collection(name=collection_name)
-        print("Created new empty collection")
+        client.create_collection(
+            name=collection_name,
+            metadata=(hnsw or HnswConfiguration()).to_metadata()
+        )
+        logger.info("Created new empty collection")
         
-        print("Vector store cleared successfully")
+        logger.info("Vector store cleared successfully")
         
     except Exception as e:
-        print(f"Error clearing vector store: {str(e)}")
+        logger.error("Error clearing vector store: %s", e)
         raise
 
 def format_results(documents: List[Document]) -> List[Dict[str, Any]]:
@@ -64,7 +112,8 @@ def format_results(documents: List[Document]) -> List[Dict[str, Any]]:
         {
             "content": doc.page_content,
             "metadata": doc.metadata,
-            "score": doc.metadata.get("score", None)
+            "score": doc.metadata.get("score", None),
+            "id": doc.id
         }
         for doc in documents
     ] 
\ No newline at end of file
@@ -0,0 +1,124 @@
+"""Published collection versions and indexed source hashes.
+
+Every index write bumps the version of the collections it touched and
+records which sources were added, replaced or removed, in
+``versions.json`` next to the Chroma files. Downstream caches (the exact
+search matrix, cached verification results) key on the version and can
+evict only what cites a changed source. The file also keeps the SHA-256 of
+every indexed PDF, so incremental indexing can tell a changed guideline
+from a merely touched one.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from shared.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+VERSIONS_FILE = "versions.json"
+
+# Bumps kept in the history, oldest dropped first
+HISTORY_LIMIT = 1000
+
+class CollectionVersions:
+    """Version counters stored as JSON next to the Chroma files.
+
+    Args:
+        path: Versions file, usually ``<persist_directory>/versions.json``
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.collections: Dict[str, Dict[str, Any]] = {}
+        self.sources: Dict[str, str] = {}
+        self.history: List[Dict[str, Any]] = []
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.collections = data.get("collections", {})
+            self.sources = data.get("sources", {})
+            self.history = data.get("history", [])
+
+    @classmethod
+    def for_directory(cls, persist_directory: Path) -> "CollectionVersions":
+        return cls(Path(persist_directory) / VERSIONS_FILE)
+
+    def version(self, collection: str) -> int:
+        """Current version of a collection (0 if never published)."""
+        return self.collections.get(collection, {}).get("version", 0)
+
+    def source_hash(self, source: Any) -> Optional[str]:
+        """SHA-256 a source had when it was indexed."""
+        return self.sources.get(str(source))
+
+    def adopt(self, hashes: Dict[str, str]) -> None:
+        """Record hashes of sources indexed before hashes were kept.
+
+        No version is bumped: the stored chunks are taken to match the
+        files as they are now, and later edits are compared against that.
+        """
+        with self._lock:
+            self.sources.update(hashes)
+
+    def bump(
+        self,
+        collection: str,
+        changed: Iterable[Any] = (),
+        removed: Iterable[Any] = (),
+        hashes: Optional[Dict[str, str]] = None
+    ) -> int:
+        """Record a write to a collection and return its new version.
+
+        Args:
+            collection: Collection that was written
+            changed: Sources added or replaced
+            removed: Sources whose chunks were deleted
+            hashes: SHA-256 of the changed sources
+        """
+        with self._lock:
+            entry = self.collections.setdefault(collection, {"version": 0})
+            entry["version"] += 1
+            entry["updated_at"] = datetime.now().isoformat(timespec="seconds")
+            entry["changed_sources"] = sorted(map(str, changed))
+            entry["removed_sources"] = sorted(map(str, removed))
+            self.sources.update(hashes or {})
+            for source in entry["removed_sources"]:
+                self.sources.pop(source, None)
+            self.history.append({"collection": collection, **entry})
+            del self.history[:-HISTORY_LIMIT]
+            return entry["version"]
+
+    def changes_since(self, timestamp: str) -> Tuple[Set[str], Set[str]]:
+        """Sources changed and removed by bumps after an ISO timestamp.
+
+        Returns:
+            ``(changed, removed)`` by the latest bump touching each source
+        """
+        changed: Set[str] = set()
+        removed: Set[str] = set()
+        for bump in self.history:
+            # Bumps in the same second as ``timestamp`` count as later
+            if bump["updated_at"] < timestamp[:19]:
+                continue
+            changed = (changed - set(bump["removed_sources"])) | set(bump["changed_sources"])
+            removed = (removed - set(bump["changed_sources"])) | set(bump["removed_sources"])
+        return changed, removed
+
+    def save(self) -> None:
+        """Write the versions file atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".json.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(
+                {"collections": self.collections, "sources": self.sources, "history": self.history},
+                f,
+                ensure_ascii=False,
+                indent=2
+            )
+        os.replace(tmp_path, self.path)